@@ -0,0 +1,40 @@
+# benchmarks/_dados_sinteticos.py
+# Geração de um banco sintético compartilhada pelos benchmarks.
+
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from database.db_manager import DatabaseManager
+
+
+def criar_banco_sintetico(num_movimentos, num_produtos=200, dias=365, seed=42, **db_kwargs):
+    """Cria um DatabaseManager num arquivo temporário com `num_movimentos` movimentações.
+    `db_kwargs` é repassado ao DatabaseManager (ex.: journal_mode, max_connections)."""
+    tmp_dir = tempfile.mkdtemp(prefix="bench_estoque_")
+    db = DatabaseManager(os.path.join(tmp_dir, "estoque.db"), **db_kwargs)
+    rnd = random.Random(seed)
+
+    db.cursor.executemany(
+        "INSERT INTO produtos (nome, codigo_sku, descricao, quantidade, quantidade_inicial) VALUES (?, ?, ?, ?, ?)",
+        [(f"Produto Sintético {i:05d}", f"SKU-{i:05d}", "Gerado para benchmark", 10**9, 10**9) for i in range(num_produtos)]
+    )
+    product_ids = [r[0] for r in db.cursor.execute("SELECT id FROM produtos").fetchall()]
+    inicio = datetime.now() - timedelta(days=dias)
+
+    def _linhas():
+        for _ in range(num_movimentos):
+            tipo = 'entrada' if rnd.random() < 0.4 else 'saida'
+            data_hora = inicio + timedelta(seconds=rnd.randrange(dias * 86400))
+            yield (rnd.choice(product_ids), 1, tipo, rnd.randint(1, 20), round(rnd.uniform(1, 500), 2),
+                   None, None, data_hora.strftime('%Y-%m-%d %H:%M:%S'), data_hora.strftime('%Y-%m-%d'))
+
+    db.cursor.executemany(
+        "INSERT INTO movimentacoes (id_item, id_usuario, tipo, quantidade, preco_transacao, id_cliente, id_fornecedor, data_hora, dia) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        _linhas()
+    )
+    db.conn.commit()
+    db.rebuild_daily_summary()
+    db.analyze()
+    return db, product_ids
@@ -0,0 +1,54 @@
+# benchmarks/bench_agrupamento.py
+# Comparativo do dashboard sem filtro de datas: um grupo por dia e um par de barras por
+# produto versus agrupamento automático (semana/mês no SQL) com os demais produtos em
+# "Outros". Mede a consulta, o número de barras e o tempo de desenho (backend Agg).
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_agrupamento --rows 100000 --produtos 40 --dias 90
+
+import argparse
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+from ui.dashboard_charts import BarChart, choose_granularity, comparison_matrices
+
+TOP_N = 8
+
+
+def _medir(db, granularity, top_n):
+    t0 = time.perf_counter()
+    data = db.get_summary_for_all_products(None, None, granularity, top_n)
+    consulta = time.perf_counter() - t0
+    fig = Figure(figsize=(8, 4), dpi=100); ax = fig.add_subplot(111); canvas = FigureCanvasAgg(fig)
+    t0 = time.perf_counter()
+    days, series, entradas, saidas = comparison_matrices(data, "Valor")
+    BarChart(fig, ax, canvas).show(days, series, entradas, saidas, "Comparativo", "Valor")
+    canvas.draw()
+    desenho = time.perf_counter() - t0
+    return len(data), 2 * entradas.size, consulta, desenho
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do agrupamento por período e top N do dashboard")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--produtos", type=int, default=40)
+    parser.add_argument("--dias", type=int, default=90)
+    args = parser.parse_args()
+
+    db, _ = criar_banco_sintetico(args.rows, num_produtos=args.produtos, dias=args.dias)
+    first_day, last_day, _ = db.get_summary_extent()
+    automatico = choose_granularity(first_day, last_day, TOP_N + 1)
+    print(f"{args.rows} movimentações, {args.produtos} produtos, {args.dias} dias; automático = {automatico}")
+    print(f"{'':<28}{'linhas':>8}{'barras':>8}{'consulta (ms)':>15}{'desenho (s)':>13}")
+    for rotulo, granularity, top_n in (("por dia, todos os produtos", "dia", None),
+                                       (f"{automatico}, top {TOP_N} + Outros", automatico, TOP_N)):
+        linhas, barras, consulta, desenho = _medir(db, granularity, top_n)
+        print(f"{rotulo:<28}{linhas:>8}{barras:>8}{consulta * 1000:>15.1f}{desenho:>13.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
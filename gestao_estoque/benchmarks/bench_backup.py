@@ -0,0 +1,117 @@
+# benchmarks/bench_backup.py
+# Backup online do banco: cópia do arquivo (insegura com o aplicativo aberto), API de backup
+# num passo só e em passos de páginas, com e sem manter o snapshot aberto, e o BackupManager
+# completo (integrity_check + gzip), verificação e restauração. Com --escritor, uma thread
+# grava movimentações durante cada cópia para medir a latência das escritas e os recomeços
+# ("desistiu" = passou de MAX_RECOMECOS: a cópia em passos sem snapshot nunca terminaria).
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_backup --rows 1000000 --escritor
+
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+from database.backup import BackupManager
+
+MAX_RECOMECOS = 50
+
+
+class _Escritor(threading.Thread):
+    """Grava uma movimentação a cada ~2 ms e guarda a latência de cada uma."""
+    def __init__(self, db, product_id):
+        super().__init__(daemon=True)
+        self.db = db; self.product_id = product_id
+        self.latencias = []; self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.is_set():
+            t0 = time.perf_counter(); self.db.add_movement(self.product_id, 1, 'entrada', 1, 1.0)
+            self.latencias.append(time.perf_counter() - t0); time.sleep(0.002)
+
+    def parar(self):
+        self._parar.set(); self.join()
+        return self.latencias
+
+
+def _copia_arquivo(db_path, destino):
+    shutil.copyfile(db_path, destino)
+    return 0
+
+
+def _api_backup(db_path, destino, paginas, snapshot):
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True); dst = sqlite3.connect(destino)
+    recomecos = [0, None]
+    def passo(status, restantes, total):
+        if recomecos[1] is not None and restantes > recomecos[1]: recomecos[0] += 1
+        recomecos[1] = restantes
+        if recomecos[0] > MAX_RECOMECOS: raise RuntimeError("desistiu")
+    try:
+        if snapshot: src.execute("BEGIN"); src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        src.backup(dst, pages=paginas, progress=passo)
+        return recomecos[0]
+    finally:
+        if snapshot: src.rollback()
+        src.close(); dst.close()
+
+
+def _medir(db, product_id, func, escritor):
+    thread = _Escritor(db, product_id) if escritor else None
+    if thread: thread.start(); time.sleep(0.05)
+    t0 = time.perf_counter()
+    try: resultado = func(); erro = None
+    except RuntimeError as e: resultado = None; erro = str(e)
+    segundos = time.perf_counter() - t0
+    latencias = thread.parar() if thread else []
+    return segundos, resultado, erro, latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do backup online")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--paginas", type=int, default=1024, help="Páginas por passo da API de backup")
+    parser.add_argument("--escritor", action="store_true", help="Grava movimentações durante as cópias")
+    args = parser.parse_args()
+
+    db, product_ids = criar_banco_sintetico(args.rows)
+    db.cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    tamanho = os.path.getsize(db.db_path)
+    pasta = tempfile.mkdtemp(prefix="bench_backup_")
+    destino = os.path.join(pasta, "copia.db")
+    manager = BackupManager(db.db_path, pasta, keep=0, pages_per_step=args.paginas)
+    variantes = [
+        ("cópia do arquivo", lambda: _copia_arquivo(db.db_path, destino)),
+        ("backup, passo único", lambda: _api_backup(db.db_path, destino, -1, False)),
+        (f"backup, {args.paginas} pág./passo", lambda: _api_backup(db.db_path, destino, args.paginas, False)),
+        ("  + snapshot aberto", lambda: _api_backup(db.db_path, destino, args.paginas, True)),
+        ("BackupManager (verif.+gzip)", lambda: manager.create_backup()),
+    ]
+    print(f"{args.rows} movimentações, banco de {tamanho / 2**20:.1f} MB" + (", com escritor concorrente" if args.escritor else ""))
+    print(f"{'':<30}{'tempo (s)':>10}{'recomeços':>11}{'escritas':>10}{'lat. média (ms)':>17}{'lat. máx. (ms)':>16}")
+    backup_gz = None
+    for rotulo, func in variantes:
+        if os.path.exists(destino): os.remove(destino)
+        segundos, resultado, erro, latencias = _medir(db, product_ids[0], func, args.escritor)
+        if isinstance(resultado, dict): backup_gz = resultado['path']; resultado = "-"
+        media = f"{statistics.mean(latencias) * 1000:.2f}" if latencias else "-"
+        maxima = f"{max(latencias) * 1000:.2f}" if latencias else "-"
+        print(f"{rotulo:<30}{segundos:>10.2f}{erro or resultado:>11}{len(latencias):>10}{media:>17}{maxima:>16}")
+
+    if backup_gz:
+        print(f"arquivo compactado: {os.path.getsize(backup_gz) / 2**20:.1f} MB")
+        t0 = time.perf_counter(); problemas = manager.verify_backup(backup_gz)
+        print(f"verificação do backup     {time.perf_counter() - t0:8.2f} s  ({'íntegro' if not problemas else problemas[0]})")
+        t0 = time.perf_counter(); manager.restore(backup_gz, safety_backup=False)
+        print(f"restauração               {time.perf_counter() - t0:8.2f} s")
+    db.close()
+    shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_busca.py
+# Busca da aba Produtos: filtro em Python sobre todas as linhas (comportamento antigo)
+# versus search_products (FTS5), simulando a digitação de um termo letra a letra.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_busca --products 100000
+
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+
+
+TIPOS = ["Sabão em Pó", "Detergente", "Refrigerante", "Biscoito", "Arroz", "Feijão", "Shampoo", "Café",
+         "Açúcar", "Leite", "Suco", "Macarrão", "Óleo", "Desinfetante", "Creme Dental", "Sabonete"]
+MARCAS = ["Alfa", "Bravo", "Cometa", "Delta", "Estrela", "Fênix", "Gama", "Horizonte", "Ípsilon", "Júpiter"]
+VARIACOES = ["200g", "500g", "1kg", "2kg", "350ml", "1L", "2L", "Lata", "Refil", "Econômico"]
+
+
+def _popular_produtos(db, quantidade, seed=7):
+    rnd = random.Random(seed)
+    combinacoes = list(itertools.product(TIPOS, MARCAS, VARIACOES))
+    linhas = []
+    for i in range(quantidade):
+        tipo, marca, variacao = combinacoes[i % len(combinacoes)]
+        linhas.append((f"{tipo} {marca} {variacao} #{i}", f"SKU-{i:06d}", f"{tipo} da linha {marca}", rnd.randint(0, 500), 500, f"789{i:010d}"))
+    db.cursor.executemany(
+        "INSERT INTO produtos (nome, codigo_sku, descricao, quantidade, quantidade_inicial, codigo_barra) VALUES (?, ?, ?, ?, ?, ?)", linhas
+    )
+    db.conn.commit()
+
+
+def _filtro_python(all_items, search_term):
+    search_term = search_term.lower()
+    return [item for item in all_items if any(str(value).lower().find(search_term) >= 0 for value in item)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca textual")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--term", default="sabao estrela 500")
+    args = parser.parse_args()
+
+    db, _ = criar_banco_sintetico(0, num_produtos=0)
+    _popular_produtos(db, args.products)
+    prefixos = [args.term[:i] for i in range(3, len(args.term) + 1)]
+
+    # Comportamento antigo: filtra todas as linhas em memória (sem contar a inserção no Treeview,
+    # que era feita para cada linha encontrada).
+    all_items = db.get_all_products()
+    inicio = time.perf_counter()
+    for p in prefixos: _filtro_python(all_items, p)
+    python_ms = (time.perf_counter() - inicio) / len(prefixos) * 1000
+
+    inicio = time.perf_counter()
+    for p in prefixos: resultado = db.search_products(p)
+    fts_ms = (time.perf_counter() - inicio) / len(prefixos) * 1000
+
+    print(f"{args.products} produtos, {len(prefixos)} teclas digitadas ('{args.term}'):")
+    print(f"  filtro em Python:    {python_ms:>8.1f} ms por tecla")
+    print(f"  search_products:     {fts_ms:>8.1f} ms por tecla  ({len(resultado)} resultado(s) no termo completo)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
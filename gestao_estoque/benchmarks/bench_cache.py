@@ -0,0 +1,81 @@
+# benchmarks/bench_cache.py
+# Simula uma sessão de balcão (leituras de código de barras, painel do dashboard e
+# recarga dos combos após cada movimentação) com e sem o cache de cadastros; e o
+# dashboard alternando visões (métrica, pizza/colunas, filtro de produto) com e sem o
+# cache dos resumos, com uma movimentação de vez em quando.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_cache --produtos 5000 --eventos 20000
+
+import argparse
+import random
+import time
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+
+
+def _sessao(db, product_ids, eventos, seed):
+    """Devolve (segundos em buscas por leitura/painel, segundos recarregando listas)."""
+    rnd = random.Random(seed)
+    # Poucos produtos concentram a maior parte das leituras, como num caixa de verdade.
+    populares = product_ids[:max(1, len(product_ids) // 20)]
+    buscas = listas = 0.0
+    for i in range(eventos):
+        pid = rnd.choice(populares) if rnd.random() < 0.8 else rnd.choice(product_ids)
+        t0 = time.perf_counter()
+        db.get_product_by_barcode(f"BAR-{pid}")
+        db.get_product_by_id(pid)
+        buscas += time.perf_counter() - t0
+        if i % 50 == 0:
+            db.add_movement(pid, 1, 'saida', 1, 1.0)
+            t0 = time.perf_counter()
+            # Combos (só nomes) e listas de clientes/fornecedores não mudam com a movimentação.
+            db.get_product_names(); db.get_all_clients(); db.get_all_suppliers()
+            listas += time.perf_counter() - t0
+    return buscas, listas
+
+
+def _dashboard(db, product_ids, trocas, seed):
+    """Segundos gastos nas consultas de `trocas` trocas de visão do dashboard."""
+    rnd = random.Random(seed)
+    # Visões que o usuário alterna: comparativo (dia/mês, com e sem "Outros"), pizza e alguns produtos.
+    visoes = [lambda: db.get_summary_for_all_products(None, None, "mes", 8),
+              lambda: db.get_summary_for_all_products(None, None, "dia", None),
+              lambda: db.get_total_sales_by_product(8)]
+    visoes += [lambda pid=pid: db.get_summary_for_single_product(pid, None, None, "semana") for pid in product_ids[:5]]
+    total = 0.0
+    for i in range(trocas):
+        if i % 25 == 24: db.add_movement(rnd.choice(product_ids), 1, 'saida', 1, 1.0)
+        t0 = time.perf_counter(); rnd.choice(visoes)(); total += time.perf_counter() - t0
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache de cadastros (CatalogCache)")
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--eventos", type=int, default=20000)
+    parser.add_argument("--movimentos", type=int, default=200000, help="histórico do banco usado no teste do dashboard")
+    parser.add_argument("--trocas", type=int, default=300, help="trocas de visão do dashboard")
+    args = parser.parse_args()
+
+    for rotulo, cache_size in (("sem cache", 0), ("com cache", 1024)):
+        db, product_ids = criar_banco_sintetico(1000, num_produtos=args.produtos, cache_size=cache_size)
+        db.cursor.execute("UPDATE produtos SET codigo_barra = 'BAR-' || id"); db.conn.commit()
+        buscas, listas = _sessao(db, product_ids, args.eventos, seed=7)
+        stats = db.cache_stats()
+        print(f"{rotulo:<10} buscas {buscas * 1000:8.1f} ms ({buscas / args.eventos * 1e6:5.1f} µs/evento)  "
+              f"combos/listas {listas * 1000:8.1f} ms  "
+              f"hits={stats['hits']} misses={stats['misses']} evictions={stats['evictions']} taxa={stats['hit_rate']:.0%}")
+        db.close()
+
+    for rotulo, report_cache_size in (("sem cache", 0), ("com cache", 64)):
+        db, product_ids = criar_banco_sintetico(args.movimentos, report_cache_size=report_cache_size)
+        total = _dashboard(db, product_ids, args.trocas, seed=11)
+        stats = db.report_cache_stats()
+        print(f"{rotulo:<10} dashboard {total * 1000:8.1f} ms ({total / args.trocas * 1000:6.2f} ms/troca)  "
+              f"hits={stats['hits']} misses={stats['misses']} taxa={stats['hit_rate']:.0%}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_exportacao.py
+# Exportação CSV com todas as linhas carregadas na memória (fetch_all de cada tabela,
+# como era feito na thread da interface) versus CsvExport lendo em blocos de um snapshot.
+# Mede o tempo e o pico de memória alocada pelo Python (tracemalloc, em rodada separada).
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_exportacao --rows 500000
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+from database.csv_export import EXPORT_TABLES, CsvExport
+
+
+def _tudo_na_memoria(db, export_path):
+    path = os.path.join(export_path, "export_memoria.csv")
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for title, _, headers, query in EXPORT_TABLES:
+            writer.writerow([f"--- DADOS DE {title} ---"]); writer.writerow(headers)
+            writer.writerows(db.fetch_all_readonly(query)); writer.writerow([])
+    return [path]
+
+
+def _medir(func):
+    t0 = time.perf_counter(); paths = func(); segundos = time.perf_counter() - t0
+    tracemalloc.start(); func(); _, pico = tracemalloc.get_traced_memory(); tracemalloc.stop()
+    return segundos, pico, sum(os.path.getsize(p) for p in paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da exportação CSV")
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    db, _ = criar_banco_sintetico(args.rows)
+    export_path = tempfile.mkdtemp(prefix="bench_exportacao_")
+    variantes = [("tudo na memória", lambda: _tudo_na_memoria(db, export_path)),
+                 ("CsvExport", lambda: CsvExport(db, export_path).run()),
+                 ("CsvExport .csv.gz", lambda: CsvExport(db, export_path, compress=True).run())]
+    print(f"{args.rows} movimentações")
+    print(f"{'':<20}{'tempo (s)':>11}{'pico de memória (MB)':>23}{'arquivos (MB)':>15}")
+    for rotulo, func in variantes:
+        segundos, pico, tamanho = _medir(func)
+        print(f"{rotulo:<20}{segundos:>11.2f}{pico / 2**20:>23.1f}{tamanho / 2**20:>15.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_financeiro.py
+# Totais financeiros de todos os produtos (custo, faturamento, itens vendidos e estoque):
+# uma consulta por produto (três subconsultas em movimentacoes mais get_product_by_id,
+# como o painel do dashboard fazia) versus get_financials_for_products numa só passada.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_financeiro --rows 300000 --produtos 500
+
+import argparse
+import time
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+
+CONSULTA_POR_PRODUTO = """
+SELECT
+    (SELECT SUM(preco_transacao * quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'entrada'),
+    (SELECT SUM(preco_transacao * quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'saida'),
+    (SELECT SUM(quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'saida')
+"""
+
+
+def _por_produto(db, product_ids):
+    totais = {}
+    for pid in product_ids:
+        gasto, vendido, itens = db.fetch_one(CONSULTA_POR_PRODUTO, (pid, pid, pid))
+        produto = db.get_product_by_id(pid)
+        totais[pid] = (gasto or 0, vendido or 0, itens or 0, produto[1])
+    return totais
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos totais financeiros por produto")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--produtos", type=int, default=500)
+    args = parser.parse_args()
+
+    # Caches desligados: as duas formas medem o acesso ao banco.
+    db, product_ids = criar_banco_sintetico(args.rows, num_produtos=args.produtos, cache_size=0, report_cache_size=0)
+    t0 = time.perf_counter(); antigo = _por_produto(db, product_ids); t_antigo = time.perf_counter() - t0
+    t0 = time.perf_counter(); novo = db.get_financials_for_products(product_ids); t_novo = time.perf_counter() - t0
+
+    divergentes = [pid for pid in product_ids
+                   if abs(antigo[pid][0] - novo[pid][3]) > 0.01 or abs(antigo[pid][1] - novo[pid][4]) > 0.01 or antigo[pid][2] != novo[pid][5]]
+    print(f"{args.produtos} produtos, {args.rows} movimentações")
+    print(f"uma consulta por produto   {t_antigo * 1000:9.1f} ms ({2 * len(product_ids)} consultas)")
+    print(f"get_financials_for_products{t_novo * 1000:9.1f} ms ({t_antigo / t_novo:.0f}x)  divergências: {len(divergentes)}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
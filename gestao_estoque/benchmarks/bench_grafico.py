@@ -0,0 +1,142 @@
+# benchmarks/bench_grafico.py
+# Tempo por quadro do gráfico de colunas do dashboard (backend Agg, sem janela):
+# troca de métrica recriando os eixos versus ajustando as barras no lugar, e hover
+# redesenhando a figura inteira versus blitting do realce; e hit-testing do mouse com
+# contains() em cada barra versus o índice ordenado (bisect) do BarChart; e preparo do
+# comparativo (agregação + criação das barras) com dicts aninhados e dois ax.bar por
+# produto versus matrizes NumPy e um ax.bar por série.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_grafico --dias 30 --produtos 10
+#     python -m benchmarks.bench_grafico --dias 90 --produtos 50 --sem-desenho
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ui.dashboard_charts import BarChart, comparison_matrices
+
+
+def _matriz(dias, produtos, seed):
+    rnd = random.Random(seed)
+    return np.array([[rnd.uniform(0, 500) for _ in range(produtos)] for _ in range(dias)])
+
+
+def _ms_por_quadro(func, quadros):
+    t0 = time.perf_counter()
+    for i in range(quadros): func(i)
+    return (time.perf_counter() - t0) / quadros * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo por quadro do gráfico de colunas do dashboard")
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--produtos", type=int, default=10)
+    parser.add_argument("--quadros", type=int, default=5)
+    parser.add_argument("--eventos", type=int, default=200, help="movimentos de mouse no hit-testing")
+    parser.add_argument("--sem-desenho", action="store_true", help="pula as medições de desenho (lentas com muitas barras)")
+    args = parser.parse_args()
+
+    fig = Figure(figsize=(8, 4), dpi=100); ax = fig.add_subplot(111); canvas = FigureCanvasAgg(fig)
+    chart = BarChart(fig, ax, canvas)
+    dias = [f"2025-01-{d + 1:02d}" if d < 31 else f"dia {d}" for d in range(args.dias)]
+    series = [(pid, f"Produto {pid:03d}") for pid in range(args.produtos)]
+    # Duas "métricas" alternadas (valor e quantidade) sobre os mesmos dias e produtos.
+    metricas = [(_matriz(args.dias, args.produtos, s), _matriz(args.dias, args.produtos, s + 1)) for s in (1, 2)]
+    print(f"{args.dias} dias x {args.produtos} produtos = {2 * args.dias * args.produtos} barras")
+    _preparo(dias, series, metricas[0], ax, args.quadros)
+    if args.sem_desenho:
+        chart.show(dias, series, *metricas[0], "Métrica", "Valor"); canvas.draw()
+        _hit_test(chart, ax, args.eventos); return
+
+    def troca(i, rebuild):
+        entradas, saidas = metricas[i % 2]
+        chart.show(dias, series, entradas, saidas, f"Métrica {i % 2}", "Valor", rebuild=rebuild)
+        canvas.draw()
+
+    recriando = _ms_por_quadro(lambda i: troca(i, True), args.quadros)
+    no_lugar = _ms_por_quadro(lambda i: troca(i, False), args.quadros)
+    print(f"troca de métrica  recriando eixos {recriando:8.1f} ms/quadro   barras no lugar {no_lugar:8.1f} ms/quadro  ({recriando / no_lugar:.1f}x)")
+
+    def hover_redesenhando(i):
+        # Como era antes: reestiliza todas as barras com o produto realçado e redesenha a figura.
+        pid = i % args.produtos
+        for info in chart.metadata:
+            for bar in (info['bar_e'], info['bar_s']): bar.set_alpha(1.0 if info['pid'] == pid else 0.6)
+        canvas.draw()
+
+    redesenho = _ms_por_quadro(hover_redesenhando, args.quadros)
+    chart.apply_styles(); canvas.draw()  # draw_event salva o fundo usado pelo blit
+    blit = _ms_por_quadro(lambda i: chart.highlight(i % args.produtos), args.quadros)
+    print(f"hover             figura inteira  {redesenho:8.1f} ms/quadro   blit            {blit:8.1f} ms/quadro  ({redesenho / blit:.1f}x)")
+    _hit_test(chart, ax, args.eventos)
+
+
+def _hit_test(chart, ax, eventos):
+    if eventos <= 0: return
+    rnd = random.Random(3)
+    (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+    pontos = [(rnd.uniform(x0, x1), rnd.uniform(y0, y1)) for _ in range(eventos)]
+    # Eventos como os do matplotlib: pixels (x, y) para contains() e dados (xdata, ydata) para o índice.
+    mouse = [SimpleNamespace(x=px, y=py, xdata=x, ydata=y) for (x, y), (px, py) in zip(pontos, ax.transData.transform(pontos))]
+
+    def linear(event):
+        for info in chart.metadata:
+            if info['bar_e'].contains(event)[0] or info['bar_s'].contains(event)[0]: return info
+        return None
+
+    t0 = time.perf_counter(); esperado = [linear(e) for e in mouse]; t_linear = time.perf_counter() - t0
+    t0 = time.perf_counter(); obtido = [chart.hit_test(e.xdata, e.ydata)[0] for e in mouse]; t_bisect = time.perf_counter() - t0
+    divergentes = sum(a is not b for a, b in zip(esperado, obtido))
+    print(f"hit-testing       contains()      {t_linear / eventos * 1e6:8.1f} µs/evento  bisect          {t_bisect / eventos * 1e6:8.1f} µs/evento  "
+          f"({t_linear / t_bisect:.0f}x, {divergentes} divergências em {eventos})")
+
+
+
+def _agregacao_antiga(data):
+    # Como _plot_all_products_comparison fazia antes: dicts aninhados e listas por produto.
+    data_map = defaultdict(lambda: defaultdict(lambda: {'valor_e': 0, 'valor_s': 0, 'qtd_e': 0, 'qtd_s': 0}))
+    product_names = {}; all_days = set()
+    for day, pid, name, ve, vs, qe, qs in data:
+        data_map[day][pid] = {'valor_e': ve, 'valor_s': vs, 'qtd_e': qe, 'qtd_s': qs}
+        product_names[pid] = name; all_days.add(day)
+    days = sorted(all_days); product_ids = sorted(product_names)
+    entradas = [[data_map[day][pid]['valor_e'] for day in days] for pid in product_ids]
+    saidas = [[data_map[day][pid]['valor_s'] for day in days] for pid in product_ids]
+    return days, product_ids, entradas, saidas
+
+
+def _preparo(dias, series, matrizes, ax, repeticoes):
+    entradas, saidas = matrizes
+    data = [(dia, pid, nome, entradas[j, i], saidas[j, i], int(entradas[j, i]), int(saidas[j, i]))
+            for j, dia in enumerate(dias) for i, (pid, nome) in enumerate(series)]
+    t_antigo = _ms_por_quadro(lambda _: _agregacao_antiga(data), repeticoes)
+    t_novo = _ms_por_quadro(lambda _: comparison_matrices(data, "Valor"), repeticoes)
+    print(f"agregação         dicts aninhados {t_antigo:8.1f} ms          matrizes NumPy  {t_novo:8.1f} ms          ({t_antigo / t_novo:.1f}x)")
+
+    # Criação das barras com as mesmas posições: dois ax.bar por produto versus um por série.
+    x = np.arange(len(dias)); n = len(series); bar_width = 0.8 / (n * 2)
+    offsets = (np.arange(n) - (n - 1) / 2) * (bar_width * 2.2)
+
+    def por_produto(_):
+        ax.clear()
+        for i in range(n):
+            ax.bar(x + offsets[i] - bar_width / 2, entradas[:, i], bar_width); ax.bar(x + offsets[i] + bar_width / 2, saidas[:, i], bar_width)
+
+    def por_serie(_):
+        ax.clear(); centers = (x[:, None] + offsets[None, :]).ravel()
+        ax.bar(centers - bar_width / 2, entradas.ravel(), bar_width); ax.bar(centers + bar_width / 2, saidas.ravel(), bar_width)
+
+    t_antigo = _ms_por_quadro(por_produto, repeticoes); t_novo = _ms_por_quadro(por_serie, repeticoes)
+    print(f"criação de barras 2 ax.bar/produto {t_antigo:7.1f} ms          1 ax.bar/série  {t_novo:8.1f} ms          ({t_antigo / t_novo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_importacao.py
+# Mede com `python -X importtime` o custo de import do caminho até a tela de login
+# (`main`) e da janela principal, e confere que nenhum módulo pesado vazou para o login.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_importacao --orcamento-login-ms 400
+# Sai com código 1 se o login passar do orçamento ou importar um módulo pesado.
+
+import argparse
+import subprocess
+import sys
+
+from ui.preload import HEAVY_MODULES
+
+ALVOS = [("tela de login", "main"), ("janela principal", "ui.main_app_window")]
+
+
+def _importtime(modulo, checar_vazamento=False):
+    """Roda um interpretador novo importando `modulo`; devolve ([(self_us, cumul_us, nivel, nome)], vazados)."""
+    codigo = f"import sys, {modulo}"
+    if checar_vazamento:
+        codigo += f"; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}:\n{proc.stderr[-2000:]}")
+    linhas = []
+    for linha in proc.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha: continue
+        self_us, cumul_us, nome = linha[len("import time:"):].split("|", 2)
+        nivel = (len(nome) - len(nome.lstrip())) // 2
+        linhas.append((int(self_us), int(cumul_us), nivel, nome.strip()))
+    vazados = [m for m in proc.stdout.strip().split(",") if m] if checar_vazamento else []
+    return linhas, vazados
+
+
+def _total_us(linhas, modulo):
+    # Linhas de nível 0 são o próprio alvo (e seus pacotes pais); o resto da inicialização
+    # do interpretador (site, encodings...) fica de fora.
+    return sum(c for _, c, nivel, nome in linhas if nivel == 0 and (nome == modulo or modulo.startswith(nome + ".")))
+
+
+def _linhas_do_alvo(linhas, modulo):
+    # -X importtime escreve cada módulo depois das suas dependências; as linhas que
+    # antecedem uma linha de nível 0 do alvo são a árvore de imports dele.
+    alvo, bloco = [], []
+    for linha in linhas:
+        bloco.append(linha)
+        if linha[2] == 0:
+            if linha[3] == modulo or modulo.startswith(linha[3] + "."): alvo.extend(bloco)
+            bloco = []
+    return alvo
+
+
+def _por_pacote(linhas):
+    """Tempo próprio (self) somado por pacote raiz: mostra quem pesa (matplotlib, numpy...)."""
+    soma = {}
+    for self_us, _, _, nome in linhas:
+        raiz = nome.split(".")[0]; soma[raiz] = soma.get(raiz, 0) + self_us
+    return sorted(soma.items(), key=lambda item: -item[1])
+
+
+def _melhor_de(modulo, repeticoes, checar_vazamento=False):
+    # O primeiro import ainda paga a leitura dos .pyc do disco; fica a menor das medições.
+    resultados = [_importtime(modulo, checar_vazamento) for _ in range(repeticoes)]
+    return min(resultados, key=lambda r: _total_us(r[0], modulo))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de import (python -X importtime) do login e da janela principal")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--orcamento-login-ms", type=float, default=None, help="falha se o import do login passar deste tempo")
+    args = parser.parse_args()
+
+    falhou = False
+    for rotulo, modulo in ALVOS:
+        linhas, vazados = _melhor_de(modulo, args.repeat, checar_vazamento=(modulo == "main"))
+        total_ms = _total_us(linhas, modulo) / 1000
+        print(f"\n{rotulo} (import {modulo}): {total_ms:.1f} ms")
+        for pacote, self_us in _por_pacote(_linhas_do_alvo(linhas, modulo))[:args.top]:
+            print(f"    {self_us / 1000:8.1f} ms  {pacote}")
+        if vazados:
+            falhou = True; print(f"  ERRO: módulos pesados importados antes do login: {', '.join(vazados)}")
+        if modulo == "main" and args.orcamento_login_ms is not None and total_ms > args.orcamento_login_ms:
+            falhou = True; print(f"  ERRO: acima do orçamento de {args.orcamento_login_ms:.0f} ms")
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_indices.py
+# Compara as consultas mais usadas do DatabaseManager com e sem os índices de movimentacoes.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_indices --rows 1000000
+
+import argparse
+import time
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+
+INDICES = ["idx_mov_item_tipo_data", "idx_mov_item_data", "idx_mov_data_hora"]
+
+
+def _tempo(func, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes): func()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def _consultas(db, pid):
+    return {
+        "get_movements_for_product": lambda: db.get_movements_for_product(pid, "saida"),
+        "get_summary_for_single_product": lambda: db.get_summary_for_single_product(pid),
+        "get_product_financials": lambda: db.get_product_financials(pid),
+        "get_inactive_products": lambda: db.get_inactive_products(20),
+        "get_all_movements": lambda: db.get_all_movements(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos índices de movimentacoes")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Gerando {args.rows} movimentações sintéticas...")
+    db, product_ids = criar_banco_sintetico(args.rows, report_cache_size=0)
+    pid = product_ids[len(product_ids) // 2]
+
+    depois = {nome: _tempo(f, args.repeat) for nome, f in _consultas(db, pid).items()}
+    for idx in INDICES: db.cursor.execute(f"DROP INDEX IF EXISTS {idx}")
+    db.analyze()
+    antes = {nome: _tempo(f, args.repeat) for nome, f in _consultas(db, pid).items()}
+
+    print(f"\n{'Consulta':<34}{'sem índices (ms)':>18}{'com índices (ms)':>18}{'ganho':>9}")
+    for nome in depois:
+        print(f"{nome:<34}{antes[nome]:>18.1f}{depois[nome]:>18.1f}{antes[nome] / max(depois[nome], 1e-6):>8.1f}x")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/bench_lote_movimentacoes.py
+# Movimentações por segundo: uma chamada de add_movement por item versus add_movements_batch.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_lote_movimentacoes --skus 500
+
+import argparse
+import time
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do registro de movimentações em lote")
+    parser.add_argument("--skus", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=100_000, help="Tamanho do histórico pré-existente")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db, product_ids = criar_banco_sintetico(args.rows, num_produtos=args.skus)
+    entrega = [(pid, 'entrada', 10, 5.0, None, None) for pid in product_ids]
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeat):
+        for pid, tipo, qtd, preco, cli, forn in entrega:
+            db.add_movement(pid, 1, tipo, qtd, preco, cli, forn)
+    individual = len(entrega) * args.repeat / (time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeat):
+        results = db.add_movements_batch(1, entrega)
+        assert all(r == "Sucesso" for r in results), results[:5]
+    lote = len(entrega) * args.repeat / (time.perf_counter() - inicio)
+
+    assert not db.check_daily_summary(), "resumo_diario divergente do histórico"
+    print(f"Entrega de {len(entrega)} SKUs ({args.repeat}x):")
+    print(f"  add_movement (uma chamada por item): {individual:>10.0f} movimentações/s")
+    print(f"  add_movements_batch:                 {lote:>10.0f} movimentações/s  ({lote / individual:.1f}x)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
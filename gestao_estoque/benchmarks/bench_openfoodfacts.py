@@ -0,0 +1,121 @@
+# benchmarks/bench_openfoodfacts.py
+# Consulta ao OpenFoodFacts contra um servidor local que imita a API (latência configurável):
+# como era (até quatro requisições novas por código, sem cache) versus ProductLookup com o
+# cache vazio, com o cache cheio (releituras), e com o servidor fora do ar (timeout), em que
+# só a primeira consulta espera e as demais respondem do cache ou na hora.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_openfoodfacts --codigos 40 --latencia-ms 150
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+from database.product_lookup import ProductLookup
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latencia, conhecidos):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latencia = latencia; self.conhecidos = conhecidos; self.fora_do_ar = False; self.requisicoes = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como o servidor real
+    disable_nagle_algorithm = True  # cabeçalho e corpo saem em dois send(): sem isso, +40 ms (ACK atrasado) por resposta
+
+    def do_GET(self):
+        self.server.requisicoes += 1
+        time.sleep(60 if self.server.fora_do_ar else self.server.latencia)
+        codigo = re.search(r"/product/(\w+)\.json", self.path).group(1)
+        produto = self.server.conhecidos.get(codigo)
+        corpo = json.dumps({"status": 1, "product": produto} if produto else {"status": 0}).encode()
+        self.send_response(200); self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo))); self.end_headers(); self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _como_era(url, code):
+    # fetch_openfoodfacts_product antes do cache: cada forma do código numa requisição nova.
+    def _try_code(c):
+        try:
+            resp = requests.get(url.format(code=c), timeout=6)
+            if resp.status_code != 200: return None
+            data = resp.json()
+            return data.get('product', {}) if data.get('status') == 1 else None
+        except Exception:
+            return None
+    orig = str(code or '').strip(); digits = re.sub(r'\D', '', orig); candidates = []
+    if digits:
+        candidates.append(digits)
+        if len(digits) == 12: candidates.append('0' + digits)
+        if len(digits) == 13 and digits.startswith('0'): candidates.append(digits[1:])
+        if len(digits) < 12: candidates.append(digits.zfill(12)); candidates.append(digits.zfill(13))
+    if orig not in candidates: candidates.insert(0, orig)
+    for c in dict.fromkeys(candidates):
+        prod = _try_code(c)
+        if prod: return prod
+    return None
+
+
+def _medir(func, codigos):
+    tempos = []
+    for codigo in codigos:
+        t0 = time.perf_counter(); func(codigo); tempos.append(time.perf_counter() - t0)
+    return sum(tempos), max(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache de consultas ao OpenFoodFacts")
+    parser.add_argument("--codigos", type=int, default=40, help="Códigos distintos (metade existe no servidor)")
+    parser.add_argument("--latencia-ms", type=float, default=150, help="Latência de cada resposta do servidor local")
+    parser.add_argument("--timeout", type=float, default=2, help="Timeout do ProductLookup com o servidor fora do ar")
+    args = parser.parse_args()
+
+    # Metade dos códigos existe; os inexistentes têm 12 dígitos (UPC-A), então cada um custa duas requisições.
+    codigos = [f"789{i:010d}" if i % 2 == 0 else f"12{i:010d}" for i in range(args.codigos)]
+    conhecidos = {c: {"product_name": f"Produto {c}", "brands": "Marca", "quantity": "500 g"} for c in codigos[::2]}
+    servidor = _Servidor(args.latencia_ms / 1000, conhecidos)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_port}/api/v0/product/{{code}}.json"
+    db, _ = criar_banco_sintetico(1000)
+    lookup = ProductLookup(db, url=url, timeout=args.timeout, retry_seconds=30)
+
+    print(f"{len(codigos)} códigos ({len(conhecidos)} existentes), servidor local com {args.latencia_ms:.0f} ms por resposta")
+    print(f"{'':<34}{'total (s)':>10}{'máx. por código (ms)':>22}{'requisições':>13}")
+    variantes = [("como era (sem cache)", lambda c: _como_era(url, c)),
+                 ("ProductLookup, cache vazio", lookup.lookup),
+                 ("ProductLookup, releitura", lookup.lookup),
+                 ("como era, releitura", lambda c: _como_era(url, c))]
+    for rotulo, func in variantes:
+        antes = servidor.requisicoes
+        total, maximo = _medir(func, codigos)
+        print(f"{rotulo:<34}{total:>10.2f}{maximo * 1000:>22.1f}{servidor.requisicoes - antes:>13}")
+    print(f"  estatísticas do cache: {lookup.stats()}")
+
+    # Terminal sem conexão: entradas vencidas, servidor que não responde dentro do timeout.
+    db.execute_query("UPDATE cache_openfoodfacts SET consultado_em = '2000-01-01 00:00:00'")
+    servidor.fora_do_ar = True
+    novos = [f"555{i:010d}" for i in range(5)]
+    total, maximo = _medir(lookup.lookup, codigos + novos)
+    encontrados = sum(1 for c in codigos if lookup.lookup(c)[0])
+    print(f"{'servidor fora do ar (cache vencido)':<34}{total:>10.2f}{maximo * 1000:>22.1f}{'-':>13}"
+          f"   {encontrados} de {len(conhecidos)} existentes ainda resolvidos pelo cache")
+    lookup.offline = True; lookup._paused_until = 0
+    total, maximo = _medir(lookup.lookup, codigos)
+    print(f"{'modo offline':<34}{total:>10.2f}{maximo * 1000:>22.1f}{'-':>13}")
+    servidor.shutdown(); db.close()
+
+
+if __name__ == "__main__":
+    main()
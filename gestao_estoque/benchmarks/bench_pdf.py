@@ -0,0 +1,74 @@
+# benchmarks/bench_pdf.py
+# Relatório PDF do dashboard: como era feito (gráfico salvo a 300 dpi num PNG fixo no disco
+# e um único Table com todo o resumo) versus PdfReport (PNG em memória e PagedTable, um
+# LongTable por página com o cabeçalho repetido), para resumos de tamanhos crescentes.
+# O modo antigo rodava inteiro na thread da interface; o PdfReport roda no DbWorker e
+# redesenha o gráfico numa figura própria (por isso é mais lento em relatórios pequenos).
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_pdf --linhas 1000 5000 10000
+
+import argparse
+import os
+import tempfile
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, SimpleDocTemplate, Table
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+from ui.dashboard_charts import BarChart, comparison_matrices
+from ui.pdf_report import PdfReport, table_style
+
+CABECALHO = ["Data", "Produto", "Valor Entrada", "Valor Saida", "Qtd Entrada", "Qtd Saida"]
+LARGURAS = [1.2 * inch, 2.5 * inch, 1.2 * inch, 1.2 * inch, 0.8 * inch, 0.8 * inch]
+
+
+def _linhas(resumo):
+    return [[day, name, f"R$ {ve:.2f}", f"R$ {vs:.2f}", str(qe), str(qs)] for day, pid, name, ve, vs, qe, qs in resumo]
+
+
+def _antigo(chart, resumo, pasta):
+    png = os.path.join(pasta, "temp_dashboard_graph.png")
+    chart.fig.savefig(png, dpi=300, bbox_inches='tight')
+    img = Image(png); img.drawWidth = 6.5 * inch; img.drawHeight = img.drawWidth * img.imageHeight / float(img.imageWidth)
+    tbl = Table([CABECALHO] + _linhas(resumo), colWidths=LARGURAS); tbl.setStyle(table_style(2))
+    SimpleDocTemplate(os.path.join(pasta, "antigo.pdf")).build([img, tbl])
+    os.remove(png)
+
+
+def _novo(chart, resumo, pasta):
+    report = PdfReport(os.path.join(pasta, "novo.pdf"), "Relatório")
+    report.add_chart(BarChart, chart.last_call)
+    report.add_table("Resumo", CABECALHO, lambda: _linhas(resumo), LARGURAS, align_from_col=2)
+    report.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do relatório PDF")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--rows", type=int, default=200_000, help="Movimentações do banco sintético")
+    args = parser.parse_args()
+
+    db, _ = criar_banco_sintetico(args.rows)
+    resumo_completo = db.get_summary_for_all_products(None, None)
+    grafico = db.get_summary_for_all_products(None, None, "mes", 8)
+    fig = Figure(figsize=(8, 4)); chart = BarChart(fig, fig.add_subplot(111), FigureCanvasAgg(fig))
+    days, series, entradas, saidas = comparison_matrices(grafico, "Valor")
+    chart.show(days, series, entradas, saidas, "Comparativo", "R$")
+    pasta = tempfile.mkdtemp(prefix="bench_pdf_")
+
+    print(f"{'linhas':>8}{'Table + PNG em disco (s)':>27}{'PdfReport no worker (s)':>26}{'páginas':>9}")
+    for n in args.linhas:
+        resumo = resumo_completo[:n]
+        t0 = time.perf_counter(); _antigo(chart, resumo, pasta); antigo = time.perf_counter() - t0
+        t0 = time.perf_counter(); _novo(chart, resumo, pasta); novo = time.perf_counter() - t0
+        paginas = open(os.path.join(pasta, "novo.pdf"), 'rb').read().count(b'/Type /Page\n')
+        print(f"{len(resumo):>8}{antigo:>27.2f}{novo:>26.2f}{paginas:>9}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
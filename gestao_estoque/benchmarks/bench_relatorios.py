@@ -0,0 +1,45 @@
+# benchmarks/bench_relatorios.py
+# Relatórios PDF por produto gerados pelo relatorios.py: um processo só versus o pool de
+# processos com 2, 4... processos. Cada relatório é CPU puro (matplotlib + reportlab), então
+# o ganho acompanha o número de núcleos livres; numa máquina de um núcleo não há ganho.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_relatorios --produtos 32 --processos 1 2 4
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+from relatorios import gerar_relatorios_produtos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos relatórios por produto em paralelo")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--produtos", type=int, default=32)
+    parser.add_argument("--dias", type=int, default=60, help="Faixa de cada relatório (os últimos N dias)")
+    parser.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    db, _ = criar_banco_sintetico(args.rows, num_produtos=args.produtos)
+    produtos = db.get_product_names(); db_path = db.db_path; db.close()
+    fim = date.today().isoformat(); inicio = (date.today() - timedelta(days=args.dias - 1)).isoformat()
+    print(f"{len(produtos)} produtos, {args.rows} movimentações, {os.cpu_count()} núcleo(s)")
+    print(f"{'processos':>10}{'tempo (s)':>11}{'por relatório (ms)':>20}{'ganho':>8}")
+    base = None
+    for processos in args.processos:
+        pasta = tempfile.mkdtemp(prefix="bench_relatorios_")
+        t0 = time.perf_counter()
+        caminhos = gerar_relatorios_produtos(db_path, produtos, pasta, inicio, fim, processos=processos)
+        segundos = time.perf_counter() - t0; base = base or segundos
+        assert len(caminhos) == len(produtos) and all(os.path.getsize(c) for c in caminhos)
+        print(f"{processos:>10}{segundos:>11.2f}{segundos / len(caminhos) * 1000:>20.0f}{base / segundos:>7.1f}x")
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/bench_resumo_diario.py
+# Latência das consultas do dashboard lendo resumo_diario versus agregando movimentacoes,
+# para históricos de tamanhos crescentes.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_resumo_diario --rows 100000 300000 1000000
+
+import argparse
+import time
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+
+AGREGACAO_HISTORICO = """
+SELECT m.dia, m.id_item, p.nome,
+    SUM(CASE WHEN m.tipo = 'entrada' THEN m.quantidade * m.preco_transacao ELSE 0 END),
+    SUM(CASE WHEN m.tipo = 'saida' THEN m.quantidade * m.preco_transacao ELSE 0 END),
+    SUM(CASE WHEN m.tipo = 'entrada' THEN m.quantidade ELSE 0 END),
+    SUM(CASE WHEN m.tipo = 'saida' THEN m.quantidade ELSE 0 END)
+FROM movimentacoes m JOIN produtos p ON m.id_item = p.id
+GROUP BY m.dia, m.id_item ORDER BY m.dia ASC, p.nome ASC
+"""
+
+
+def _tempo(func, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes): func()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do resumo_diario")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Movimentações':>14}{'agregando histórico (ms)':>27}{'resumo_diario (ms)':>21}{'add_movement (ms)':>20}")
+    for rows in args.rows:
+        db, product_ids = criar_banco_sintetico(rows, report_cache_size=0)
+        historico = _tempo(lambda: db.fetch_all(AGREGACAO_HISTORICO), args.repeat)
+        resumo = _tempo(db.get_summary_for_all_products, args.repeat)
+        escrita = _tempo(lambda: db.add_movement(product_ids[0], 1, 'entrada', 1, 10.0), 50)
+        assert not db.check_daily_summary(), "resumo_diario divergente do histórico"
+        print(f"{rows:>14}{historico:>27.1f}{resumo:>21.1f}{escrita:>20.2f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
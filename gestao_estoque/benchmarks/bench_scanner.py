@@ -0,0 +1,159 @@
+# benchmarks/bench_scanner.py
+# Scanner contínuo sem câmera: um vídeo sintético (ou --arquivo, vídeo ou pasta de imagens)
+# com códigos EAN-13 passando na frente da "câmera", lido pelo FileFrameSource.
+#   1. vazão do BarcodeScanner decodificando o quadro inteiro versus só o recorte do alvo;
+#   2. sessão simulada no relógio do vídeo: leituras brutas, itens contados pelo
+#      ScanDeduplicator e itens esperados (quadros perdidos no meio de um item não o duplicam);
+#   3. gravação do carrinho: uma movimentação por leitura (o fluxo antigo, uma janela por
+#      item) versus ScanCart.commit, uma transação para o carrinho inteiro.
+#
+# Uso (dentro de gestao_estoque/):
+#     python -m benchmarks.bench_scanner --itens 30 --fps 30
+#     python -m benchmarks.bench_scanner --arquivo caminho/video.mp4
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks._dados_sinteticos import criar_banco_sintetico
+from ui.barcode_scanner import ROI, BarcodeScanner, FileFrameSource, decode_barcodes, prepare_roi, roi_bounds
+from ui.scan_cart import ScanCart, ScanDeduplicator
+
+QUADRO = (1280, 720)
+_L = ["0001101", "0011001", "0010011", "0111101", "0100011", "0110001", "0101111", "0111011", "0110111", "0001011"]
+_G = [code[::-1].translate(str.maketrans("01", "10")) for code in _L]
+_R = [code.translate(str.maketrans("01", "10")) for code in _L]
+_PARIDADE = ["LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG", "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL"]
+
+
+def ean13(doze_digitos):
+    soma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(doze_digitos))
+    return doze_digitos + str((10 - soma % 10) % 10)
+
+
+def _modulos(codigo):
+    digitos = [int(d) for d in codigo]
+    esquerda = "".join((_L if p == "L" else _G)[d] for p, d in zip(_PARIDADE[digitos[0]], digitos[1:7]))
+    return "101" + esquerda + "01010" + "".join(_R[d] for d in digitos[7:]) + "101"
+
+
+def _quadro_com_codigo(fundo, codigo, modulo_px=4):
+    quadro = fundo.copy()
+    barras = np.array([0 if m == "1" else 255 for m in "0" * 10 + _modulos(codigo) + "0" * 10], dtype=np.uint8)
+    largura = barras.size * modulo_px; altura = int(QUADRO[1] * 0.25)
+    imagem = np.repeat(np.repeat(barras[None, :], altura, axis=0), modulo_px, axis=1)
+    x = (QUADRO[0] - largura) // 2; y = (QUADRO[1] - altura) // 2
+    quadro[y:y + altura, x:x + largura] = imagem[:, :, None]
+    return quadro
+
+
+def gerar_video(caminho, codigos, fps, quadros_item, quadros_intervalo, falhas=4, seed=42):
+    """Grava um vídeo MJPG em que cada código aparece `quadros_item` quadros, com um quadro
+    a cada `falhas` sem o código (borrado/fora de foco), seguido de `quadros_intervalo` vazios."""
+    rnd = np.random.default_rng(seed)
+    gradiente = np.linspace(150, 220, QUADRO[0], dtype=np.float32)[None, :].repeat(QUADRO[1], axis=0)
+    fundo = np.clip(gradiente[:, :, None] + rnd.normal(0, 6, (QUADRO[1], QUADRO[0], 1)), 0, 255).astype(np.uint8).repeat(3, axis=2)
+    writer = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*"MJPG"), fps, QUADRO)
+    for codigo in codigos:
+        com_codigo = _quadro_com_codigo(fundo, codigo)
+        for i in range(quadros_item): writer.write(fundo if falhas and i % falhas == falhas - 1 else com_codigo)
+        for _ in range(quadros_intervalo): writer.write(fundo)
+    writer.release()
+
+
+def vazao(caminho, roi, max_width):
+    scanner = BarcodeScanner(FileFrameSource(caminho), roi=roi, max_width=max_width, drop_frames=False)
+    t0 = time.perf_counter(); scanner.start(); scanner.wait(); segundos = time.perf_counter() - t0
+    leituras = scanner.results.qsize(); stats = scanner.stats(); scanner.stop()
+    return stats['frames'] / segundos, stats['decode_ms'], leituras, segundos
+
+
+def sessao(caminho, fps, janela):
+    """Decodifica cada quadro e deduplica no relógio do vídeo (quadro i acontece em i/fps)."""
+    source = FileFrameSource(caminho); dedup = ScanDeduplicator(janela)
+    quadros = leituras = aceitos = 0
+    t0 = time.perf_counter()
+    while True:
+        ok, frame = source.read()
+        if not ok: break
+        for codigo in decode_barcodes(prepare_roi(frame)):
+            leituras += 1; aceitos += dedup.accept(codigo, now=quadros / fps)
+        quadros += 1
+    source.release()
+    return quadros, leituras, aceitos, dedup.repeated, time.perf_counter() - t0
+
+
+def gravacao(unidades, produtos_no_carrinho):
+    db, product_ids = criar_banco_sintetico(10_000)
+    ids = product_ids[:produtos_no_carrinho]
+    codigos = {pid: ean13(f"789{pid:09d}") for pid in ids}
+    db.cursor.executemany("UPDATE produtos SET codigo_barra = ? WHERE id = ?", [(c, pid) for pid, c in codigos.items()]); db.conn.commit()
+    leituras = [codigos[random.Random(7 + i).choice(ids)] for i in range(unidades)]
+
+    t0 = time.perf_counter()
+    for codigo in leituras:
+        db.add_movement(db.get_product_by_barcode(codigo)[0], 1, 'entrada', 1, 9.9)
+    por_leitura = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cart = ScanCart(db)
+    for codigo in leituras: cart.add(codigo)
+    montagem = time.perf_counter() - t0
+    salvos, recusados = cart.commit(1)
+    carrinho = time.perf_counter() - t0
+    db.close()
+    return por_leitura, montagem, carrinho, salvos, recusados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do scanner contínuo alimentado por arquivo")
+    parser.add_argument("--arquivo", help="Vídeo ou pasta de imagens (padrão: vídeo sintético)")
+    parser.add_argument("--itens", type=int, default=30, help="Itens no vídeo sintético")
+    parser.add_argument("--produtos", type=int, default=8, help="Produtos distintos no vídeo sintético")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--quadros-item", type=int, default=12, help="Quadros em que cada item fica na frente da câmera")
+    parser.add_argument("--quadros-intervalo", type=int, default=40, help="Quadros vazios entre um item e o próximo")
+    parser.add_argument("--janela", type=float, default=1.0, help="Janela de deduplicação (s)")
+    parser.add_argument("--unidades", type=int, default=500, help="Leituras no teste de gravação do carrinho")
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="bench_scanner_")
+    caminho = args.arquivo; esperados = None
+    if not caminho:
+        rnd = random.Random(42)
+        produtos = [ean13(f"789{i:09d}") for i in range(1, args.produtos + 1)]
+        codigos = [rnd.choice(produtos) for _ in range(args.itens)]
+        caminho = os.path.join(pasta, "sintetico.avi")
+        t0 = time.perf_counter(); gerar_video(caminho, codigos, args.fps, args.quadros_item, args.quadros_intervalo)
+        esperados = len(codigos)
+        print(f"vídeo sintético: {esperados} itens, {esperados * (args.quadros_item + args.quadros_intervalo)} quadros "
+              f"{QUADRO[0]}x{QUADRO[1]} ({time.perf_counter() - t0:.1f} s para gerar)")
+
+    print(f"\n{'decodificação':<28}{'quadros/s':>10}{'ms/quadro':>11}{'leituras':>10}{'tempo (s)':>11}")
+    for rotulo, roi, largura in (("quadro inteiro", (0, 0, 1, 1), QUADRO[0]), ("recorte do alvo", ROI, 640)):
+        quadros_s, decode_ms, leituras, segundos = vazao(caminho, roi, largura)
+        print(f"{rotulo:<28}{quadros_s:>10.1f}{decode_ms:>11.2f}{leituras:>10}{segundos:>11.2f}")
+
+    quadros, leituras, aceitos, repetidos, segundos = sessao(caminho, args.fps, args.janela)
+    duracao = quadros / args.fps
+    print(f"\nsessão a {args.fps:.0f} fps, janela de {args.janela:.1f} s: {quadros} quadros ({duracao:.1f} s de vídeo) "
+          f"processados em {segundos:.1f} s ({duracao / segundos:.1f}x o tempo real)")
+    print(f"  leituras brutas {leituras}, itens contados {aceitos}, repetições ignoradas {repetidos}"
+          + (f", itens esperados {esperados}" if esperados is not None else ""))
+
+    por_leitura, montagem, carrinho, salvos, recusados = gravacao(args.unidades, args.produtos)
+    print(f"\ngravação de {args.unidades} leituras de {args.produtos} produtos:")
+    print(f"  uma movimentação por leitura     {por_leitura * 1000:9.1f} ms")
+    print(f"  carrinho + uma transação         {carrinho * 1000:9.1f} ms  (montagem {montagem * 1000:.1f} ms, "
+          f"{salvos} linha(s) gravada(s), {recusados} recusada(s))")
+    shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
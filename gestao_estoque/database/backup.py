@@ -0,0 +1,179 @@
+# database/backup.py
+
+import glob
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+class BackupError(Exception):
+    pass
+
+
+def check_integrity(path):
+    """Roda PRAGMA integrity_check num arquivo .db e devolve a lista de problemas (vazia = íntegro)."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = [r[0] for r in conn.execute("PRAGMA integrity_check").fetchall()]
+    except sqlite3.DatabaseError as e:
+        return [str(e)]
+    finally:
+        conn.close()
+    return [] if rows == ["ok"] else rows
+
+
+def _remove_db(path):
+    for p in (path, path + "-wal", path + "-shm", path + "-journal"):
+        if os.path.exists(p): os.remove(p)
+
+
+class BackupManager:
+    """Backups do banco com a API de backup do SQLite, sem parar o aplicativo.
+
+    A cópia é feita em passos de `pages_per_step` páginas dentro de uma transação de leitura
+    mantida aberta do início ao fim: em WAL ninguém espera por ela (escritas continuam indo
+    para o -wal) e o backup sai do mesmo snapshot, sem recomeçar a cada gravação. Entre os
+    passos a thread dorme `step_sleep` segundos, deixando disco livre para a aplicação.
+    Cada cópia é conferida com PRAGMA integrity_check antes de ir para `backup_path`
+    (compactada com gzip, se `compress`), e só as `keep` mais recentes são mantidas.
+    `pages_done`/`pages_total`/`stage` e `cancel()` podem ser usados de outra thread, como em CsvExport.
+    """
+    COMPRESS_LEVEL = 1  # ~3x mais rápido que o padrão 6 e o arquivo só ~10% maior (bench_backup)
+
+    def __init__(self, db_path, backup_path, keep=7, compress=True, pages_per_step=1024, step_sleep=0.0):
+        self.db_path = db_path
+        self.backup_path = backup_path
+        self.keep = keep
+        self.compress = compress
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.prefix = os.path.splitext(os.path.basename(db_path))[0]
+        self.pages_done = 0; self.pages_total = 0; self.stage = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()  # um backup por vez, mesmo vindo do agendador e do menu
+
+    def cancel(self):
+        self._cancel.set()
+
+    # --- Criação ---
+    def create_backup(self, label=None):
+        """Grava um novo backup e devolve {'path', 'bytes', 'seconds', 'pages'}; com cancel(), devolve None."""
+        if not self._lock.acquire(blocking=False): raise BackupError("Já existe um backup em andamento.")
+        try:
+            self._cancel.clear(); self.pages_done = 0; self.pages_total = 0
+            os.makedirs(self.backup_path, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            name = f"{label or self.prefix}_{stamp}.db" + (".gz" if self.compress else "")
+            final_path = os.path.join(self.backup_path, name)
+            started = time.perf_counter()
+            fd, tmp_db = tempfile.mkstemp(suffix=".db", dir=self.backup_path); os.close(fd)
+            try:
+                self.stage = "Copiando páginas"
+                if not self._copy_online(tmp_db): return None
+                self.stage = "Verificando integridade"
+                problems = check_integrity(tmp_db)
+                if problems: raise BackupError("Cópia não passou no integrity_check: " + "; ".join(problems[:5]))
+                partial = final_path + ".parcial"
+                if self.compress:
+                    self.stage = "Compactando"
+                    with open(tmp_db, 'rb') as src, gzip.open(partial, 'wb', compresslevel=self.COMPRESS_LEVEL) as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                else:
+                    shutil.copyfile(tmp_db, partial)
+                os.replace(partial, final_path)  # nunca fica um backup pela metade com o nome final
+            finally:
+                _remove_db(tmp_db)
+                if os.path.exists(final_path + ".parcial"): os.remove(final_path + ".parcial")
+            self.stage = "Removendo backups antigos"
+            self.rotate()
+            self.stage = "Concluído"
+            return {'path': final_path, 'bytes': os.path.getsize(final_path),
+                    'seconds': time.perf_counter() - started, 'pages': self.pages_total}
+        finally:
+            self._lock.release()
+
+    def _copy_online(self, dest_path):
+        src = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=5)
+        dst = sqlite3.connect(dest_path)
+        def on_step(status, remaining, total):
+            self.pages_total = total; self.pages_done = total - remaining
+            if self._cancel.is_set(): raise BackupError("cancelado")
+        try:
+            src.execute("BEGIN"); src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # fixa o snapshot
+            src.backup(dst, pages=self.pages_per_step, progress=on_step, sleep=self.step_sleep)
+            dst.execute("PRAGMA journal_mode = DELETE")  # a cópia é um arquivo só, sem -wal/-shm
+            return True
+        except BackupError:
+            if self._cancel.is_set(): return False
+            raise
+        finally:
+            try: src.rollback()
+            except sqlite3.Error: pass
+            src.close(); dst.close()
+
+    # --- Retenção ---
+    def list_backups(self):
+        """Backups automáticos em `backup_path`, do mais recente para o mais antigo."""
+        paths = glob.glob(os.path.join(self.backup_path, f"{self.prefix}_*.db")) + \
+                glob.glob(os.path.join(self.backup_path, f"{self.prefix}_*.db.gz"))
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    def rotate(self):
+        removed = []
+        if self.keep and self.keep > 0:
+            for path in self.list_backups()[self.keep:]:
+                try: os.remove(path); removed.append(path)
+                except OSError as e: print(f"Não foi possível remover o backup antigo {path}: {e}")
+        return removed
+
+    def is_due(self, interval_hours):
+        """True se o backup mais recente tem mais de `interval_hours` (ou se não há nenhum)."""
+        if not interval_hours or interval_hours <= 0: return False
+        backups = self.list_backups()
+        return not backups or time.time() - os.path.getmtime(backups[0]) >= interval_hours * 3600
+
+    # --- Verificação e restauração ---
+    def _extracted(self, backup_file):
+        """Copia o backup para um .db temporário (descompactando se for .gz) e devolve o caminho."""
+        fd, tmp_db = tempfile.mkstemp(suffix=".db", dir=os.path.dirname(os.path.abspath(self.db_path))); os.close(fd)
+        try:
+            opener = gzip.open if backup_file.endswith(".gz") else open
+            with opener(backup_file, 'rb') as src, open(tmp_db, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        except (OSError, EOFError) as e:
+            _remove_db(tmp_db)
+            raise BackupError(f"Não foi possível ler {backup_file}: {e}")
+        return tmp_db
+
+    def verify_backup(self, backup_file):
+        """Lista de problemas encontrados no backup (vazia = íntegro)."""
+        try: tmp_db = self._extracted(backup_file)
+        except BackupError as e: return [str(e)]
+        try: return check_integrity(tmp_db)
+        finally: _remove_db(tmp_db)
+
+    def restore(self, backup_file, safety_backup=True):
+        """Substitui o conteúdo do banco pelo do backup, depois de verificá-lo.
+
+        O banco atual é salvo antes como `antes_restauracao_<data>` (fora da rotação). A cópia
+        usa a API de backup na direção inversa, então o -wal e as conexões abertas continuam
+        coerentes; ainda assim, rode com o aplicativo fechado. Devolve o caminho do backup de segurança.
+        """
+        tmp_db = self._extracted(backup_file)
+        try:
+            problems = check_integrity(tmp_db)
+            if problems: raise BackupError("Backup corrompido, restauração abortada: " + "; ".join(problems[:5]))
+            safety = None
+            if safety_backup and os.path.exists(self.db_path):
+                safety = self.create_backup(label="antes_restauracao")['path']
+            src = sqlite3.connect(tmp_db); dst = sqlite3.connect(self.db_path, timeout=5)
+            try: src.backup(dst)
+            finally: src.close(); dst.close()
+            return safety
+        finally:
+            _remove_db(tmp_db)
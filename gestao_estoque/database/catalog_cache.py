@@ -0,0 +1,75 @@
+# database/catalog_cache.py
+
+import threading
+from collections import OrderedDict
+
+
+class CatalogCache:
+    """Cache LRU (read-through) das consultas de cadastro: produtos, clientes e fornecedores.
+
+    Cada entrada declara as "tags" de que depende (ex.: ("produtos", "estoque") para uma
+    consulta que mostra a quantidade em estoque) e é descartada quando uma delas é
+    invalidada. Cada tag tem um contador de geração que sobe a cada invalidação: a interface
+    pode compará-lo para saber se uma lista que já mostra ainda está atual, e `get_or_load`
+    só grava o que foi lido numa geração que continua válida (uma leitura que cruzou com uma
+    escrita não fica no cache).
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # (tags, tipo de consulta, valor) -> resultado
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0; self.misses = 0; self.evictions = 0
+
+    def generation(self, tag):
+        with self._lock:
+            return self._generations.get(tag, 0)
+
+    def get_or_load(self, tags, kind, value, loader):
+        key = (tags, kind, value)
+        with self._lock:
+            cached = self._entries.get(key, self._MISSING)
+            if cached is not self._MISSING:
+                self._entries.move_to_end(key); self.hits += 1
+                return list(cached) if kind == "all" else cached
+            self.misses += 1
+            generations = [self._generations.get(t, 0) for t in tags]
+        result = loader()
+        with self._lock:
+            if self.maxsize > 0 and generations == [self._generations.get(t, 0) for t in tags]:
+                # Listas ficam guardadas como tupla para ninguém alterar a cópia do cache.
+                self._entries[key] = tuple(result) if kind == "all" else result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False); self.evictions += 1
+        return result
+
+    def invalidate(self, tag, row_id=None):
+        """Descarta as entradas que dependem de `tag` e foram afetadas por uma escrita.
+
+        Com `row_id`, só saem as listagens, as buscas sem resultado (a linha pode ter
+        passado a existir) e as buscas cujo resultado é essa linha; sem `row_id`, sai tudo.
+        """
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in [k for k, v in self._entries.items() if tag in k[0] and self._affected(k, v, row_id)]:
+                del self._entries[key]
+
+    @staticmethod
+    def _affected(key, value, row_id):
+        if row_id is None or key[1] == "all" or value is None: return True
+        return value[0] == row_id  # busca por id/sku/código de barras: a linha começa pelo id
+
+    def clear(self):
+        with self._lock:
+            for tag in self._generations: self._generations[tag] += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "hit_rate": self.hits / total if total else 0.0}
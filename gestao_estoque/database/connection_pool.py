@@ -0,0 +1,136 @@
+# database/connection_pool.py
+
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class ConnectionPool:
+    """Conexões SQLite por thread: cada thread recebe sempre a mesma conexão de escrita
+    e, quando pede, uma conexão somente leitura separada (relatórios e dashboard).
+
+    O número total de conexões é limitado por `max_connections`. Quando o limite é
+    atingido, conexões de threads que já terminaram são fechadas e reaproveitadas;
+    se nenhuma estiver livre, a thread espera até `busy_timeout_ms`.
+    """
+
+    def __init__(self, db_path, max_connections=8, busy_timeout_ms=5000, journal_mode="WAL"):
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.busy_timeout_ms = busy_timeout_ms
+        self.journal_mode = journal_mode
+        self._local = threading.local()
+        self._connections = {}  # (ident da thread, somente_leitura) -> conexão
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _configure(self, conn, readonly):
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            # journal_mode é gravado no arquivo; synchronous=NORMAL é seguro em WAL
+            # (um commit só pode se perder numa queda de energia, nunca corromper o banco).
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            conn.execute("PRAGMA synchronous = NORMAL" if self.journal_mode.upper() == "WAL" else "PRAGMA synchronous = FULL")
+
+    def _open(self, readonly):
+        if readonly:
+            # Antes da primeira conexão de escrita o arquivo pode nem existir ainda.
+            if not os.path.exists(self.db_path): self.connection()
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False,
+                                   timeout=self.busy_timeout_ms / 1000)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.busy_timeout_ms / 1000)
+        self._configure(conn, readonly)
+        return conn
+
+    def _reclaim_dead_threads(self):
+        alive = {t.ident for t in threading.enumerate()}
+        for key in [k for k in self._connections if k[0] not in alive]:
+            try: self._connections.pop(key).close()
+            except sqlite3.Error: pass
+
+    def _acquire(self, readonly):
+        key = (threading.get_ident(), readonly)
+        deadline = time.monotonic() + self.busy_timeout_ms / 1000
+        with self._cond:
+            if self._closed: raise sqlite3.ProgrammingError("Pool de conexões já foi fechado.")
+            stale = self._connections.pop(key, None)  # ident reaproveitado de uma thread que já terminou
+            if stale is not None: stale.close()
+            while len(self._connections) >= self.max_connections:
+                self._reclaim_dead_threads()
+                if len(self._connections) < self.max_connections: break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(f"Limite de {self.max_connections} conexões atingido.")
+                self._cond.wait(min(remaining, 0.05))
+            self._connections[key] = None  # reserva a vaga enquanto a conexão é aberta
+        try:
+            conn = self._open(readonly)
+        except Exception:
+            with self._cond:
+                self._connections.pop(key, None); self._cond.notify_all()
+            raise
+        with self._cond:
+            self._connections[key] = conn
+        return conn
+
+    def connection(self):
+        """Conexão de escrita da thread atual."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._acquire(readonly=False)
+            self._local.cursor = conn.cursor()
+        return conn
+
+    def cursor(self):
+        """Cursor da conexão de escrita da thread atual."""
+        self.connection()
+        return self._local.cursor
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE na conexão de escrita da thread; COMMIT ao sair do bloco e ROLLBACK
+        em qualquer exceção (inclusive KeyboardInterrupt), para a transação e o lock de escrita
+        nunca ficarem presos na conexão. Um rollback() dentro do bloco encerra a transação e o
+        COMMIT da saída não faz nada."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction: conn.rollback()
+            raise
+        if conn.in_transaction: conn.commit()
+
+    def read_connection(self):
+        """Conexão somente leitura da thread atual. Não enxerga transações ainda não confirmadas."""
+        conn = getattr(self._local, "read_conn", None)
+        if conn is None:
+            conn = self._local.read_conn = self._acquire(readonly=True)
+        return conn
+
+    def release_thread(self):
+        """Fecha as conexões da thread atual (útil ao fim de threads de trabalho)."""
+        ident = threading.get_ident()
+        with self._cond:
+            for readonly in (False, True):
+                conn = self._connections.pop((ident, readonly), None)
+                if conn is not None: conn.close()
+            self._cond.notify_all()
+        self._local.__dict__.clear()
+
+    def close_all(self):
+        with self._cond:
+            self._closed = True
+            for conn in self._connections.values():
+                if conn is None: continue
+                try: conn.close()
+                except sqlite3.Error: pass
+            self._connections.clear()
+            self._cond.notify_all()
+        self._local.__dict__.clear()
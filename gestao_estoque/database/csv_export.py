@@ -0,0 +1,108 @@
+# database/csv_export.py
+
+import csv
+import gzip
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from database.db_manager import DatabaseManager
+
+# (título da seção, nome do arquivo, cabeçalho, consulta) de cada tabela exportada.
+EXPORT_TABLES = [
+    ("PRODUTOS", "produtos", ["ID", "Nome", "SKU", "Descrição", "Qtd em Estoque"],
+     "SELECT id, nome, codigo_sku, descricao, quantidade FROM produtos ORDER BY nome"),
+    ("CLIENTES", "clientes", ["ID", "Nome", "CPF/CNPJ", "Telefone", "Email", "Endereço"],
+     "SELECT id, nome, cpf_cnpj, telefone, email, endereco FROM clientes ORDER BY nome"),
+    ("FORNECEDORES", "fornecedores", ["ID", "Nome", "Contato", "Endereço"],
+     "SELECT id, nome, contato, endereco FROM fornecedores ORDER BY nome"),
+    ("MOVIMENTACOES", "movimentacoes", ["ID", "Produto", "Usuário", "Tipo", "Qtd", "Preço Unit.", "Origem/Destino", "Data/Hora"],
+     DatabaseManager.ALL_MOVEMENTS_QUERY),
+    ("USUARIOS", "usuarios", ["ID", "Usuário", "Nível de Acesso", "E-mail"],
+     "SELECT id, nome_usuario, nivel_acesso, email FROM usuarios"),
+]
+_COUNT_QUERIES = {
+    "produtos": "SELECT COUNT(*) FROM produtos", "clientes": "SELECT COUNT(*) FROM clientes",
+    "fornecedores": "SELECT COUNT(*) FROM fornecedores", "usuarios": "SELECT COUNT(*) FROM usuarios",
+    "movimentacoes": "SELECT COUNT(*) FROM movimentacoes m JOIN produtos p ON m.id_item = p.id",
+}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class CsvExport:
+    """Exporta as tabelas para CSV em blocos de `chunk_size` linhas, lidas de um único snapshot.
+
+    Todas as consultas rodam na mesma transação de leitura (em WAL, movimentações gravadas
+    durante a exportação não entram pela metade). Sem `compress`, gera um só arquivo com
+    uma seção por tabela, como sempre foi; com `compress`, um `<tabela>.csv.gz` por tabela.
+    `run()` roda fora da thread da interface; `rows_done`/`rows_total` podem ser lidos de
+    outra thread para mostrar o progresso, e `cancel()` interrompe no próximo bloco.
+    """
+
+    def __init__(self, db_manager, export_path, compress=False, chunk_size=5000, tables=EXPORT_TABLES):
+        self.db_manager = db_manager
+        self.export_path = export_path
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.tables = tables
+        self.rows_done = 0; self.rows_total = 0; self.current_table = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self):
+        """Grava os arquivos e devolve a lista de caminhos; com cancel(), devolve None.
+
+        Cada arquivo é escrito como `<arquivo>.parcial` e só é renomeado quando a exportação
+        inteira termina: um cancelamento ou erro nunca deixa um CSV pela metade com o nome final.
+        """
+        os.makedirs(self.export_path, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        written = []
+        conn = self.db_manager.pool.read_connection()
+        try:
+            conn.execute("BEGIN")  # o snapshot começa na primeira leitura e vale até o fim
+            self.rows_total = sum(conn.execute(_COUNT_QUERIES[name]).fetchone()[0] for _, name, _, _ in self.tables)
+            if self.compress:
+                for title, name, headers, query in self.tables:
+                    path = os.path.join(self.export_path, f"{name}_{stamp}.csv.gz"); written.append(path)
+                    with gzip.open(path + ".parcial", 'wt', newline='', encoding='utf-8') as f:
+                        writer = csv.writer(f); writer.writerow(headers)
+                        self._copy_rows(conn, title, query, writer)
+            else:
+                path = os.path.join(self.export_path, f"export_completo_{stamp}.csv"); written.append(path)
+                with open(path + ".parcial", 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    for title, name, headers, query in self.tables:
+                        writer.writerow([f"--- DADOS DE {title} ---"]); writer.writerow(headers)
+                        self._copy_rows(conn, title, query, writer)
+                        writer.writerow([])
+            for path in written: os.replace(path + ".parcial", path)
+            return written
+        except ExportCancelled:
+            return None
+        finally:
+            try: conn.rollback()  # encerra a transação de leitura
+            except sqlite3.Error: pass
+            for path in written:
+                if os.path.exists(path + ".parcial"): os.remove(path + ".parcial")
+
+    def _copy_rows(self, conn, title, query, writer):
+        self.current_table = title
+        cursor = conn.execute(query)
+        while True:
+            if self._cancel.is_set(): raise ExportCancelled()
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows: break
+            writer.writerows(rows)
+            self.rows_done += len(rows)
+        cursor.close()
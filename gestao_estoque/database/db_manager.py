@@ -1,9 +1,19 @@
 # database/db_manager.py (COMPLETO E ATUALIZADO)
 
+import numbers
 import sqlite3
 import os
 import sys
 from datetime import datetime, timedelta
+from database.connection_pool import ConnectionPool
+from database.catalog_cache import CatalogCache
+
+def _is_number(value, kind=numbers.Real):
+    """bool é subclasse de int, mas True/False numa quantidade ou preço é erro de quem chamou."""
+    return isinstance(value, kind) and not isinstance(value, bool)
+
+def _is_movement_line(mov):
+    return isinstance(mov, (tuple, list)) and 4 <= len(mov) <= 6
 
 def get_base_path():
     if getattr(sys, 'frozen', False):
@@ -12,37 +22,206 @@ def get_base_path():
         return os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
 class DatabaseManager:
-    def __init__(self, db_name="estoque.db"):
+    def __init__(self, db_name="estoque.db", max_connections=8, busy_timeout_ms=5000, journal_mode="WAL", cache_size=1024, report_cache_size=64):
         base_path = get_base_path()
-        db_path = os.path.join(base_path, db_name)
-        db_exists = os.path.exists(db_path)
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
+        self.db_path = os.path.join(base_path, db_name)
+        db_exists = os.path.exists(self.db_path)
+        self.pool = ConnectionPool(self.db_path, max_connections=max_connections, busy_timeout_ms=busy_timeout_ms, journal_mode=journal_mode)
+        self.cache = CatalogCache(maxsize=cache_size)
+        self.report_cache = CatalogCache(maxsize=report_cache_size)
         self.create_tables()
-        self._ensure_barcode_column()
-        self._ensure_user_email_column() # <-- NOVA VERIFICAÇÃO
+        self._run_migrations()
+        self._ensure_admin_user()
         if not db_exists:
             self.populate_initial_data()
 
-    def _ensure_column(self, table_name, column_name, column_type):
+    # Cada thread usa a sua própria conexão (e cursor) do pool; o código que já
+    # usava self.conn/self.cursor continua igual, agora seguro fora da thread da UI.
+    @property
+    def conn(self):
+        return self.pool.connection()
+
+    @property
+    def cursor(self):
+        return self.pool.cursor()
+
+    # --- MIGRAÇÕES VERSIONADAS (PRAGMA user_version) ---
+    # Cada migração roda uma única vez, na ordem da lista; a versão do schema
+    # fica gravada no próprio arquivo do banco, então a inicialização não precisa
+    # mais inspecionar as tabelas com PRAGMA table_info a cada execução.
+    def _migrations(self):
+        return [
+            self._migration_001_legacy_columns,
+            self._migration_002_movement_indexes,
+            self._migration_003_movement_day_column,
+            self._migration_004_daily_summary,
+            self._migration_005_full_text_search,
+            self._migration_006_structured_notifications,
+            self._migration_007_openfoodfacts_cache,
+        ]
+
+    def _run_migrations(self):
+        current_version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        migrations = self._migrations()
+        if current_version >= len(migrations): return
         try:
-            self.cursor.execute(f"PRAGMA table_info({table_name})")
-            cols = [r[1] for r in self.cursor.fetchall()]
-            if column_name not in cols:
-                self.cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
-                self.conn.commit()
-                print(f"Coluna '{column_name}' adicionada à tabela '{table_name}'.")
-        except Exception as e:
-            print(f"Erro ao verificar/adicionar coluna {column_name} em {table_name}: {e}")
+            with self.pool.transaction():
+                for version, migration in enumerate(migrations[current_version:], start=current_version + 1):
+                    migration()
+                    self.cursor.execute(f"PRAGMA user_version = {version}")
+        except sqlite3.Error as e:
+            print(f"Erro ao migrar o banco de dados para a versão {len(migrations)}: {e}")
+            raise
+        self.analyze()
+        print(f"Banco de dados migrado da versão {current_version} para a versão {len(migrations)}.")
+
+    def analyze(self):
+        """Atualiza as estatísticas do planejador (ANALYZE) das tabelas comuns.
+
+        As tabelas internas do FTS5 ficam de fora: estatísticas tiradas com elas quase
+        vazias fazem cada inserção posterior varrer o índice inteiro (custo quadrático).
+        """
+        tables = [r[0] for r in self.cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '%\\_fts%' ESCAPE '\\'"
+        ).fetchall()]
+        for table in tables:
+            self.cursor.execute(f"ANALYZE {table}")
+        self.conn.commit()
+
+    def _add_column_if_missing(self, table_name, column_name, column_type):
+        cols = [r[1] for r in self.cursor.execute(f"PRAGMA table_info({table_name})").fetchall()]
+        if column_name in cols: return False
+        self.cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+        return True
+
+    def _migration_001_legacy_columns(self):
+        # Bancos antigos não tinham estas colunas. O SQLite não aceita ADD COLUMN com
+        # UNIQUE, por isso a unicidade do código de barras vem de um índice.
+        if self._add_column_if_missing("produtos", "codigo_barra", "TEXT"):
+            self.cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_produtos_codigo_barra ON produtos(codigo_barra)")
+        self._add_column_if_missing("usuarios", "email", "TEXT")
 
-    def _ensure_barcode_column(self):
-        self._ensure_column("produtos", "codigo_barra", "TEXT UNIQUE")
+    def _migration_002_movement_indexes(self):
+        # (id_item, tipo, data_hora): histórico por produto/tipo, resumos e financeiro por produto.
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_mov_item_tipo_data ON movimentacoes(id_item, tipo, data_hora)")
+        # (id_item, data_hora): última movimentação por produto (inatividade).
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_mov_item_data ON movimentacoes(id_item, data_hora)")
+        # (data_hora): listagem geral e filtros por período.
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_mov_data_hora ON movimentacoes(data_hora)")
 
-    def _ensure_user_email_column(self):
-        self._ensure_column("usuarios", "email", "TEXT")
+    def _migration_003_movement_day_column(self):
+        # Chave de dia ('YYYY-MM-DD') gravada junto com a movimentação: os filtros por
+        # período viram comparações de faixa indexáveis em vez de strftime() por linha.
+        # (id_item, dia) atende o histórico de um produto numa faixa de dias e o agrupamento
+        # por dia e produto que recalcula/confere o resumo_diario. Os totais de todos os
+        # produtos por período saem do resumo_diario (migração 004), então um índice
+        # começando por dia não seria usado por nenhuma consulta.
+        self._add_column_if_missing("movimentacoes", "dia", "TEXT")
+        self.cursor.execute("UPDATE movimentacoes SET dia = substr(data_hora, 1, 10) WHERE dia IS NULL")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_mov_item_dia ON movimentacoes(id_item, dia)")
+
+    def _migration_004_daily_summary(self):
+        # Acumulado por (dia, produto), mantido por add_movement/reverse_movement na mesma
+        # transação da movimentação. O dashboard lê daqui em vez de agregar o histórico inteiro.
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resumo_diario (
+            dia TEXT NOT NULL,
+            id_item INTEGER NOT NULL,
+            valor_entrada REAL NOT NULL DEFAULT 0,
+            valor_saida REAL NOT NULL DEFAULT 0,
+            qtd_entrada INTEGER NOT NULL DEFAULT 0,
+            qtd_saida INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, id_item),
+            FOREIGN KEY (id_item) REFERENCES produtos(id) ON DELETE CASCADE
+        ) WITHOUT ROWID""")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_resumo_item_dia ON resumo_diario(id_item, dia)")
+        self._fill_daily_summary()
+
+    # Tabela -> colunas indexadas na busca textual (FTS5) das abas de cadastro.
+    FTS_TABLES = {
+        "produtos": ["nome", "codigo_sku", "descricao", "codigo_barra"],
+        "clientes": ["nome", "cpf_cnpj", "telefone", "email", "endereco"],
+        "fornecedores": ["nome", "contato", "endereco"],
+    }
+
+    def _migration_005_full_text_search(self):
+        # Índices FTS5 de conteúdo externo, sincronizados por triggers. O tokenizer remove
+        # acentos ("sabao" encontra "Sabão") e os prefixos curtos deixam a busca por
+        # trechos digitados rápida. Se o SQLite não tiver FTS5, a busca cai no LIKE.
+        try:
+            self.cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+            self.cursor.execute("DROP TABLE temp.fts5_probe")
+        except sqlite3.OperationalError:
+            print("Aviso: SQLite sem suporte a FTS5; a busca usará LIKE.")
+            return
+        for table, columns in self.FTS_TABLES.items():
+            cols = ", ".join(columns)
+            new_cols = ", ".join(f"new.{c}" for c in columns); old_cols = ", ".join(f"old.{c}" for c in columns)
+            self.cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+                {cols}, content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )""")
+            self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {table}_fts(rowid, {cols}) VALUES (new.id, {new_cols});
+            END""")
+            self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {table}_fts({table}_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            END""")
+            # Só as colunas indexadas: a baixa de estoque em produtos não reescreve o índice.
+            self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE OF {cols} ON {table} BEGIN
+                INSERT INTO {table}_fts({table}_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                INSERT INTO {table}_fts(rowid, {cols}) VALUES (new.id, {new_cols});
+            END""")
+            self.cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+    # Prefixo da mensagem gerada por cada tipo de notificação ligada a um produto.
+    NOTIFICATION_PREFIXES = {
+        "inatividade": "INATIVIDADE: Produto '",
+        "estoque_zerado": "ESTOQUE ZERADO: O produto '",
+        "estoque_baixo": "ESTOQUE BAIXO: O produto '",
+    }
+
+    def _migration_006_structured_notifications(self):
+        # Notificações ganham tipo, produto e uma chave única de deduplicação; "já avisei
+        # sobre este produto?" passa a ser uma busca no índice em vez de LIKE na mensagem.
+        self._add_column_if_missing("notificacoes", "tipo", "TEXT")
+        self._add_column_if_missing("notificacoes", "id_produto", "INTEGER REFERENCES produtos(id) ON DELETE SET NULL")
+        self._add_column_if_missing("notificacoes", "chave", "TEXT")
+        self.cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_notif_chave ON notificacoes(chave) WHERE chave IS NOT NULL")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_notif_tipo_produto ON notificacoes(tipo, id_produto)")
+
+        # Classifica as notificações antigas pelo texto que cada tela gerava. O nome do
+        # produto é lido entre as aspas, então "Arroz" não casa com "Arroz Integral".
+        ids_by_name = {nome: pid for pid, nome in self.cursor.execute("SELECT id, nome FROM produtos ORDER BY id DESC").fetchall()}
+        updates = []
+        for notif_id, mensagem in self.cursor.execute("SELECT id, mensagem FROM notificacoes").fetchall():
+            tipo, id_produto = None, None
+            for candidate, prefix in self.NOTIFICATION_PREFIXES.items():
+                if mensagem.startswith(prefix):
+                    tipo = candidate; id_produto = ids_by_name.get(mensagem[len(prefix):].rpartition("'")[0])
+                    break
+            else:
+                if mensagem.startswith("Novo usuário"): tipo = 'usuario'
+                elif "exportado" in mensagem: tipo = 'exportacao'
+            if tipo: updates.append((tipo, id_produto, notif_id))
+        self.cursor.executemany("UPDATE notificacoes SET tipo = ?, id_produto = ? WHERE id = ?", updates)
+        self.cursor.execute("UPDATE OR IGNORE notificacoes SET chave = 'inatividade:' || id_produto WHERE tipo = 'inatividade' AND id_produto IS NOT NULL")
+
+    def _migration_007_openfoodfacts_cache(self):
+        # Consultas ao OpenFoodFacts por código de barras normalizado (ver database/product_lookup.py).
+        # produto NULL = o código não existe lá (cache negativo, com validade menor).
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cache_openfoodfacts (
+            codigo TEXT PRIMARY KEY,
+            produto TEXT,
+            consultado_em TEXT NOT NULL
+        ) WITHOUT ROWID""")
 
     def create_tables(self):
-        self.cursor.execute("PRAGMA foreign_keys = ON;")
         self.cursor.execute("""
         CREATE TABLE IF NOT EXISTS usuarios (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -74,6 +253,7 @@ class DatabaseManager:
             id_cliente INTEGER,
             id_fornecedor INTEGER,
             data_hora TEXT NOT NULL,
+            dia TEXT,
             FOREIGN KEY (id_item) REFERENCES produtos(id) ON DELETE CASCADE,
             FOREIGN KEY (id_usuario) REFERENCES usuarios(id) ON DELETE SET NULL,
             FOREIGN KEY (id_cliente) REFERENCES clientes(id) ON DELETE SET NULL,
@@ -90,10 +270,14 @@ class DatabaseManager:
         CREATE TABLE IF NOT EXISTS fornecedores (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT UNIQUE NOT NULL, contato TEXT, endereco TEXT)""")
         self.cursor.execute("""
         CREATE TABLE IF NOT EXISTS clientes (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT UNIQUE NOT NULL, cpf_cnpj TEXT, telefone TEXT, email TEXT, endereco TEXT)""")
+        self.conn.commit()
+
+    def _ensure_admin_user(self):
+        # Roda depois das migrações: bancos antigos só ganham a coluna email na migração 1.
         self.cursor.execute("SELECT id FROM usuarios WHERE nome_usuario = 'admin'")
         if not self.cursor.fetchone():
             self.cursor.execute("INSERT INTO usuarios (nome_usuario, senha, nivel_acesso, email) VALUES (?, ?, ?, ?)", ('admin', 'admin', 'Administrador', 'seu-email@exemplo.com'))
-        self.conn.commit()
+            self.conn.commit()
 
     def populate_initial_data(self):
         try:
@@ -136,6 +320,19 @@ class DatabaseManager:
             self.cursor.execute(query, params); return self.cursor.fetchone()
         except sqlite3.Error as e:
             return None
+
+    # Consultas de relatório/dashboard: conexão somente leitura da thread, que em WAL
+    # não bloqueia nem é bloqueada pelas escritas.
+    def fetch_all_readonly(self, query, params=()):
+        try:
+            return self.pool.read_connection().execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            return []
+    def fetch_one_readonly(self, query, params=()):
+        try:
+            return self.pool.read_connection().execute(query, params).fetchone()
+        except sqlite3.Error as e:
+            return None
     
     def validate_login(self, username, password):
         return self.fetch_one("SELECT * FROM usuarios WHERE nome_usuario = ? AND senha = ?", (username, password))
@@ -147,7 +344,7 @@ class DatabaseManager:
     def add_user(self, username, password, access_level, email):
         result = self.execute_query("INSERT INTO usuarios (nome_usuario, senha, nivel_acesso, email) VALUES (?, ?, ?, ?)", (username, password, access_level, email))
         if isinstance(result, int):
-            self.add_notification(f"Novo usuário '{username}' foi criado.")
+            self.add_notification(f"Novo usuário '{username}' foi criado.", tipo='usuario')
         return result
 
     def update_user(self, user_id, username, password, access_level, email):
@@ -159,73 +356,250 @@ class DatabaseManager:
     def delete_user(self, user_id):
         return self.execute_query("DELETE FROM usuarios WHERE id = ?", (user_id,))
     
+    # --- CACHE DOS CADASTROS ---
+    # Leituras de produtos/clientes/fornecedores passam pelo CatalogCache; todo método
+    # que altera essas tabelas invalida as entradas afetadas depois do commit. As
+    # movimentações só mexem na quantidade, então invalidam apenas a tag "estoque" e as
+    # listas que mostram só nomes (combos) continuam no cache.
+    _PRODUCT_TAGS = ("produtos", "estoque")
+
+    def catalog_generation(self, tag):
+        """Contador que muda sempre que `tag` ("produtos", "estoque", "clientes", "fornecedores")
+        é alterada; a UI compara para saber se precisa recarregar."""
+        return self.cache.generation(tag)
+    def cache_stats(self):
+        return self.cache.stats()
+    def _write_catalog(self, table, row_id, query, params):
+        result = self.execute_query(query, params)
+        if row_id is None and isinstance(result, int): row_id = result  # INSERT: id da linha nova
+        self.cache.invalidate(table, row_id)
+        if table == "produtos": self.report_cache.invalidate("produtos")  # nomes nos resumos do dashboard
+        return result
+
     def get_all_products(self):
-        return self.fetch_all("SELECT id, nome, codigo_sku, descricao, quantidade FROM produtos ORDER BY nome")
+        return self.cache.get_or_load(self._PRODUCT_TAGS, "all", "completa", lambda: self.fetch_all("SELECT id, nome, codigo_sku, descricao, quantidade FROM produtos ORDER BY nome"))
+    def get_product_names(self):
+        """(id, nome) de todos os produtos, para os combos; não muda com as movimentações."""
+        return self.cache.get_or_load(("produtos",), "all", "nomes", lambda: self.fetch_all("SELECT id, nome FROM produtos ORDER BY nome"))
     def get_product_by_id(self, product_id):
-        return self.fetch_one("SELECT * FROM produtos WHERE id = ?", (product_id,))
+        return self.cache.get_or_load(self._PRODUCT_TAGS, "id", product_id, lambda: self.fetch_one("SELECT * FROM produtos WHERE id = ?", (product_id,)))
 
     def get_product_by_sku(self, sku):
-        return self.fetch_one("SELECT * FROM produtos WHERE codigo_sku = ?", (sku,))
+        return self.cache.get_or_load(self._PRODUCT_TAGS, "sku", sku, lambda: self.fetch_one("SELECT * FROM produtos WHERE codigo_sku = ?", (sku,)))
     def add_product(self, nome, sku, desc, qtd, codigo_barra=None):
-        return self.execute_query(
+        return self._write_catalog(
+            "produtos", None,
             "INSERT INTO produtos (nome, codigo_sku, descricao, quantidade, quantidade_inicial, codigo_barra) VALUES (?, ?, ?, ?, ?, ?)",
             (nome, sku, desc, qtd, qtd, codigo_barra)
         )
     def update_product(self, prod_id, nome, sku, desc, qtd, codigo_barra=None):
-        return self.execute_query("UPDATE produtos SET nome=?, codigo_sku=?, descricao=?, quantidade=?, codigo_barra=? WHERE id=?", (nome, sku, desc, qtd, codigo_barra, prod_id))
+        return self._write_catalog("produtos", prod_id, "UPDATE produtos SET nome=?, codigo_sku=?, descricao=?, quantidade=?, codigo_barra=? WHERE id=?", (nome, sku, desc, qtd, codigo_barra, prod_id))
 
     def get_product_by_barcode(self, barcode):
-        return self.fetch_one("SELECT * FROM produtos WHERE codigo_barra = ?", (barcode,))
+        return self.cache.get_or_load(self._PRODUCT_TAGS, "barcode", barcode, lambda: self.fetch_one("SELECT * FROM produtos WHERE codigo_barra = ?", (barcode,)))
     def delete_product(self, prod_id):
-        return self.execute_query("DELETE FROM produtos WHERE id = ?", (prod_id,))
+        return self._write_catalog("produtos", prod_id, "DELETE FROM produtos WHERE id = ?", (prod_id,))
     
     def add_movement(self, id_item, id_usuario, tipo, quantidade, preco_transacao, id_cliente=None, id_fornecedor=None):
         try:
-            self.conn.execute("BEGIN TRANSACTION")
-            produto = self.fetch_one("SELECT nome, quantidade, quantidade_inicial FROM produtos WHERE id = ?", (id_item,))
-            if not produto:
-                self.conn.rollback(); return "Produto não encontrado."
-            data_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.cursor.execute(
-                "INSERT INTO movimentacoes (id_item, id_usuario, tipo, quantidade, preco_transacao, id_cliente, id_fornecedor, data_hora) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (id_item, id_usuario, tipo, quantidade, preco_transacao, id_cliente, id_fornecedor, data_hora)
-            )
-            new_stock = 0
-            if tipo.lower() == 'entrada':
-                new_stock = produto[1] + quantidade
-                self.cursor.execute("UPDATE produtos SET quantidade = ? WHERE id = ?", (new_stock, id_item))
-            elif tipo.lower() == 'saida':
-                if produto[1] < quantidade:
-                    self.conn.rollback(); return "Estoque insuficiente."
-                new_stock = produto[1] - quantidade
-                self.cursor.execute("UPDATE produtos SET quantidade = ? WHERE id = ?", (new_stock, id_item))
-            self.conn.commit()
-            if new_stock == 0: self.add_notification(f"ESTOQUE ZERADO: O produto '{produto[0]}' está esgotado.")
-            elif produto[2] > 0 and (new_stock / produto[2]) * 100 < 30: self.add_notification(f"ESTOQUE BAIXO: O produto '{produto[0]}' está com menos de 30% do estoque inicial.")
-            return "Sucesso"
+            with self.pool.transaction():
+                produto = self.fetch_one("SELECT nome, quantidade, quantidade_inicial FROM produtos WHERE id = ?", (id_item,))
+                if not produto:
+                    self.conn.rollback(); return "Produto não encontrado."
+                now = datetime.now()
+                data_hora = now.strftime('%Y-%m-%d %H:%M:%S'); dia = now.strftime('%Y-%m-%d')
+                self.cursor.execute(
+                    "INSERT INTO movimentacoes (id_item, id_usuario, tipo, quantidade, preco_transacao, id_cliente, id_fornecedor, data_hora, dia) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (id_item, id_usuario, tipo, quantidade, preco_transacao, id_cliente, id_fornecedor, data_hora, dia)
+                )
+                new_stock = 0
+                if tipo.lower() == 'entrada':
+                    new_stock = produto[1] + quantidade
+                    self.cursor.execute("UPDATE produtos SET quantidade = ? WHERE id = ?", (new_stock, id_item))
+                elif tipo.lower() == 'saida':
+                    if produto[1] < quantidade:
+                        self.conn.rollback(); return "Estoque insuficiente."
+                    new_stock = produto[1] - quantidade
+                    self.cursor.execute("UPDATE produtos SET quantidade = ? WHERE id = ?", (new_stock, id_item))
+                self._apply_to_daily_summary(dia, id_item, tipo, quantidade, preco_transacao, 1)
+        except sqlite3.Error as e:
+            return f"Erro: {e}"
+        self.cache.invalidate("estoque", id_item); self._summary_changed()
+        notification = self._stock_level_notification(id_item, produto[0], new_stock, produto[2])
+        if notification: self.add_notifications([notification])
+        return "Sucesso"
+
+    def _stock_level_notification(self, id_item, nome, new_stock, quantidade_inicial):
+        """(mensagem, tipo, id_produto, chave) do alerta de estoque, ou None se o nível está normal."""
+        if new_stock == 0: return (f"ESTOQUE ZERADO: O produto '{nome}' está esgotado.", 'estoque_zerado', id_item, None)
+        if quantidade_inicial > 0 and (new_stock / quantidade_inicial) * 100 < 30:
+            return (f"ESTOQUE BAIXO: O produto '{nome}' está com menos de 30% do estoque inicial.", 'estoque_baixo', id_item, None)
+        return None
+
+    def add_movements_batch(self, id_usuario, movements):
+        """Registra várias movimentações numa única transação.
+
+        `movements` é uma sequência de (id_item, tipo, quantidade, preco_transacao[, id_cliente, id_fornecedor]).
+        Cada linha é validada contra o estoque acumulado das linhas anteriores do lote; as
+        linhas inválidas (inclusive as que nem têm esse formato) são ignoradas sem abortar as
+        demais. Devolve uma lista com o resultado de cada linha, na mesma ordem: "Sucesso" ou
+        a mensagem de erro.
+        """
+        movements = list(movements)
+        results = [None] * len(movements)
+        if not movements: return results
+        now = datetime.now()
+        data_hora = now.strftime('%Y-%m-%d %H:%M:%S'); dia = now.strftime('%Y-%m-%d')
+        try:
+            with self.pool.transaction():
+                produtos = self._fetch_products_for_batch({m[0] for m in movements if _is_movement_line(m) and _is_number(m[0], numbers.Integral)})
+                stock = {pid: p[1] for pid, p in produtos.items()}
+                inserts = []; summary = {}
+                for i, mov in enumerate(movements):
+                    if not _is_movement_line(mov):
+                        results[i] = "Linha malformada."; continue
+                    id_item, tipo, quantidade, preco_transacao = mov[:4]
+                    id_cliente = mov[4] if len(mov) > 4 else None
+                    id_fornecedor = mov[5] if len(mov) > 5 else None
+                    tipo = tipo.lower() if isinstance(tipo, str) else ''
+                    if not _is_number(id_item, numbers.Integral) or id_item not in produtos:
+                        results[i] = "Produto não encontrado."; continue
+                    if tipo not in ('entrada', 'saida'):
+                        results[i] = f"Tipo de movimentação inválido: '{mov[1]}'."; continue
+                    if not _is_number(quantidade, numbers.Integral) or quantidade <= 0:
+                        results[i] = "Quantidade deve ser um número inteiro positivo."; continue
+                    if not _is_number(preco_transacao) or not preco_transacao >= 0:  # "not >=" também recusa NaN
+                        results[i] = "Preço Unitário deve ser um número válido e não negativo."; continue
+                    if tipo == 'saida' and stock[id_item] < quantidade:
+                        results[i] = "Estoque insuficiente."; continue
+                    stock[id_item] += quantidade if tipo == 'entrada' else -quantidade
+                    inserts.append((id_item, id_usuario, tipo, quantidade, preco_transacao, id_cliente, id_fornecedor, data_hora, dia))
+                    acc = summary.setdefault(id_item, [0, 0, 0, 0])
+                    if tipo == 'entrada': acc[0] += quantidade * preco_transacao; acc[2] += quantidade
+                    else: acc[1] += quantidade * preco_transacao; acc[3] += quantidade
+                    results[i] = "Sucesso"
+
+                self.cursor.executemany(
+                    "INSERT INTO movimentacoes (id_item, id_usuario, tipo, quantidade, preco_transacao, id_cliente, id_fornecedor, data_hora, dia) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    inserts
+                )
+                self.cursor.executemany("UPDATE produtos SET quantidade = ? WHERE id = ?", [(stock[pid], pid) for pid in summary])
+                self.cursor.executemany(self._DAILY_SUMMARY_UPSERT, [(dia, pid, *acc) for pid, acc in summary.items()])
         except sqlite3.Error as e:
-            self.conn.rollback(); return f"Erro: {e}"
+            return [f"Erro: {e}"] * len(movements)
+
+        for pid in summary: self.cache.invalidate("estoque", pid)
+        self._summary_changed()
+        notifications = [self._stock_level_notification(pid, produtos[pid][0], stock[pid], produtos[pid][2]) for pid in summary]
+        self.add_notifications([n for n in notifications if n])
+        return results
+
+    def _fetch_products_for_batch(self, product_ids):
+        produtos = {}; ids = list(product_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.fetch_all(f"SELECT id, nome, quantidade, quantidade_inicial FROM produtos WHERE id IN ({placeholders})", chunk):
+                produtos[row[0]] = row[1:]
+        return produtos
 
     def reverse_movement(self, movement_id):
         try:
-            self.conn.execute("BEGIN TRANSACTION")
-            mov = self.fetch_one("SELECT id_item, tipo, quantidade FROM movimentacoes WHERE id = ?", (movement_id,))
-            if not mov:
-                self.conn.rollback(); return "Movimentação não encontrada."
-            id_item, tipo, quantidade = mov
-            if tipo.lower() == 'entrada':
-                self.cursor.execute("UPDATE produtos SET quantidade = quantidade - ? WHERE id = ?", (quantidade, id_item))
-            elif tipo.lower() == 'saida':
-                self.cursor.execute("UPDATE produtos SET quantidade = quantidade + ? WHERE id = ?", (quantidade, id_item))
-            self.cursor.execute("DELETE FROM movimentacoes WHERE id = ?", (movement_id,))
-            self.conn.commit()
-            return "Sucesso"
+            with self.pool.transaction():
+                mov = self.fetch_one("SELECT id_item, tipo, quantidade, preco_transacao, dia FROM movimentacoes WHERE id = ?", (movement_id,))
+                if not mov:
+                    self.conn.rollback(); return "Movimentação não encontrada."
+                id_item, tipo, quantidade, preco_transacao, dia = mov
+                if tipo.lower() == 'entrada':
+                    self.cursor.execute("UPDATE produtos SET quantidade = quantidade - ? WHERE id = ?", (quantidade, id_item))
+                elif tipo.lower() == 'saida':
+                    self.cursor.execute("UPDATE produtos SET quantidade = quantidade + ? WHERE id = ?", (quantidade, id_item))
+                self.cursor.execute("DELETE FROM movimentacoes WHERE id = ?", (movement_id,))
+                self._apply_to_daily_summary(dia, id_item, tipo, quantidade, preco_transacao, -1)
         except sqlite3.Error as e:
-            self.conn.rollback(); return f"Erro ao reverter: {e}"
+            return f"Erro ao reverter: {e}"
+        self.cache.invalidate("estoque", id_item); self._summary_changed()
+        return "Sucesso"
 
-    def add_notification(self, message):
+    # --- RESUMO DIÁRIO (resumo_diario) ---
+    _DAILY_SUMMARY_UPSERT = """
+    INSERT INTO resumo_diario (dia, id_item, valor_entrada, valor_saida, qtd_entrada, qtd_saida) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(dia, id_item) DO UPDATE SET
+        valor_entrada = valor_entrada + excluded.valor_entrada, valor_saida = valor_saida + excluded.valor_saida,
+        qtd_entrada = qtd_entrada + excluded.qtd_entrada, qtd_saida = qtd_saida + excluded.qtd_saida
+    """
+
+    def _apply_to_daily_summary(self, dia, id_item, tipo, quantidade, preco_transacao, sign):
+        """Soma (sign=1) ou desfaz (sign=-1) uma movimentação no resumo. Não faz commit."""
+        tipo = tipo.lower()
+        if tipo not in ('entrada', 'saida'): return
+        valor = sign * quantidade * preco_transacao; qtd = sign * quantidade
+        valor_e, valor_s = (valor, 0) if tipo == 'entrada' else (0, valor)
+        qtd_e, qtd_s = (qtd, 0) if tipo == 'entrada' else (0, qtd)
+        self.cursor.execute(self._DAILY_SUMMARY_UPSERT, (dia, id_item, valor_e, valor_s, qtd_e, qtd_s))
+        if sign < 0:
+            self.cursor.execute("DELETE FROM resumo_diario WHERE dia = ? AND id_item = ? AND qtd_entrada = 0 AND qtd_saida = 0", (dia, id_item))
+
+    def _daily_summary_from_ledger_query(self):
+        return """
+        SELECT dia, id_item,
+            SUM(CASE WHEN tipo = 'entrada' THEN quantidade * preco_transacao ELSE 0 END),
+            SUM(CASE WHEN tipo = 'saida' THEN quantidade * preco_transacao ELSE 0 END),
+            SUM(CASE WHEN tipo = 'entrada' THEN quantidade ELSE 0 END),
+            SUM(CASE WHEN tipo = 'saida' THEN quantidade ELSE 0 END)
+        FROM movimentacoes GROUP BY dia, id_item
+        """
+
+    # --- CACHE DOS RESUMOS DO DASHBOARD ---
+    # Os resultados de get_summary_* e get_total_sales_by_product ficam num CatalogCache
+    # próprio, com chave (consulta, filtro, datas, agrupamento). A tag "resumo" é a versão
+    # dos dados: toda escrita em resumo_diario a invalida, e alternar entre visões sobre os
+    # mesmos dados não vai ao banco. Todas as entradas também dependem de "produtos": renomear
+    # muda os nomes e excluir apaga as linhas do produto no resumo (ON DELETE CASCADE).
+    def summary_version(self):
+        return self.report_cache.generation("resumo")
+    def report_cache_stats(self):
+        return self.report_cache.stats()
+    def _summary_changed(self):
+        self.report_cache.invalidate("resumo")
+    def _cached_report(self, tags, key, query, params=()):
+        return self.report_cache.get_or_load(tags, "all", key, lambda: self.fetch_all_readonly(query, params))
+
+    def _fill_daily_summary(self):
+        self.cursor.execute("DELETE FROM resumo_diario")
+        self.cursor.execute("INSERT INTO resumo_diario (dia, id_item, valor_entrada, valor_saida, qtd_entrada, qtd_saida) " + self._daily_summary_from_ledger_query())
+
+    def rebuild_daily_summary(self):
+        """Recalcula todo o resumo_diario a partir de movimentacoes. Devolve o número de linhas geradas."""
+        with self.pool.transaction():
+            self._fill_daily_summary()
+        self._summary_changed()
+        return self.fetch_one("SELECT COUNT(*) FROM resumo_diario")[0]
+
+    def check_daily_summary(self, tolerance=0.005):
+        """Compara resumo_diario com o histórico bruto. Devolve as divergências como
+        (dia, id_item, valores_no_resumo, valores_no_historico); lista vazia = consistente."""
+        ledger = {(r[0], r[1]): r[2:] for r in self.fetch_all(self._daily_summary_from_ledger_query())}
+        summary = {(r[0], r[1]): r[2:] for r in self.fetch_all("SELECT dia, id_item, valor_entrada, valor_saida, qtd_entrada, qtd_saida FROM resumo_diario")}
+        divergences = []
+        for key in sorted(ledger.keys() | summary.keys(), key=lambda k: (k[0] or '', k[1])):
+            expected = ledger.get(key, (0, 0, 0, 0)); actual = summary.get(key, (0, 0, 0, 0))
+            if any(abs((a or 0) - (e or 0)) > tolerance for a, e in zip(actual, expected)):
+                divergences.append((key[0], key[1], actual, expected))
+        return divergences
+
+    def add_notification(self, message, tipo=None, id_produto=None, chave=None):
+        """Registra uma notificação. Se outra com a mesma `chave` já existe, nada é gravado."""
+        self.add_notifications([(message, tipo, id_produto, chave)])
+    def add_notifications(self, notifications):
+        """Registra várias notificações (mensagem, tipo, id_produto, chave) num único commit."""
+        if not notifications: return
         data_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        self.execute_query("INSERT INTO notificacoes (mensagem, data_hora) VALUES (?, ?)", (message, data_hora))
+        self.cursor.executemany(
+            "INSERT OR IGNORE INTO notificacoes (mensagem, tipo, id_produto, chave, data_hora) VALUES (?, ?, ?, ?, ?)",
+            [(*n, data_hora) for n in notifications]
+        )
+        self.conn.commit()
     def get_all_notifications(self):
         return self.fetch_all("SELECT id, mensagem, data_hora, status FROM notificacoes ORDER BY data_hora DESC")
     def get_unread_notification_count(self):
@@ -242,19 +616,56 @@ class DatabaseManager:
         limit_date = (datetime.now() - timedelta(days=days_inactive)).strftime('%Y-%m-%d %H:%M:%S')
         query = """
         SELECT p.id, p.nome FROM produtos p
-        WHERE NOT EXISTS (SELECT 1 FROM notificacoes n WHERE n.mensagem LIKE '%' || p.nome || '%inativ%')
+        WHERE NOT EXISTS (SELECT 1 FROM notificacoes n WHERE n.tipo = 'inatividade' AND n.id_produto = p.id)
         AND (SELECT MAX(m.data_hora) FROM movimentacoes m WHERE m.id_item = p.id) < ?
         """
-        return self.fetch_all(query, (limit_date,))
+        return self.fetch_all_readonly(query, (limit_date,))
     def get_product_financials(self, product_id):
+        """(total gasto, total faturado, itens vendidos) do produto; cada soma é None se não
+        houve movimentação do tipo (inclusive para um produto que não existe)."""
+        # A quantidade distingue "sem movimentação" (None) de movimentações a preço zero.
         query = """
-        SELECT
-            (SELECT SUM(preco_transacao * quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'entrada'),
-            (SELECT SUM(preco_transacao * quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'saida'),
-            (SELECT SUM(quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'saida')
+        SELECT CASE WHEN SUM(qtd_entrada) > 0 THEN SUM(valor_entrada) END,
+               CASE WHEN SUM(qtd_saida) > 0 THEN SUM(valor_saida) END,
+               CASE WHEN SUM(qtd_saida) > 0 THEN SUM(qtd_saida) END
+        FROM resumo_diario WHERE id_item = ?
+        """
+        return self._cached_report(("resumo", "produtos"), ("financeiro_produto", product_id), query, (product_id,))[0]
+
+    def get_financials_for_products(self, product_ids=None, start_date=None, end_date=None):
+        """{id: (id, nome, estoque, total gasto, total faturado, itens vendidos)} dos produtos em
+        `product_ids` (todos, se None), numa só passada agregada por resumo_diario. Com datas,
+        os totais são só os da faixa de dias."""
+        range_clauses, range_params = self._day_range_clauses("r.dia", start_date, end_date)
+        base = f"""
+        SELECT p.id, p.nome, p.quantidade,
+               COALESCE(SUM(r.valor_entrada), 0), COALESCE(SUM(r.valor_saida), 0), COALESCE(SUM(r.qtd_saida), 0)
+        FROM produtos p LEFT JOIN resumo_diario r ON r.id_item = p.id{"".join(" AND " + c for c in range_clauses)}
         """
-        return self.fetch_one(query, (product_id, product_id, product_id))
+        if product_ids is None:
+            rows = self._cached_report(("resumo", "produtos"), ("financeiro", None, start_date, end_date), base + " GROUP BY p.id", tuple(range_params))
+            return {row[0]: row for row in rows}
+        financials = {}; ids = list(product_ids)
+        for start in range(0, len(ids), 500):
+            chunk = tuple(ids[start:start + 500])
+            query = base + f" WHERE p.id IN ({', '.join('?' * len(chunk))}) GROUP BY p.id"
+            for row in self._cached_report(("resumo", "produtos"), ("financeiro", chunk, start_date, end_date), query, (*range_params, *chunk)):
+                financials[row[0]] = row
+        return financials
     
+    def get_last_prices(self, product_ids, movement_type):
+        """{id: preço unitário da última movimentação do tipo} dos produtos em `product_ids` (None se nunca houve)."""
+        prices = {}; ids = list(product_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            query = f"""
+            SELECT p.id, (SELECT m.preco_transacao FROM movimentacoes m WHERE m.id_item = p.id AND m.tipo = ?
+                          ORDER BY m.data_hora DESC LIMIT 1)
+            FROM produtos p WHERE p.id IN ({', '.join('?' * len(chunk))})
+            """
+            prices.update(self.fetch_all_readonly(query, (movement_type, *chunk)))
+        return prices
+
     def get_movements_for_product(self, product_id, movement_type):
         query = f"""
         SELECT m.data_hora, m.quantidade, m.preco_transacao, COALESCE(u.nome_usuario, 'N/A') as usuario,
@@ -266,94 +677,216 @@ class DatabaseManager:
         WHERE m.id_item = ? AND m.tipo = ?
         ORDER BY m.data_hora DESC
         """
-        return self.fetch_all(query, (product_id, movement_type))
+        return self.fetch_all_readonly(query, (product_id, movement_type))
 
-    def get_all_movements(self):
-        query = """
-        SELECT m.id, p.nome, u.nome_usuario, m.tipo, m.quantidade, m.preco_transacao, 
-               COALESCE(c.nome, f.nome, 'N/A') as origem_destino, m.data_hora
-        FROM movimentacoes m 
-        JOIN produtos p ON m.id_item = p.id 
+    def get_product_movements_in_range(self, product_id, start_date=None, end_date=None):
+        """(data_hora, tipo, quantidade, preço, usuário, origem/destino) do produto na faixa de dias, em ordem cronológica."""
+        where_clauses, params = self._day_range_clauses("m.dia", start_date, end_date)
+        where_clauses.insert(0, "m.id_item = ?"); params.insert(0, product_id)
+        query = f"""
+        SELECT m.data_hora, m.tipo, m.quantidade, m.preco_transacao, COALESCE(u.nome_usuario, 'N/A'),
+               COALESCE(c.nome, f.nome, 'N/A')
+        FROM movimentacoes m
         LEFT JOIN usuarios u ON m.id_usuario = u.id
         LEFT JOIN clientes c ON m.id_cliente = c.id
         LEFT JOIN fornecedores f ON m.id_fornecedor = f.id
-        ORDER BY m.data_hora DESC
+        WHERE {" AND ".join(where_clauses)}
+        ORDER BY m.data_hora ASC, m.id ASC
         """
-        return self.fetch_all(query)
+        return self.fetch_all_readonly(query, tuple(params))
+
+    ALL_MOVEMENTS_QUERY = """
+    SELECT m.id, p.nome, u.nome_usuario, m.tipo, m.quantidade, m.preco_transacao, 
+           COALESCE(c.nome, f.nome, 'N/A') as origem_destino, m.data_hora
+    FROM movimentacoes m 
+    JOIN produtos p ON m.id_item = p.id 
+    LEFT JOIN usuarios u ON m.id_usuario = u.id
+    LEFT JOIN clientes c ON m.id_cliente = c.id
+    LEFT JOIN fornecedores f ON m.id_fornecedor = f.id
+    ORDER BY m.data_hora DESC
+    """
+
+    def get_all_movements(self):
+        return self.fetch_all_readonly(self.ALL_MOVEMENTS_QUERY)
     
-    def get_summary_for_all_products(self, start_date=None, end_date=None):
-        query = """
-        SELECT
-            strftime('%Y-%m-%d', m.data_hora) as dia, m.id_item, p.nome,
-            SUM(CASE WHEN m.tipo = 'entrada' THEN m.quantidade * m.preco_transacao ELSE 0 END) as valor_entrada,
-            SUM(CASE WHEN m.tipo = 'saida' THEN m.quantidade * m.preco_transacao ELSE 0 END) as valor_saida,
-            SUM(CASE WHEN m.tipo = 'entrada' THEN m.quantidade ELSE 0 END) as qtd_entrada,
-            SUM(CASE WHEN m.tipo = 'saida' THEN m.quantidade ELSE 0 END) as qtd_saida
-        FROM movimentacoes m JOIN produtos p ON m.id_item = p.id
+    def get_movements_page(self, after_cursor=None, limit=200, newer=False):
+        """Uma página do histórico, do mais recente para o mais antigo, por paginação keyset.
+
+        O cursor é (data_hora, id) de uma linha já exibida: com newer=False a página traz
+        as linhas mais antigas que ele; com newer=True, as mais recentes (para rolar de volta).
+        Sem cursor, devolve a primeira página. O custo depende só de `limit`, não do
+        tamanho do histórico. As linhas têm o mesmo formato de get_all_movements.
         """
+        # A página é recortada primeiro pelo índice de data_hora; só depois as poucas
+        # linhas selecionadas são unidas aos nomes (senão o planejador parte de produtos).
+        page_query = "SELECT * FROM movimentacoes"
         params = []
-        where_clauses = []
+        if after_cursor:
+            page_query += " WHERE (data_hora, id) > (?, ?)" if newer else " WHERE (data_hora, id) < (?, ?)"
+            params.extend(after_cursor)
+        page_query += " ORDER BY data_hora ASC, id ASC LIMIT ?" if newer else " ORDER BY data_hora DESC, id DESC LIMIT ?"
+        params.append(limit)
+        query = f"""
+        SELECT m.id, p.nome, u.nome_usuario, m.tipo, m.quantidade, m.preco_transacao,
+               COALESCE(c.nome, f.nome, 'N/A') as origem_destino, m.data_hora
+        FROM ({page_query}) m
+        JOIN produtos p ON m.id_item = p.id
+        LEFT JOIN usuarios u ON m.id_usuario = u.id
+        LEFT JOIN clientes c ON m.id_cliente = c.id
+        LEFT JOIN fornecedores f ON m.id_fornecedor = f.id
+        ORDER BY m.data_hora DESC, m.id DESC
+        """
+        return self.fetch_all_readonly(query, tuple(params))
 
+    @staticmethod
+    def movement_cursor(row):
+        """Cursor keyset (data_hora, id) de uma linha devolvida por get_movements_page."""
+        return (row[7], row[0])
+
+    def _day_range_clauses(self, column, start_date, end_date):
+        """Predicados de faixa sobre a coluna de dia ('YYYY-MM-DD'), ambos os limites inclusivos."""
+        where_clauses, params = [], []
         if start_date:
-            where_clauses.append("strftime('%Y-%m-%d', m.data_hora) >= ?")
-            params.append(start_date)
+            where_clauses.append(f"{column} >= ?"); params.append(start_date)
         if end_date:
-            where_clauses.append("strftime('%Y-%m-%d', m.data_hora) <= ?")
-            params.append(end_date)
-        
+            where_clauses.append(f"{column} <= ?"); params.append(end_date)
+        return where_clauses, params
+
+    # Agrupamento do dashboard: expressão SQL do período sobre a coluna de dia ('YYYY-MM-DD').
+    # A semana é identificada pela segunda-feira em que começa.
+    PERIOD_EXPRESSIONS = {
+        "dia": "{col}",
+        "semana": "date({col}, '-6 days', 'weekday 1')",
+        "mes": "substr({col}, 1, 7)",
+        "ano": "substr({col}, 1, 4)",
+    }
+    # id da série que junta os produtos fora do top N ("Outros"); ids reais são positivos.
+    OTHERS_ID = -1
+
+    def _period_expression(self, column, granularity):
+        if granularity not in self.PERIOD_EXPRESSIONS:
+            raise ValueError(f"Agrupamento de período inválido: {granularity}")
+        return self.PERIOD_EXPRESSIONS[granularity].format(col=column)
+
+    def get_summary_extent(self, start_date=None, end_date=None):
+        """(primeiro dia, último dia, nº de produtos) com movimentação na faixa; usado para escolher o agrupamento."""
+        where_clauses, params = self._day_range_clauses("dia", start_date, end_date)
+        query = "SELECT MIN(dia), MAX(dia), COUNT(DISTINCT id_item) FROM resumo_diario"
         if where_clauses:
             query += " WHERE " + " AND ".join(where_clauses)
+        rows = self._cached_report(("resumo", "produtos"), ("extensao", start_date, end_date), query, tuple(params))
+        return rows[0] if rows else (None, None, 0)
 
-        query += " GROUP BY dia, m.id_item ORDER BY dia ASC, p.nome ASC;"
-        return self.fetch_all(query, tuple(params))
+    def get_summary_for_all_products(self, start_date=None, end_date=None, granularity="dia", top_n=None):
+        """Linhas (período, id, nome, valor_e, valor_s, qtd_e, qtd_s) somadas por `granularity`.
+        Com `top_n`, só os N produtos de maior valor movimentado na faixa ficam separados; o
+        restante vira uma série 'Outros' com id OTHERS_ID."""
+        period = self._period_expression("r.dia", granularity)
+        where_clauses, params = self._day_range_clauses("r.dia", start_date, end_date)
+        where = (" WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+        if top_n is None:
+            group = "r.id_item"
+        else:
+            group = f"""CASE WHEN r.id_item IN (
+                SELECT r.id_item FROM resumo_diario r{where} GROUP BY r.id_item
+                ORDER BY SUM(r.valor_entrada + r.valor_saida) DESC, r.id_item LIMIT ?
+            ) THEN r.id_item ELSE {self.OTHERS_ID} END"""
+            params = params + [top_n] + params
+        query = f"""
+        SELECT b.periodo, b.grupo, COALESCE(p.nome, 'Outros'),
+               SUM(b.valor_entrada), SUM(b.valor_saida), SUM(b.qtd_entrada), SUM(b.qtd_saida)
+        FROM (SELECT {period} AS periodo, {group} AS grupo, r.valor_entrada, r.valor_saida, r.qtd_entrada, r.qtd_saida
+              FROM resumo_diario r{where}) b
+        LEFT JOIN produtos p ON p.id = b.grupo
+        GROUP BY b.periodo, b.grupo
+        ORDER BY b.periodo ASC, b.grupo = {self.OTHERS_ID}, p.nome ASC;
+        """
+        return self._cached_report(("resumo", "produtos"), ("todos", start_date, end_date, granularity, top_n), query, tuple(params))
 
-    def get_summary_for_single_product(self, product_id, start_date=None, end_date=None):
-        query = """
-        SELECT
-            strftime('%Y-%m-%d', data_hora) as dia,
-            SUM(CASE WHEN tipo = 'entrada' THEN quantidade * preco_transacao ELSE 0 END) as valor_entrada,
-            SUM(CASE WHEN tipo = 'saida' THEN quantidade * preco_transacao ELSE 0 END) as valor_saida,
-            SUM(CASE WHEN tipo = 'entrada' THEN quantidade ELSE 0 END) as qtd_entrada,
-            SUM(CASE WHEN tipo = 'saida' THEN quantidade ELSE 0 END) as qtd_saida
-        FROM movimentacoes
+    def get_summary_for_single_product(self, product_id, start_date=None, end_date=None, granularity="dia"):
+        period = self._period_expression("dia", granularity)
+        query = f"""
+        SELECT {period} AS periodo, SUM(valor_entrada), SUM(valor_saida), SUM(qtd_entrada), SUM(qtd_saida)
+        FROM resumo_diario
         """
-        params = [product_id]
-        where_clauses = ["id_item = ?"]
+        where_clauses, params = self._day_range_clauses("dia", start_date, end_date)
+        where_clauses.insert(0, "id_item = ?"); params.insert(0, product_id)
 
-        if start_date:
-            where_clauses.append("strftime('%Y-%m-%d', data_hora) >= ?")
-            params.append(start_date)
-        if end_date:
-            where_clauses.append("strftime('%Y-%m-%d', data_hora) <= ?")
-            params.append(end_date)
-            
         query += " WHERE " + " AND ".join(where_clauses)
-        query += " GROUP BY dia ORDER BY dia ASC;"
-        return self.fetch_all(query, tuple(params))
+        query += " GROUP BY periodo ORDER BY periodo ASC;"
+        return self._cached_report(("resumo", "produtos"), ("produto", product_id, start_date, end_date, granularity), query, tuple(params))
 
-    def get_total_sales_by_product(self):
-        query = """
-        SELECT p.id, p.nome, SUM(m.quantidade * m.preco_transacao) as total_vendido
-        FROM movimentacoes m JOIN produtos p ON m.id_item = p.id
-        WHERE m.tipo = 'saida' GROUP BY p.id, p.nome
-        HAVING total_vendido > 0 ORDER BY total_vendido DESC;
+    def get_total_sales_by_product(self, top_n=None, start_date=None, end_date=None):
+        where_clauses, params = self._day_range_clauses("r.dia", start_date, end_date)
+        where = (" WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+        if top_n is None:
+            query = f"""
+            SELECT p.id, p.nome, SUM(r.valor_saida) as total_vendido
+            FROM resumo_diario r JOIN produtos p ON r.id_item = p.id{where}
+            GROUP BY p.id, p.nome
+            HAVING total_vendido > 0 ORDER BY total_vendido DESC;
+            """
+            return self._cached_report(("resumo", "produtos"), ("vendas", None, start_date, end_date), query, tuple(params))
+        # Fatias além das N maiores viram uma só fatia 'Outros' (no fim).
+        query = f"""
+        SELECT CASE WHEN posicao <= ? THEN id ELSE {self.OTHERS_ID} END AS grupo,
+               CASE WHEN posicao <= ? THEN nome ELSE 'Outros' END, SUM(total_vendido) AS total
+        FROM (SELECT p.id, p.nome, SUM(r.valor_saida) AS total_vendido,
+                     ROW_NUMBER() OVER (ORDER BY SUM(r.valor_saida) DESC, p.id) AS posicao
+              FROM resumo_diario r JOIN produtos p ON r.id_item = p.id{where}
+              GROUP BY p.id, p.nome HAVING total_vendido > 0)
+        GROUP BY grupo ORDER BY grupo = {self.OTHERS_ID}, total DESC;
         """
-        return self.fetch_all(query)
+        return self._cached_report(("resumo", "produtos"), ("vendas", top_n, start_date, end_date), query, (top_n, top_n, *params))
+    # --- BUSCA TEXTUAL ---
+    def _has_fts(self, table):
+        return self.fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_fts",)) is not None
+
+    @staticmethod
+    def _fts_match_expression(term):
+        # Cada palavra vira um prefixo entre aspas ("nt-gmr"* casa com NT-GMR-001); todas precisam casar.
+        words = term.split()
+        return " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+
+    def _search(self, table, select_columns, term, limit, order_by):
+        term = (term or "").strip()
+        if not term: return []
+        cols = ", ".join(f"t.{c}" for c in select_columns)
+        if self._has_fts(table):
+            query = f"""
+            SELECT {cols} FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid
+            WHERE {table}_fts MATCH ? ORDER BY bm25({table}_fts) LIMIT ?
+            """
+            return self.fetch_all(query, (self._fts_match_expression(term), limit))
+        searched = self.FTS_TABLES[table]
+        where = " OR ".join(f"t.{c} LIKE ?" for c in searched)
+        query = f"SELECT {cols} FROM {table} t WHERE {where} ORDER BY t.{order_by} LIMIT ?"
+        return self.fetch_all(query, tuple([f"%{term}%"] * len(searched)) + (limit,))
+
+    def search_products(self, term, limit=200):
+        return self._search("produtos", ["id", "nome", "codigo_sku", "descricao", "quantidade"], term, limit, "nome")
+    def search_clients(self, term, limit=200):
+        return self._search("clientes", ["id", "nome", "cpf_cnpj", "telefone", "email", "endereco"], term, limit, "nome")
+    def search_suppliers(self, term, limit=200):
+        return self._search("fornecedores", ["id", "nome", "contato", "endereco"], term, limit, "nome")
+
     def get_all_clients(self):
-        return self.fetch_all("SELECT id, nome, cpf_cnpj, telefone, email, endereco FROM clientes ORDER BY nome")
+        return self.cache.get_or_load(("clientes",), "all", None, lambda: self.fetch_all("SELECT id, nome, cpf_cnpj, telefone, email, endereco FROM clientes ORDER BY nome"))
     def add_client(self, nome, cpf_cnpj, tel, email, end):
-        return self.execute_query("INSERT INTO clientes (nome, cpf_cnpj, telefone, email, endereco) VALUES (?, ?, ?, ?, ?)", (nome, cpf_cnpj, tel, email, end))
+        return self._write_catalog("clientes", None, "INSERT INTO clientes (nome, cpf_cnpj, telefone, email, endereco) VALUES (?, ?, ?, ?, ?)", (nome, cpf_cnpj, tel, email, end))
     def update_client(self, client_id, nome, cpf_cnpj, tel, email, end):
-        return self.execute_query("UPDATE clientes SET nome=?, cpf_cnpj=?, telefone=?, email=?, endereco=? WHERE id=?", (nome, cpf_cnpj, tel, email, end, client_id))
+        return self._write_catalog("clientes", client_id, "UPDATE clientes SET nome=?, cpf_cnpj=?, telefone=?, email=?, endereco=? WHERE id=?", (nome, cpf_cnpj, tel, email, end, client_id))
     def delete_client(self, client_id):
-        return self.execute_query("DELETE FROM clientes WHERE id = ?", (client_id,))
+        return self._write_catalog("clientes", client_id, "DELETE FROM clientes WHERE id = ?", (client_id,))
     def get_all_suppliers(self):
-        return self.fetch_all("SELECT id, nome, contato, endereco FROM fornecedores ORDER BY nome")
+        return self.cache.get_or_load(("fornecedores",), "all", None, lambda: self.fetch_all("SELECT id, nome, contato, endereco FROM fornecedores ORDER BY nome"))
     def add_supplier(self, nome, contato, endereco):
-        return self.execute_query("INSERT INTO fornecedores (nome, contato, endereco) VALUES (?, ?, ?)", (nome, contato, endereco))
+        return self._write_catalog("fornecedores", None, "INSERT INTO fornecedores (nome, contato, endereco) VALUES (?, ?, ?)", (nome, contato, endereco))
     def update_supplier(self, sup_id, nome, contato, endereco):
-        return self.execute_query("UPDATE fornecedores SET nome=?, contato=?, endereco=? WHERE id=?", (nome, contato, endereco, sup_id))
+        return self._write_catalog("fornecedores", sup_id, "UPDATE fornecedores SET nome=?, contato=?, endereco=? WHERE id=?", (nome, contato, endereco, sup_id))
     def delete_supplier(self, sup_id):
-        return self.execute_query("DELETE FROM fornecedores WHERE id = ?", (sup_id,))
+        result = self._write_catalog("fornecedores", sup_id, "DELETE FROM fornecedores WHERE id = ?", (sup_id,))
+        self.cache.invalidate("produtos")  # o ON DELETE SET NULL zera produtos.id_fornecedor
+        return result
     def close(self):
-        self.conn.close()
\ No newline at end of file
+        self.pool.close_all()
\ No newline at end of file
@@ -0,0 +1,140 @@
+# database/product_lookup.py
+# Busca de produtos no OpenFoodFacts pelo código de barras, com cache na tabela
+# cache_openfoodfacts. Releituras do mesmo código (encontrado ou não) respondem do banco,
+# e um terminal sem conexão usa o que já consultou em vez de esperar o timeout.
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+OFF_URL = "https://world.openfoodfacts.org/api/v0/product/{code}.json"
+# Só os campos usados no cadastro (generate_sku_from_off e o preenchimento do formulário).
+OFF_FIELDS = ("product_name", "generic_name", "brands", "quantity")
+
+
+def normalize_barcode(code):
+    """Chave do cache: os dígitos do código completados com zeros até 13 (UPC-A, EAN-13 com
+    zero à esquerda e EAN-8 lidos de formas diferentes caem na mesma chave); None sem dígitos."""
+    digits = re.sub(r'\D', '', str(code or ''))
+    if not digits: return None
+    return digits.zfill(13) if len(digits) < 13 else digits
+
+
+def barcode_candidates(code):
+    """Formas do código tentadas no OpenFoodFacts, na ordem, até uma ser encontrada."""
+    digits = re.sub(r'\D', '', str(code or ''))
+    if not digits: return []
+    candidates = [digits]
+    if len(digits) == 12: candidates.append('0' + digits)
+    if len(digits) == 13 and digits.startswith('0'): candidates.append(digits[1:])
+    if len(digits) < 12: candidates += [digits.zfill(12), digits.zfill(13)]
+    return list(dict.fromkeys(candidates))
+
+
+class LookupUnavailable(Exception):
+    """O OpenFoodFacts não respondeu (sem rede, timeout, erro do servidor): nada vai para o cache."""
+
+
+class ProductLookup:
+    """OpenFoodFacts com cache no banco.
+
+    `lookup(code)` devolve (produto, origem): o produto é um dict com OFF_FIELDS ou None, e a
+    origem é "cache", "rede", "inválido" (código sem dígitos, nem consultado) ou "indisponível"
+    (sem rede e sem nada no cache, então None não quer dizer que o código não existe).
+    Encontrados valem `ttl_days` e "não encontrado" vale `negative_ttl_hours`. Quando a
+    rede falha, uma entrada vencida ainda é usada e a rede fica em pausa por `retry_seconds`:
+    as próximas leituras respondem na hora em vez de esperar o timeout de novo. Com
+    `offline=True` a rede nunca é usada.
+    `url` tem `{code}` no lugar do código (aponte para um servidor local nos testes). Pode
+    rodar em qualquer thread: cada uma usa a própria conexão do pool e a própria sessão HTTP.
+    """
+
+    def __init__(self, db_manager, url=OFF_URL, timeout=4, ttl_days=30, negative_ttl_hours=24, offline=False, retry_seconds=60):
+        self.db = db_manager; self.url = url; self.timeout = timeout
+        self.ttl = timedelta(days=ttl_days); self.negative_ttl = timedelta(hours=negative_ttl_hours)
+        self.offline = offline; self.retry_seconds = retry_seconds
+        self._local = threading.local(); self._paused_until = 0.0
+        self.hits = 0; self.negative_hits = 0; self.stale_hits = 0; self.requests = 0; self.failures = 0
+
+    @classmethod
+    def from_config(cls, db_manager, config):
+        section = 'OpenFoodFacts'
+        return cls(db_manager, url=config.get(section, 'url', fallback=OFF_URL),
+                   timeout=config.getfloat(section, 'timeout_seconds', fallback=4),
+                   ttl_days=config.getfloat(section, 'cache_days', fallback=30),
+                   negative_ttl_hours=config.getfloat(section, 'not_found_cache_hours', fallback=24),
+                   offline=config.getboolean(section, 'offline', fallback=False),
+                   retry_seconds=config.getfloat(section, 'retry_seconds', fallback=60))
+
+    def lookup(self, code):
+        key = normalize_barcode(code)
+        if key is None: return None, "inválido"  # QR/texto: o OpenFoodFacts só tem códigos numéricos
+        row = self.db.fetch_one("SELECT produto, consultado_em FROM cache_openfoodfacts WHERE codigo = ?", (key,))
+        cached = json.loads(row[0]) if row and row[0] else None
+        if row:
+            age = datetime.now() - datetime.strptime(row[1], '%Y-%m-%d %H:%M:%S')
+            if age < (self.ttl if cached else self.negative_ttl):
+                if cached: self.hits += 1
+                else: self.negative_hits += 1
+                return cached, "cache"
+        if self.offline or time.monotonic() < self._paused_until:
+            return self._stale(row, cached)
+        try:
+            product = self._fetch(code)
+        except LookupUnavailable as e:
+            self.failures += 1; self._paused_until = time.monotonic() + self.retry_seconds
+            print(f"OpenFoodFacts indisponível ({e}); usando o cache por {self.retry_seconds:.0f} s.")
+            return self._stale(row, cached)
+        self.db.execute_query("INSERT OR REPLACE INTO cache_openfoodfacts (codigo, produto, consultado_em) VALUES (?, ?, ?)",
+                              (key, json.dumps(product, ensure_ascii=False) if product else None, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        return product, "rede"
+
+    def _stale(self, row, cached):
+        if not row: return None, "indisponível"
+        self.stale_hits += 1
+        return cached, "cache"
+
+    def _session(self):
+        # Uma sessão por thread reaproveita a conexão HTTPS entre as formas do código.
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+        return session
+
+    def _fetch(self, code):
+        """Produto do primeiro candidato encontrado, None se nenhum existe; LookupUnavailable se a rede falhou."""
+        import requests
+        session = self._session()
+        for candidate in barcode_candidates(code):
+            self.requests += 1
+            try:
+                resp = session.get(self.url.format(code=candidate), params={'fields': ",".join(OFF_FIELDS)}, timeout=self.timeout)
+            except requests.RequestException as e:
+                raise LookupUnavailable(str(e)) from e
+            # A API responde 404 (v2, às vezes com uma página HTML) ou 200 com status 0 (v0) para
+            # um código que não existe: 404 é "não encontrado" sem nem olhar o corpo.
+            if resp.status_code == 404: continue
+            if resp.status_code != 200: raise LookupUnavailable(f"HTTP {resp.status_code}")
+            try: data = resp.json()
+            except ValueError as e: raise LookupUnavailable("resposta inválida") from e
+            if data.get('status') == 1 and data.get('product'):
+                return {field: data['product'].get(field) for field in OFF_FIELDS}
+        return None
+
+    def stats(self):
+        return {'hits': self.hits, 'negative_hits': self.negative_hits, 'stale_hits': self.stale_hits,
+                'requests': self.requests, 'failures': self.failures}
+
+    def purge(self, expired_only=True):
+        """Apaga as entradas vencidas (ou todas); devolve quantas."""
+        if not expired_only:
+            self.db.cursor.execute("DELETE FROM cache_openfoodfacts"); self.db.conn.commit()
+            return self.db.cursor.rowcount
+        now = datetime.now(); fmt = '%Y-%m-%d %H:%M:%S'
+        self.db.cursor.execute("DELETE FROM cache_openfoodfacts WHERE consultado_em < CASE WHEN produto IS NULL THEN ? ELSE ? END",
+                               ((now - self.negative_ttl).strftime(fmt), (now - self.ttl).strftime(fmt)))
+        self.db.conn.commit()
+        return self.db.cursor.rowcount
@@ -2,10 +2,12 @@
 
 import customtkinter as ctk
 from database.db_manager import DatabaseManager
+from database.product_lookup import OFF_URL
 from ui.login_window import LoginWindow
-from ui.main_app_window import MainAppWindow
+from ui.preload import preload_in_background
 import configparser # <--- NOVO IMPORT
 import os
+import time
 
 class App:
     def __init__(self):
@@ -29,20 +31,40 @@ class App:
         self.config['Settings'] = {
             'default_theme': 'dark',
             'export_path': './exports',
+            'export_compress': 'false',
             'backup_path': './backups',
+            'backup_interval_hours': '24',
+            'backup_keep': '7',
+            'backup_compress': 'true',
+            'scanner_dedupe_seconds': '1.0',
+            'scanner_source': '',
+            'scanner_source_fps': '30',
             'low_stock_percentage': '30',
-            'inactivity_days': '20'
+            'inactivity_days': '20',
+            'startup_log': ''
+        }
+        self.config['OpenFoodFacts'] = {
+            'url': OFF_URL,
+            'timeout_seconds': '4',
+            'cache_days': '30',
+            'not_found_cache_hours': '24',
+            'offline': 'false',
+            'retry_seconds': '60'
         }
         with open('config.ini', 'w') as configfile:
             self.config.write(configfile)
 
     def show_login_window(self):
         login_win = LoginWindow(self.db_manager, self.on_login_success)
+        # A janela principal (matplotlib, reportlab, requests...) é importada enquanto o login está aberto.
+        preload_in_background()
         login_win.mainloop()
 
     def on_login_success(self, user_id):
         """Callback que recebe o ID do usuário logado."""
-        self.root = MainAppWindow(self.db_manager, user_id, self.config) # Passa a config para a janela principal
+        started_at = time.perf_counter()  # início do relatório de tempo de inicialização
+        from ui.main_app_window import MainAppWindow  # normalmente já pré-carregado
+        self.root = MainAppWindow(self.db_manager, user_id, self.config, started_at=started_at) # Passa a config para a janela principal
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.root.mainloop()
 
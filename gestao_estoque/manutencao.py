@@ -0,0 +1,134 @@
+# manutencao.py
+# Comandos de manutenção do banco de dados, executados sem a interface gráfica.
+#
+# Uso (dentro de gestao_estoque/):
+#     python manutencao.py resumo --verificar
+#     python manutencao.py resumo --reconstruir
+#     python manutencao.py backup [--listar]
+#     python manutencao.py verificar-backup backups/estoque_20250101_120000.db.gz
+#     python manutencao.py restaurar backups/estoque_20250101_120000.db.gz
+#     python manutencao.py cache-openfoodfacts --limpar 7891000315507 7894900011517
+
+import argparse
+import configparser
+import sys
+from database.backup import BackupError, BackupManager
+from database.db_manager import DatabaseManager
+from database.product_lookup import ProductLookup
+
+
+def cmd_resumo(db, args):
+    if args.reconstruir:
+        linhas = db.rebuild_daily_summary()
+        print(f"resumo_diario reconstruído: {linhas} linhas.")
+    divergencias = db.check_daily_summary()
+    if not divergencias:
+        print("resumo_diario consistente com movimentacoes.")
+        return 0
+    print(f"{len(divergencias)} divergência(s) entre resumo_diario e movimentacoes:")
+    for dia, id_item, resumo, historico in divergencias[:20]:
+        print(f"  {dia} produto {id_item}: resumo={resumo} histórico={historico}")
+    print("Execute 'python manutencao.py resumo --reconstruir' para corrigir.")
+    return 1
+
+
+def _backup_manager(db, args):
+    config = configparser.ConfigParser(); config.read('config.ini')
+    destino = args.destino or config.get('Settings', 'backup_path', fallback='./backups')
+    manter = args.manter if args.manter is not None else config.getint('Settings', 'backup_keep', fallback=7)
+    compress = config.getboolean('Settings', 'backup_compress', fallback=True) and not getattr(args, 'sem_compressao', False)
+    return BackupManager(db.db_path, destino, keep=manter, compress=compress)
+
+
+def cmd_backup(db, args):
+    manager = _backup_manager(db, args)
+    if args.listar:
+        for path in manager.list_backups(): print(path)
+        return 0
+    info = manager.create_backup()
+    print(f"Backup gravado em {info['path']} ({info['pages']} páginas, {info['bytes'] / 2**20:.1f} MB, {info['seconds']:.1f} s).")
+    return 0
+
+
+def cmd_verificar_backup(db, args):
+    problemas = _backup_manager(db, args).verify_backup(args.arquivo)
+    if not problemas:
+        print(f"{args.arquivo}: íntegro.")
+        return 0
+    print(f"{args.arquivo}: {len(problemas)} problema(s):")
+    for problema in problemas[:20]: print(f"  {problema}")
+    return 1
+
+
+def cmd_restaurar(db, args):
+    if not args.sim:
+        resposta = input(f"O conteúdo de {db.db_path} será substituído por {args.arquivo}. Feche o aplicativo antes. Continuar? [s/N] ")
+        if resposta.strip().lower() not in ("s", "sim"): return 1
+    try:
+        seguranca = _backup_manager(db, args).restore(args.arquivo)
+    except BackupError as e:
+        print(e)
+        return 1
+    if seguranca: print(f"Banco anterior salvo em {seguranca}.")
+    print("Restauração concluída.")
+    return 0
+
+
+def cmd_cache_openfoodfacts(db, args):
+    config = configparser.ConfigParser(); config.read('config.ini')
+    lookup = ProductLookup.from_config(db, config)
+    if args.limpar:
+        print(f"{lookup.purge(expired_only=not args.tudo)} entrada(s) removida(s) do cache.")
+    # Códigos passados são consultados agora (com rede): um terminal que vai ficar sem
+    # conexão já leva no cache os produtos que vai receber.
+    for codigo in args.codigos:
+        produto, origem = lookup.lookup(codigo)
+        print(f"  {codigo}: {(produto.get('product_name') or '(sem nome)') if produto else 'não encontrado'} ({origem})")
+    total, nao_encontrados = db.fetch_one("SELECT COUNT(*), COUNT(*) - COUNT(produto) FROM cache_openfoodfacts")
+    print(f"Cache do OpenFoodFacts: {total} código(s), {nao_encontrados} não encontrado(s).")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manutenção do banco de dados do Sistema de Estoque")
+    parser.add_argument("--db", default="estoque.db", help="Arquivo do banco (relativo à pasta do aplicativo)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_resumo = sub.add_parser("resumo", help="Verifica ou reconstrói a tabela resumo_diario")
+    grupo = p_resumo.add_mutually_exclusive_group()
+    grupo.add_argument("--verificar", action="store_true", help="Compara o resumo com o histórico (padrão)")
+    grupo.add_argument("--reconstruir", action="store_true", help="Recalcula o resumo a partir do histórico")
+    p_resumo.set_defaults(func=cmd_resumo)
+
+    # backup_path, backup_keep e backup_compress vêm do config.ini; as opções abaixo os substituem.
+    p_backup = sub.add_parser("backup", help="Faz um backup do banco (pode rodar com o aplicativo aberto)")
+    p_backup.add_argument("--listar", action="store_true", help="Lista os backups existentes, do mais recente ao mais antigo")
+    p_backup.add_argument("--sem-compressao", action="store_true", help="Grava o .db sem gzip")
+    p_backup.set_defaults(func=cmd_backup)
+    p_verificar = sub.add_parser("verificar-backup", help="Roda integrity_check num arquivo de backup")
+    p_verificar.add_argument("arquivo")
+    p_verificar.set_defaults(func=cmd_verificar_backup)
+    p_restaurar = sub.add_parser("restaurar", help="Substitui o banco pelo conteúdo de um backup")
+    p_restaurar.add_argument("arquivo")
+    p_restaurar.add_argument("--sim", action="store_true", help="Não pede confirmação")
+    p_restaurar.set_defaults(func=cmd_restaurar)
+    for p in (p_backup, p_verificar, p_restaurar):
+        p.add_argument("--destino", help="Pasta dos backups (padrão: backup_path do config.ini)")
+        p.add_argument("--manter", type=int, help="Quantos backups manter (padrão: backup_keep do config.ini)")
+
+    p_off = sub.add_parser("cache-openfoodfacts", help="Mostra, limpa ou pré-carrega o cache de consultas ao OpenFoodFacts")
+    p_off.add_argument("codigos", nargs="*", help="Códigos de barras para consultar e guardar no cache")
+    p_off.add_argument("--limpar", action="store_true", help="Remove as entradas vencidas")
+    p_off.add_argument("--tudo", action="store_true", help="Com --limpar, remove todas as entradas")
+    p_off.set_defaults(func=cmd_cache_openfoodfacts)
+
+    args = parser.parse_args(argv)
+    db = DatabaseManager(args.db)
+    try:
+        return args.func(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
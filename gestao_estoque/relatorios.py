@@ -0,0 +1,198 @@
+# relatorios.py
+# Relatórios sem a interface gráfica (sem login nem display), para rodar agendados (cron,
+# Agendador de Tarefas). Os gráficos são desenhados com o backend Agg do matplotlib.
+#
+# Uso (dentro de gestao_estoque/ ou de qualquer pasta):
+#     python relatorios.py dashboard --inicio 2025-01-01 --fim 2025-01-31
+#     python relatorios.py csv --compactar
+#     python relatorios.py produtos --dias 1 --processos 4
+#     python relatorios.py tudo --dias 1
+
+import matplotlib
+matplotlib.use("Agg")  # antes de qualquer import de gráficos: cron não tem display
+
+import argparse
+import configparser
+import multiprocessing
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from database.csv_export import CsvExport
+from database.db_manager import DatabaseManager, get_base_path
+from ui.pdf_report import dashboard_report, product_report
+
+GRANULARIDADES = {"auto": None, "dia": "dia", "semana": "semana", "mes": "mes", "ano": "ano"}
+METRICAS = {"valor": "Valor", "quantidade": "Quantidade"}
+
+
+def _config():
+    # O config.ini é o da pasta do aplicativo, não o da pasta de onde o cron chama o script.
+    config = configparser.ConfigParser(); config.read(os.path.join(get_base_path(), 'config.ini'))
+    return config
+
+
+def _pasta_saida(args, config):
+    pasta = args.saida or config.get('Settings', 'export_path', fallback='./exports')
+    if not os.path.isabs(pasta): pasta = os.path.join(get_base_path(), pasta)
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def _periodo(args):
+    """(início, fim) como 'YYYY-MM-DD' ou None; `--dias N` são os N dias até ontem."""
+    if args.dias:
+        fim = date.today() - timedelta(days=1)
+        return (fim - timedelta(days=args.dias - 1)).isoformat(), fim.isoformat()
+    for valor in (args.inicio, args.fim):
+        if valor: date.fromisoformat(valor)  # ValueError com a data inválida na mensagem
+    if args.inicio and args.fim and args.inicio > args.fim: return args.fim, args.inicio
+    return args.inicio, args.fim
+
+
+def _sufixo(inicio, fim):
+    return f"{inicio or 'inicio'}_a_{fim or 'hoje'}"
+
+
+def _slug(texto):
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9]+', '_', texto).strip('_').lower()[:40] or "produto"
+
+
+def cmd_dashboard(db, args, config):
+    inicio, fim = _periodo(args)
+    pasta = _pasta_saida(args, config)
+    caminho = os.path.join(pasta, f"dashboard_{args.grafico}_{_sufixo(inicio, fim)}.pdf")
+    report = dashboard_report(db, caminho, args.grafico, start_date=inicio, end_date=fim, view_mode=METRICAS[args.metrica],
+                              granularity=GRANULARIDADES[args.agrupar], top_n=args.top or None)
+    print(f"Dashboard: {report.run()} ({report.rows_total} linhas)")
+    return 0
+
+
+def cmd_csv(db, args, config):
+    compactar = args.compactar or config.getboolean('Settings', 'export_compress', fallback=False)
+    for caminho in CsvExport(db, _pasta_saida(args, config), compress=compactar).run():
+        print(f"CSV: {caminho}")
+    return 0
+
+
+# --- Relatórios por produto em paralelo ---
+# Cada processo abre o próprio DatabaseManager uma vez (initializer) e gera vários PDFs:
+# matplotlib e reportlab são CPU puro em Python, então threads não passariam do GIL.
+_db_processo = None
+
+
+def _iniciar_processo(db_path):
+    global _db_processo
+    _db_processo = DatabaseManager(db_path)
+
+
+def _relatorio_produto(pid, nome, caminho, inicio, fim, view_mode, granularity):
+    product_report(_db_processo, caminho, pid, nome, inicio, fim, view_mode, granularity).run()
+    return caminho
+
+
+def gerar_relatorios_produtos(db_path, produtos, pasta, inicio, fim, view_mode="Valor", granularity=None, processos=None):
+    """Gera um PDF por (id, nome) em `produtos` e devolve os caminhos. `processos=1` roda tudo
+    neste processo; None usa um processo por núcleo."""
+    tarefas = [(pid, nome, os.path.join(pasta, f"produto_{pid}_{_slug(nome)}_{_sufixo(inicio, fim)}.pdf"), inicio, fim, view_mode, granularity)
+               for pid, nome in produtos]
+    processos = min(processos or os.cpu_count() or 1, len(tarefas))
+    if processos <= 1:
+        _iniciar_processo(db_path)
+        try: return [_relatorio_produto(*tarefa) for tarefa in tarefas]
+        finally: _db_processo.close()
+    # chunksize > 1: cada ida e volta ao pool leva vários produtos.
+    chunksize = max(1, len(tarefas) // (processos * 4))
+    # spawn em todas as plataformas (é o único no Windows): os filhos não herdam as conexões SQLite abertas aqui.
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_iniciar_processo, initargs=(db_path,)) as pool:
+        return list(pool.map(_relatorio_produto, *zip(*tarefas), chunksize=chunksize))
+
+
+def cmd_produtos(db, args, config):
+    inicio, fim = _periodo(args)
+    if args.ids:
+        nomes = dict(db.get_product_names())
+        produtos = [(pid, nomes[pid]) for pid in args.ids if pid in nomes]
+        for pid in set(args.ids) - set(nomes): print(f"Produto {pid} não encontrado; ignorado.")
+    elif args.todos:
+        produtos = db.get_product_names()
+    else:
+        # Por padrão, só os produtos que tiveram movimentação no período.
+        ativos = {row[1] for row in db.get_summary_for_all_products(inicio, fim, "ano")}
+        produtos = [(pid, nome) for pid, nome in db.get_product_names() if pid in ativos]
+    inicio_t = time.perf_counter()
+    caminhos = gerar_relatorios_produtos(db.db_path, produtos, _pasta_saida(args, config), inicio, fim,
+                                         METRICAS[args.metrica], GRANULARIDADES[args.agrupar], args.processos)
+    print(f"{len(caminhos)} relatório(s) de produto em {time.perf_counter() - inicio_t:.1f} s"
+          + (f", em {os.path.dirname(caminhos[0])}" if caminhos else ""))
+    return 0
+
+
+def cmd_tudo(db, args, config):
+    for cmd in (cmd_dashboard, cmd_csv, cmd_produtos):
+        cmd(db, args, config)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relatórios do Sistema de Estoque sem a interface gráfica")
+    parser.add_argument("--db", default="estoque.db", help="Arquivo do banco (relativo à pasta do aplicativo)")
+    parser.add_argument("--saida", help="Pasta dos arquivos gerados (padrão: export_path do config.ini)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    def periodo(p):
+        p.add_argument("--inicio", help="Primeiro dia (AAAA-MM-DD)")
+        p.add_argument("--fim", help="Último dia (AAAA-MM-DD)")
+        p.add_argument("--dias", type=int, help="Os N dias até ontem (substitui --inicio/--fim)")
+        p.add_argument("--metrica", choices=METRICAS, default="valor")
+        p.add_argument("--agrupar", choices=GRANULARIDADES, default="auto", help="Agrupamento do período nos gráficos")
+
+    p_dash = sub.add_parser("dashboard", help="PDF do dashboard (comparativo ou pizza de vendas)")
+    periodo(p_dash)
+    p_dash.add_argument("--grafico", choices=("colunas", "pizza"), default="colunas")
+    p_dash.add_argument("--top", type=int, default=8, help="Produtos separados no gráfico, o resto em 'Outros' (0 = todos)")
+    p_dash.set_defaults(func=cmd_dashboard)
+
+    p_csv = sub.add_parser("csv", help="Exportação CSV de todas as tabelas")
+    p_csv.add_argument("--compactar", action="store_true", help="Um .csv.gz por tabela")
+    p_csv.set_defaults(func=cmd_csv)
+
+    def produtos(p):
+        grupo = p.add_mutually_exclusive_group()
+        grupo.add_argument("--ids", type=int, nargs="+", help="Só estes produtos")
+        grupo.add_argument("--todos", action="store_true", help="Todos os produtos, mesmo sem movimentação no período")
+        p.add_argument("--processos", type=int, help="Processos em paralelo (padrão: um por núcleo; 1 = sem pool)")
+
+    p_prod = sub.add_parser("produtos", help="Um PDF por produto com gráfico, totais e movimentações do período")
+    periodo(p_prod); produtos(p_prod)
+    p_prod.set_defaults(func=cmd_produtos)
+
+    p_tudo = sub.add_parser("tudo", help="Dashboard, CSV e relatórios por produto (para a rotina noturna)")
+    periodo(p_tudo); produtos(p_tudo)
+    p_tudo.add_argument("--grafico", choices=("colunas", "pizza"), default="colunas")
+    p_tudo.add_argument("--top", type=int, default=8)
+    p_tudo.add_argument("--compactar", action="store_true")
+    p_tudo.set_defaults(func=cmd_tudo)
+
+    args = parser.parse_args(argv)
+    # DatabaseManager criaria um banco novo, com os dados de exemplo, no lugar de um --db errado.
+    db_path = os.path.join(get_base_path(), args.db)
+    if not os.path.exists(db_path):
+        print(f"Banco de dados não encontrado: {db_path}", file=sys.stderr)
+        return 1
+    config = _config()
+    db = DatabaseManager(db_path)
+    try:
+        return args.func(db, args, config)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+# tests/conftest.py
+# Os módulos do sistema são importados como na aplicação (database.*, ui.*), a partir de gestao_estoque/.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_manager import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """DatabaseManager num arquivo temporário, com os dados iniciais de exemplo."""
+    manager = DatabaseManager(str(tmp_path / "estoque.db"))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def produto(db):
+    """id de um produto novo com 10 unidades em estoque."""
+    db.add_product("Produto de Teste", "SKU-TESTE", "", 10)
+    return db.fetch_one("SELECT id FROM produtos WHERE codigo_sku = 'SKU-TESTE'")[0]
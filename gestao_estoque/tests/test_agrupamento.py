@@ -0,0 +1,82 @@
+# tests/test_agrupamento.py
+# Agrupamento automático do dashboard (dia/semana/mês/ano) e a série "Outros" do top N.
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from ui.dashboard_charts import choose_granularity, resolve_granularity  # noqa: E402
+
+
+def _produtos(db, movimentos):
+    """movimentos: {nome: [(dia, tipo, quantidade, preço)]}; devolve {nome: id}."""
+    ids = {}
+    for i, (nome, linhas) in enumerate(movimentos.items()):
+        db.add_product(nome, f"SKU-AGRUP-{i}", "", 1000)
+        ids[nome] = pid = db.fetch_one("SELECT id FROM produtos WHERE codigo_sku = ?", (f"SKU-AGRUP-{i}",))[0]
+        for dia, tipo, quantidade, preco in linhas:
+            assert db.add_movement(pid, 1, tipo, quantidade, preco) == "Sucesso"
+            mov = db.fetch_one("SELECT MAX(id) FROM movimentacoes")[0]
+            db.execute_query("UPDATE movimentacoes SET data_hora = ?, dia = ? WHERE id = ?", (f"{dia} 12:00:00", dia, mov))
+    db.rebuild_daily_summary()
+    return ids
+
+
+@pytest.mark.parametrize("primeiro, ultimo, series, esperado", [
+    ("2026-01-01", "2026-01-01", 1, "dia"),
+    ("2026-01-01", "2026-03-01", 1, "dia"),      # 60 dias cabem em MAX_PERIODS
+    ("2026-01-01", "2026-03-02", 1, "semana"),   # 61 não cabem
+    ("2026-01-01", "2026-01-31", 10, "semana"),  # 31 dias x 10 produtos passam de MAX_BAR_GROUPS
+    ("2026-01-01", "2027-12-31", 1, "mes"),
+    ("2026-01-01", "2026-12-31", 40, "ano"),
+    ("2000-01-01", "2199-12-31", 5, "ano"),      # nada cabe: fica o mais grosso
+    (None, None, 3, "dia"),
+])
+def test_escolhe_o_agrupamento_mais_fino_que_cabe(primeiro, ultimo, series, esperado):
+    assert choose_granularity(primeiro, ultimo, series) == esperado
+
+
+def test_limites_configuraveis():
+    assert choose_granularity("2026-01-01", "2026-01-10", 1, max_periods=5) == "semana"
+    assert choose_granularity("2026-01-01", "2026-01-10", 3, max_groups=20) == "semana"
+
+
+def test_automatico_usa_a_faixa_com_movimentacoes(db):
+    _produtos(db, {"A": [("2026-01-05", "entrada", 1, 1.0), ("2026-09-20", "entrada", 1, 1.0)],
+                   "B": [("2026-02-10", "entrada", 1, 1.0)]})
+    assert db.get_summary_extent() == ("2026-01-05", "2026-09-20", 2)
+    assert resolve_granularity(db, None, None, None, None) == "semana"
+    assert resolve_granularity(db, None, "2026-01-01", "2026-02-28", None) == "dia"
+    assert resolve_granularity(db, "mes", None, None, None) == "mes"
+
+
+def test_periodos_somados_por_semana_mes_e_ano(db):
+    ids = _produtos(db, {"A": [("2026-01-04", "entrada", 2, 1.0),    # domingo: semana de 2025-12-29
+                               ("2026-01-05", "entrada", 3, 1.0),    # segunda
+                               ("2026-01-11", "saida", 1, 5.0),
+                               ("2026-02-01", "entrada", 4, 1.0),
+                               ("2027-03-01", "saida", 2, 5.0)]})
+    a = ids["A"]
+    def periodos(granularidade):
+        return [(r[0], r[5], r[6]) for r in db.get_summary_for_all_products(granularity=granularidade) if r[1] == a]
+    assert periodos("semana") == [("2025-12-29", 2, 0), ("2026-01-05", 3, 1), ("2026-01-26", 4, 0), ("2027-03-01", 0, 2)]
+    assert periodos("mes") == [("2026-01", 5, 1), ("2026-02", 4, 0), ("2027-03", 0, 2)]
+    assert periodos("ano") == [("2026", 9, 1), ("2027", 0, 2)]
+    assert [r[0] for r in db.get_summary_for_single_product(a, granularity="mes")] == ["2026-01", "2026-02", "2027-03"]
+    with pytest.raises(ValueError):
+        db.get_summary_for_all_products(granularity="hora")
+
+
+def test_top_n_junta_o_resto_em_outros(db):
+    ids = _produtos(db, {nome: [("2026-01-01", "saida", 1, valor), ("2026-01-02", "saida", 1, valor)]
+                         for nome, valor in (("Grande", 50.0), ("Médio", 30.0), ("Pequeno", 5.0), ("Mínimo", 1.0))})
+    outros = db.OTHERS_ID
+    rows = db.get_summary_for_all_products(top_n=2)
+    assert [(r[0], r[1]) for r in rows] == [("2026-01-01", ids["Grande"]), ("2026-01-01", ids["Médio"]), ("2026-01-01", outros),
+                                            ("2026-01-02", ids["Grande"]), ("2026-01-02", ids["Médio"]), ("2026-01-02", outros)]
+    assert [(r[2], r[4]) for r in rows if r[1] == outros] == [("Outros", 6.0), ("Outros", 6.0)]
+    assert sum(r[4] for r in rows) == sum(r[4] for r in db.get_summary_for_all_products())
+    # Com a faixa de datas, o top N é calculado só dentro dela.
+    assert {r[1] for r in db.get_summary_for_all_products("2026-01-02", "2026-01-02", top_n=4)} == set(ids.values())
+    vendas = db.get_total_sales_by_product(top_n=1)
+    assert vendas == [(ids["Grande"], "Grande", 100.0), (outros, "Outros", 72.0)]
@@ -0,0 +1,101 @@
+# tests/test_backup.py
+# BackupManager: cópia online verificada, rotação dos mais antigos, agendamento e restauração.
+
+import gzip
+import os
+import threading
+import time
+
+import pytest
+
+from database.backup import BackupError, BackupManager
+
+
+def _manager(db, tmp_path, **kwargs):
+    return BackupManager(db.db_path, str(tmp_path / "backups"), **kwargs)
+
+
+def _envelhecer(path, horas):
+    antes = time.time() - horas * 3600
+    os.utime(path, (antes, antes))
+
+
+def _quantidade(db, produto):
+    return db.fetch_one("SELECT quantidade FROM produtos WHERE id = ?", (produto,))[0]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_backup_verificado_sem_arquivos_temporarios(db, produto, tmp_path, compress):
+    manager = _manager(db, tmp_path, compress=compress)
+    info = manager.create_backup()
+    assert info['path'].endswith(".db.gz" if compress else ".db") and info['bytes'] == os.path.getsize(info['path'])
+    assert manager.pages_done == manager.pages_total == info['pages'] > 0
+    assert manager.verify_backup(info['path']) == []
+    assert os.listdir(tmp_path / "backups") == [os.path.basename(info['path'])]
+
+
+def test_rotacao_mantem_os_mais_recentes(db, tmp_path):
+    manager = _manager(db, tmp_path, keep=2, compress=False)
+    antigos = []
+    for horas in (30, 20, 10):
+        path = manager.create_backup(label=f"{manager.prefix}_h{horas}")['path']
+        _envelhecer(path, horas); antigos.append(path)
+    # O quarto backup dispara a rotação: ficam ele e o de 10 horas.
+    novo = manager.create_backup()['path']
+    assert manager.list_backups() == [novo, antigos[2]]
+    assert not os.path.exists(antigos[0]) and not os.path.exists(antigos[1])
+
+
+def test_backup_de_seguranca_fica_fora_da_rotacao(db, tmp_path):
+    manager = _manager(db, tmp_path, keep=1)
+    seguranca = manager.create_backup(label="antes_restauracao")['path']
+    manager.create_backup(); manager.create_backup()
+    assert os.path.exists(seguranca) and len(manager.list_backups()) == 1
+
+
+def test_agendamento_pela_idade_do_ultimo_backup(db, tmp_path):
+    manager = _manager(db, tmp_path)
+    assert manager.is_due(24)  # nenhum backup ainda
+    path = manager.create_backup()['path']
+    assert not manager.is_due(24)
+    _envelhecer(path, 25)
+    assert manager.is_due(24)
+    assert not manager.is_due(0)  # 0 = desligado
+
+
+def test_restauracao_volta_os_dados_e_guarda_o_estado_anterior(db, produto, tmp_path):
+    manager = _manager(db, tmp_path)
+    backup = manager.create_backup()['path']
+    assert db.add_movement(produto, 1, 'saida', 4, 1.0) == "Sucesso"
+    seguranca = manager.restore(backup)
+    assert _quantidade(db, produto) == 10  # a conexão aberta já enxerga o conteúdo restaurado
+    assert os.path.basename(seguranca).startswith("antes_restauracao_")
+    manager.restore(seguranca, safety_backup=False)
+    assert _quantidade(db, produto) == 6
+
+
+def test_backup_corrompido_nao_e_restaurado(db, produto, tmp_path):
+    manager = _manager(db, tmp_path)
+    path = manager.create_backup()['path']
+    with gzip.open(path, 'rb') as f: conteudo = bytearray(f.read())
+    conteudo[100:4096] = b"\xff" * (4096 - 100)
+    with gzip.open(path, 'wb') as f: f.write(bytes(conteudo))
+    assert manager.verify_backup(path) != []
+    with pytest.raises(BackupError):
+        manager.restore(path)
+    assert _quantidade(db, produto) == 10
+    truncado = str(tmp_path / "backups" / "truncado.db.gz")
+    with open(path, 'rb') as src, open(truncado, 'wb') as dst: dst.write(src.read()[:50])
+    assert manager.verify_backup(truncado) != []
+
+
+def test_cancelar_no_meio_nao_deixa_backup(db, tmp_path):
+    manager = _manager(db, tmp_path, pages_per_step=1, step_sleep=0.01)
+    def cancela_quando_comecar():
+        while not manager.pages_done: time.sleep(0.001)
+        manager.cancel()
+    thread = threading.Thread(target=cancela_quando_comecar); thread.start()
+    assert manager.create_backup() is None
+    thread.join()
+    assert manager.pages_done > 0  # o cancelamento chegou durante a cópia
+    assert os.listdir(tmp_path / "backups") == []
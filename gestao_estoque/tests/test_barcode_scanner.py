@@ -0,0 +1,104 @@
+# tests/test_barcode_scanner.py
+# Recorte do alvo entregue ao decodificador, FileFrameSource e o pipeline de duas threads
+# com um decodificador de teste (o pyzbar precisa da biblioteca zbar instalada no sistema).
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("pyzbar.pyzbar", exc_type=ImportError)  # sem a libzbar o import falha com ImportError
+
+from ui.barcode_scanner import ROI, BarcodeScanner, FileFrameSource, prepare_roi, roi_bounds  # noqa: E402
+
+
+def _quadro(largura, altura, valor=0):
+    """Quadro BGR com `valor` gravado no pixel central do alvo, para identificar o quadro."""
+    frame = np.zeros((altura, largura, 3), dtype=np.uint8)
+    x1, y1, x2, y2 = roi_bounds(largura, altura)
+    frame[(y1 + y2) // 2, (x1 + x2) // 2] = valor
+    return frame
+
+
+def _pasta_de_imagens(tmp_path, valores):
+    for i, valor in enumerate(valores):
+        assert cv2.imwrite(str(tmp_path / f"quadro_{i:03d}.png"), _quadro(320, 240, valor))
+    (tmp_path / "leia-me.txt").write_text("não é imagem")
+    return str(tmp_path)
+
+
+def _decodifica_centro(gray):
+    return [str(int(gray.max()))] if gray.max() else []
+
+
+def test_limites_do_alvo():
+    assert roi_bounds(1000, 500) == (150, 150, 850, 350)
+    assert roi_bounds(100, 100, (0, 0, 1, 1)) == (0, 0, 100, 100)
+
+
+def test_recorte_em_cinza_e_reduzido():
+    frame = np.full((1080, 1920, 3), 200, dtype=np.uint8)
+    gray = prepare_roi(frame)
+    x1, y1, x2, y2 = roi_bounds(1920, 1080)
+    assert gray.ndim == 2 and gray.dtype == np.uint8
+    assert gray.shape == (int((y2 - y1) * 640 / (x2 - x1)), 640)
+    assert int(gray.mean()) == 200
+
+
+def test_recorte_pequeno_nao_e_ampliado_e_cinza_passa_direto():
+    frame = np.arange(240 * 320, dtype=np.uint32).reshape(240, 320).astype(np.uint8)
+    x1, y1, x2, y2 = roi_bounds(320, 240, ROI)
+    np.testing.assert_array_equal(prepare_roi(frame), frame[y1:y2, x1:x2])
+    assert prepare_roi(np.zeros((240, 320, 3), dtype=np.uint8), max_width=100).shape[1] == 100
+
+
+def test_pasta_de_imagens_em_ordem_e_fim(tmp_path):
+    source = FileFrameSource(_pasta_de_imagens(tmp_path, [10, 20, 30]))
+    lidos = []
+    while True:
+        ok, frame = source.read()
+        if not ok: break
+        lidos.append(int(prepare_roi(frame).max()))
+    assert lidos == [10, 20, 30]
+    assert source.finished and not source.isOpened() and source.read() == (False, None)
+
+
+def test_pasta_de_imagens_em_loop(tmp_path):
+    source = FileFrameSource(_pasta_de_imagens(tmp_path, [10, 20]), loop=True)
+    assert [int(prepare_roi(source.read()[1]).max()) for _ in range(5)] == [10, 20, 10, 20, 10]
+    assert not source.finished
+
+
+def test_fonte_invalida(tmp_path):
+    with pytest.raises(ValueError):
+        FileFrameSource(str(tmp_path))  # pasta sem imagens
+    with pytest.raises(ValueError):
+        FileFrameSource(str(tmp_path / "nao_existe.avi"))
+
+
+def test_pipeline_sem_descartar_decodifica_todos_os_quadros(tmp_path):
+    valores = list(range(1, 41))
+    scanner = BarcodeScanner(FileFrameSource(_pasta_de_imagens(tmp_path, valores)), decode=_decodifica_centro,
+                             drop_frames=False).start()
+    assert scanner.wait(timeout=10)
+    scanner.stop()
+    codigos = []
+    while not scanner.results.empty(): codigos.append(scanner.results.get()[0])
+    assert codigos == [str(v) for v in valores]
+    stats = scanner.stats()
+    assert stats['frames'] == stats['decoded'] == len(valores) and stats['dropped'] == 0
+    assert scanner.latest_frame()[0] == len(valores)
+
+
+def test_decodificador_lento_descarta_quadros_antigos(tmp_path):
+    import time
+
+    def lento(gray):
+        time.sleep(0.02); return _decodifica_centro(gray)
+    scanner = BarcodeScanner(FileFrameSource(_pasta_de_imagens(tmp_path, range(1, 61))), decode=lento).start()
+    assert scanner.wait(timeout=10)
+    scanner.stop()
+    stats = scanner.stats()
+    assert stats['frames'] == 60 and stats['decoded'] + stats['dropped'] == 60 and stats['dropped'] > 0
+    codigos = []
+    while not scanner.results.empty(): codigos.append(int(scanner.results.get()[0]))
+    assert codigos == sorted(codigos) and codigos[-1] == 60  # o último quadro sempre é decodificado
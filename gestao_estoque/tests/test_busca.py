@@ -0,0 +1,40 @@
+# tests/test_busca.py
+# A busca FTS5 acompanha INSERT/UPDATE/DELETE (triggers) e devolve o mesmo que um LIKE
+# para termos que começam palavras (o FTS casa por prefixo de palavra, o LIKE por trecho).
+
+import pytest
+
+TERMOS = ["sextav", "parafuso", "porca", "arruela", "zincad", "m8", "SKU-BUSCA"]
+
+
+def _like(db, term):
+    like = f"%{term}%"
+    return {r[0] for r in db.fetch_all("SELECT id FROM produtos WHERE nome LIKE ? OR codigo_sku LIKE ? OR descricao LIKE ?", (like, like, like))}
+
+
+def _fts(db, term):
+    return {r[0] for r in db.search_products(term)}
+
+
+@pytest.fixture
+def catalogo(db):
+    for nome, sku, desc in [("Parafuso Sextavado M8", "SKU-BUSCA-1", "aço zincado"),
+                            ("Porca Sextavada M8", "SKU-BUSCA-2", "zincada"),
+                            ("Parafuso Philips", "SKU-BUSCA-3", "inox")]:
+        db.add_product(nome, sku, desc, 5)
+    return {r[1]: r[0] for r in db.fetch_all("SELECT id, codigo_sku FROM produtos WHERE codigo_sku LIKE 'SKU-BUSCA-%'")}
+
+
+def test_fts_igual_ao_like_apos_cadastro(db, catalogo):
+    assert db._has_fts("produtos")
+    for term in TERMOS:
+        assert _fts(db, term) == _like(db, term), term
+
+
+def test_fts_igual_ao_like_apos_update_e_delete(db, catalogo):
+    db.update_product(catalogo["SKU-BUSCA-1"], "Arruela Lisa M8", "SKU-BUSCA-1", "aço", 5)
+    db.delete_product(catalogo["SKU-BUSCA-2"])
+    for term in TERMOS:
+        assert _fts(db, term) == _like(db, term), term
+    assert _fts(db, "sextav") == set()
+    assert _fts(db, "arruela") == {catalogo["SKU-BUSCA-1"]}
@@ -0,0 +1,55 @@
+# tests/test_cache_cadastros.py
+# CatalogCache dos cadastros: leituras repetidas vêm do cache e toda escrita descarta o que afetou.
+
+
+def _fornecedor(db, nome="Fornecedor de Teste"):
+    db.add_supplier(nome, "contato", "endereço")
+    return db.fetch_one("SELECT id FROM fornecedores WHERE nome = ?", (nome,))[0]
+
+
+def test_leitura_repetida_vem_do_cache(db, produto):
+    db.get_product_by_id(produto); antes = db.cache_stats()["hits"]
+    db.get_product_by_id(produto)
+    assert db.cache_stats()["hits"] == antes + 1
+
+
+def test_alteracao_do_produto_invalida_as_leituras(db, produto):
+    assert db.get_product_by_id(produto)[1] == "Produto de Teste"
+    nomes = db.get_product_names(); geracao = db.catalog_generation("produtos")
+    db.update_product(produto, "Renomeado", "SKU-TESTE", "", 10)
+    assert db.get_product_by_id(produto)[1] == "Renomeado"
+    assert (produto, "Renomeado") in db.get_product_names() and db.get_product_names() != nomes
+    assert db.catalog_generation("produtos") > geracao
+
+
+def test_busca_sem_resultado_nao_esconde_produto_novo(db):
+    assert db.get_product_by_sku("SKU-NOVO") is None
+    db.add_product("Novo", "SKU-NOVO", "", 1)
+    assert db.get_product_by_sku("SKU-NOVO")[1] == "Novo"
+
+
+def test_movimentacao_invalida_estoque_mas_nao_os_nomes(db, produto):
+    db.get_product_names(); db.get_all_products()
+    assert db.add_movement(produto, 1, 'entrada', 5, 1.0) == "Sucesso"
+    misses = db.cache_stats()["misses"]
+    db.get_product_names()
+    assert db.cache_stats()["misses"] == misses  # os combos continuam no cache
+    assert dict((r[0], r[4]) for r in db.get_all_products())[produto] == 15
+
+
+def test_exclusao_do_produto_invalida_as_leituras(db, produto):
+    db.get_product_by_id(produto); db.get_all_products()
+    db.delete_product(produto)
+    assert db.get_product_by_id(produto) is None
+    assert produto not in {r[0] for r in db.get_all_products()}
+
+
+def test_exclusao_do_fornecedor_invalida_os_produtos(db, produto):
+    fornecedor = _fornecedor(db)
+    db.execute_query("UPDATE produtos SET id_fornecedor = ? WHERE id = ?", (fornecedor, produto))
+    db.cache.invalidate("produtos", produto)
+    coluna = [r[1] for r in db.fetch_all("PRAGMA table_info(produtos)")].index("id_fornecedor")
+    assert db.get_product_by_id(produto)[coluna] == fornecedor
+    db.delete_supplier(fornecedor)
+    assert db.get_product_by_id(produto)[coluna] is None
+    assert fornecedor not in {r[0] for r in db.get_all_suppliers()}
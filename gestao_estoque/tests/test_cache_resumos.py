@@ -0,0 +1,42 @@
+# tests/test_cache_resumos.py
+# Cache dos resumos do dashboard: repetir uma consulta não vai ao banco, e movimentações,
+# renomeações e exclusões de produtos descartam os resultados afetados.
+
+
+def _consultas(db, produto):
+    return {"extensao": db.get_summary_extent(), "todos": db.get_summary_for_all_products(),
+            "produto": db.get_summary_for_single_product(produto), "vendas": db.get_total_sales_by_product(),
+            "financeiro": db.get_financials_for_products()}
+
+
+def test_consulta_repetida_vem_do_cache(db, produto):
+    db.add_movement(produto, 1, 'saida', 2, 5.0)
+    _consultas(db, produto); misses = db.report_cache_stats()["misses"]
+    _consultas(db, produto)
+    assert db.report_cache_stats()["misses"] == misses
+
+
+def test_movimentacao_invalida_os_resumos(db, produto):
+    db.add_movement(produto, 1, 'saida', 2, 5.0)
+    antes = _consultas(db, produto); versao = db.summary_version()
+    db.add_movement(produto, 1, 'saida', 1, 5.0)
+    depois = _consultas(db, produto)
+    assert db.summary_version() > versao
+    assert all(depois[nome] != antes[nome] for nome in ("todos", "produto", "vendas", "financeiro"))
+
+
+def test_renomear_produto_atualiza_os_nomes(db, produto):
+    db.add_movement(produto, 1, 'saida', 2, 5.0)
+    _consultas(db, produto)
+    db.update_product(produto, "Renomeado", "SKU-TESTE", "", 8)
+    assert db.get_summary_for_all_products()[0][2] == "Renomeado"
+    assert db.get_total_sales_by_product()[0][1] == "Renomeado"
+
+
+def test_excluir_produto_descarta_todos_os_resumos(db, produto):
+    db.add_movement(produto, 1, 'saida', 2, 5.0)
+    antes = _consultas(db, produto)
+    assert antes["extensao"][2] == 1 and antes["produto"]
+    db.delete_product(produto)
+    assert _consultas(db, produto) == {"extensao": (None, None, 0), "todos": [], "produto": [], "vendas": [],
+                                       "financeiro": {pid: row for pid, row in antes["financeiro"].items() if pid != produto}}
@@ -0,0 +1,39 @@
+# tests/test_config.py
+# O config.ini criado na primeira execução tem as chaves que o aplicativo lê, com os mesmos
+# valores do config.ini distribuído.
+
+import configparser
+import os
+
+import pytest
+
+main = pytest.importorskip("main")
+
+CONFIG_DISTRIBUIDO = os.path.join(os.path.dirname(__file__), "..", "config.ini")
+
+
+def _config_padrao(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = main.App.__new__(main.App); app.config = configparser.ConfigParser()
+    app.create_default_config()
+    gerado = configparser.ConfigParser(); gerado.read(tmp_path / "config.ini")
+    return gerado
+
+
+def test_config_padrao_grava_o_log_de_inicializacao_vazio(tmp_path, monkeypatch):
+    gerado = _config_padrao(tmp_path, monkeypatch)
+    assert gerado.get('Settings', 'startup_log') == ''
+
+
+def test_config_padrao_usa_a_camera_no_scanner(tmp_path, monkeypatch):
+    gerado = _config_padrao(tmp_path, monkeypatch)
+    assert gerado.get('Settings', 'scanner_source') == ''  # vazio = câmera
+    assert gerado.getfloat('Settings', 'scanner_source_fps') == 30
+    assert gerado.getfloat('Settings', 'scanner_dedupe_seconds') == 1.0
+
+
+def test_config_padrao_igual_ao_distribuido(tmp_path, monkeypatch):
+    gerado = _config_padrao(tmp_path, monkeypatch)
+    distribuido = configparser.ConfigParser(); distribuido.read(CONFIG_DISTRIBUIDO)
+    for secao in ("Settings", "OpenFoodFacts"):
+        assert dict(gerado[secao]) == dict(distribuido[secao]), secao
@@ -0,0 +1,76 @@
+# tests/test_csv_export.py
+# Exportação CSV: lida de um único snapshot, e cancelamento ou erro não deixam arquivos
+# (nem com o nome final, nem .parcial) no diretório de exportação.
+
+import csv
+import gzip
+import os
+import sqlite3
+
+import pytest
+
+from database.csv_export import EXPORT_TABLES, CsvExport
+
+
+class _ExportComGancho(CsvExport):
+    """Chama `gancho(self, título)` depois de copiar cada tabela, dentro do snapshot."""
+
+    def __init__(self, *args, gancho=None, **kwargs):
+        super().__init__(*args, **kwargs); self.gancho = gancho
+
+    def _copy_rows(self, conn, title, query, writer):
+        super()._copy_rows(conn, title, query, writer)
+        if self.gancho: self.gancho(self, title)
+
+
+def _secoes(path):
+    secoes, atual = {}, None
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if row and row[0].startswith("--- DADOS DE "):
+                atual = row[0][len("--- DADOS DE "):-len(" ---")]; secoes[atual] = []
+            elif row and atual: secoes[atual].append(row)
+    return {titulo: linhas[1:] for titulo, linhas in secoes.items()}  # sem o cabeçalho
+
+
+def test_exporta_um_snapshot_mesmo_com_escritas_no_meio(db, produto, tmp_path):
+    db.add_movement(produto, 1, 'entrada', 2, 1.0)
+    def escreve(export, titulo):
+        if titulo == "PRODUTOS":
+            db.add_product("Gravado Durante", "SKU-DURANTE", "", 1)
+            assert db.add_movement(produto, 1, 'saida', 1, 3.0) == "Sucesso"
+    export = _ExportComGancho(db, str(tmp_path / "exports"), chunk_size=1, gancho=escreve)
+    [path] = export.run()
+    secoes = _secoes(path)
+    assert len(secoes["MOVIMENTACOES"]) == 1 and secoes["MOVIMENTACOES"][0][3] == "entrada"
+    assert "Gravado Durante" not in {row[1] for row in secoes["PRODUTOS"]}
+    assert export.rows_done == export.rows_total == sum(len(linhas) for linhas in secoes.values())
+    assert os.listdir(tmp_path / "exports") == [os.path.basename(path)]
+
+
+def test_exporta_um_gzip_por_tabela(db, produto, tmp_path):
+    destino = tmp_path / "exports"
+    paths = CsvExport(db, str(destino), compress=True).run()
+    assert [os.path.basename(p).split("_")[0] for p in paths] == [name for _, name, _, _ in EXPORT_TABLES]
+    with gzip.open(paths[0], 'rt', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == EXPORT_TABLES[0][2] and "Produto de Teste" in {row[1] for row in rows[1:]}
+    assert sorted(os.listdir(destino)) == sorted(os.path.basename(p) for p in paths)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_cancelar_nao_deixa_arquivos(db, produto, tmp_path, compress):
+    def cancela(export, titulo):
+        if titulo == "CLIENTES": export.cancel()
+    export = _ExportComGancho(db, str(tmp_path / "exports"), compress=compress, chunk_size=1, gancho=cancela)
+    assert export.run() is None and export.cancelled
+    assert os.listdir(tmp_path / "exports") == []
+    assert not db.pool.read_connection().in_transaction  # o snapshot foi encerrado
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_erro_no_meio_nao_deixa_arquivos(db, produto, tmp_path, compress):
+    tabelas = EXPORT_TABLES[:1] + [("QUEBRADA", "produtos", ["ID"], "SELECT coluna_que_nao_existe FROM produtos")]
+    with pytest.raises(sqlite3.OperationalError):
+        CsvExport(db, str(tmp_path / "exports"), compress=compress, tables=tabelas).run()
+    assert os.listdir(tmp_path / "exports") == []
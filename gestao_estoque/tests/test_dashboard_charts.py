@@ -0,0 +1,142 @@
+# tests/test_dashboard_charts.py
+# Gráficos do dashboard numa figura Agg (sem Tk): reaproveitamento dos artistas quando só
+# os valores mudam, hit-testing por bisect conferido contra a busca em todos os artistas e
+# as matrizes densas do comparativo.
+
+import numpy as np
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from ui.dashboard_charts import OTHERS_ID, BarChart, PieChart, comparison_matrices  # noqa: E402
+
+DIAS = ["2026-01-01", "2026-01-02", "2026-01-03"]
+SERIES = [(1, "Arroz"), (2, "Feijão")]
+
+
+def _grafico(cls):
+    fig = Figure(figsize=(6, 3)); canvas = FigureCanvasAgg(fig)
+    return cls(fig, fig.add_subplot(111), canvas)
+
+
+def _matrizes(fator=1.0):
+    entradas = np.arange(1, 7, dtype=float).reshape(3, 2) * fator
+    return entradas, entradas[::-1] * 2
+
+
+def test_barras_atualizadas_no_lugar_quando_so_os_valores_mudam():
+    chart = _grafico(BarChart)
+    assert chart.show(DIAS, SERIES, *_matrizes(), "Título", "Valor") is True
+    barras = list(chart.bars_e) + list(chart.bars_s)
+    entradas, saidas = _matrizes(3.0)
+    assert chart.show(DIAS, SERIES, entradas, saidas, "Outro título", "Valor") is False
+    assert list(chart.bars_e) + list(chart.bars_s) == barras
+    assert [bar.get_height() for bar in chart.bars_e] == entradas.ravel().tolist()
+    assert [bar.get_height() for bar in chart.bars_s] == saidas.ravel().tolist()
+    assert chart.ax.get_title() == "Outro título"
+    assert chart.ax.get_ylim()[1] >= saidas.max()  # a escala acompanha os valores novos
+
+
+def test_barras_reconstruidas_quando_mudam_os_dias_ou_as_series():
+    chart = _grafico(BarChart)
+    chart.show(DIAS, SERIES, *_matrizes(), "Título", "Valor")
+    barras = list(chart.bars_e)
+    assert chart.show(DIAS[:2], SERIES, *(m[:2] for m in _matrizes()), "Título", "Valor") is True
+    assert not set(chart.bars_e) & set(barras) and len(chart.bars_e) == 4
+    assert chart.show(DIAS[:2], SERIES, *(m[:2] for m in _matrizes()), "Título", "Valor", rebuild=True) is True
+
+
+def test_pizza_reposiciona_as_fatias_no_lugar():
+    chart = _grafico(PieChart)
+    assert chart.show([1, 2, 3], ["A", "B", "C"], [1, 1, 2]) is True
+    fatias = [info['wedge'] for info in chart.metadata]
+    assert chart.show([1, 2, 3], ["A", "B", "C"], [2, 1, 1]) is False
+    assert [info['wedge'] for info in chart.metadata] == fatias
+    # Mesma geometria que o Axes.pie desenharia do zero.
+    nova = _grafico(PieChart); nova.show([1, 2, 3], ["A", "B", "C"], [2, 1, 1])
+    for wedge, esperado in zip(fatias, (info['wedge'] for info in nova.metadata)):
+        assert wedge.theta1 == pytest.approx(esperado.theta1) and wedge.theta2 == pytest.approx(esperado.theta2)
+    assert [t.get_text() for t in chart.autotexts] == [t.get_text() for t in nova.autotexts]
+    assert chart.show([1, 2], ["A", "B"], [1, 1]) is True
+
+
+def test_realce_por_blitting_nao_altera_os_artistas():
+    chart = _grafico(BarChart)
+    chart.show(DIAS, SERIES, *_matrizes(), "Título", "Valor")
+    chart.canvas.draw()  # guarda o fundo para o blitting
+    alphas = [bar.get_alpha() for bar in chart.bars_e]
+    chart.highlight(1)
+    assert [bar.get_alpha() for bar in chart.bars_e] == alphas
+
+
+def _barra_por_forca_bruta(chart, x, y):
+    for info in chart.metadata:
+        for bar, kind in ((info['bar_e'], 'entrada'), (info['bar_s'], 'saida')):
+            bottom, top = sorted((bar.get_y(), bar.get_y() + bar.get_height()))
+            if bar.get_x() <= x <= bar.get_x() + bar.get_width() and bottom <= y <= top: return info, kind
+    return None, None
+
+
+def test_hit_test_das_barras_igual_a_busca_em_todas():
+    chart = _grafico(BarChart)
+    entradas, saidas = _matrizes()
+    chart.show(DIAS, SERIES, entradas, saidas, "Título", "Valor")
+    chart.show(DIAS, SERIES, entradas * 2, saidas, "Título", "Valor")  # alturas mudam no lugar
+    for x in np.linspace(-1, len(DIAS), 157):
+        for y in (-1.0, 0.5, 3.0, 7.5, 11.9, 30.0):
+            assert chart.hit_test(x, y) == _barra_por_forca_bruta(chart, x, y), (x, y)
+    info, kind = chart.hit_test(chart.bars_s[3].get_x() + 0.001, 0.1)
+    assert (info['pid'], info['day'], kind) == (2, DIAS[1], 'saida')
+    assert chart.hit_test(None, None) == (None, None)
+
+
+def test_hit_test_da_pizza_igual_a_busca_em_todas_as_fatias():
+    chart = _grafico(PieChart); chart.selected_pid = 2
+    chart.show([1, 2, 3, 4], ["A", "B", "C", "D"], [5, 1, 3, 0.5])
+    chart.show([1, 2, 3, 4], ["A", "B", "C", "D"], [1, 4, 3, 2])  # fatias reposicionadas, B destacada
+    for x in np.linspace(-1.3, 1.3, 53):
+        for y in np.linspace(-1.3, 1.3, 53):
+            esperado = next((i for i in range(len(chart.metadata)) if chart._wedge_contains(i, x, y)), -1)
+            assert chart.hit_test(x, y) == esperado, (x, y)
+    assert chart.hit_test(0, 0.5) == 0 and chart.hit_test(None, 1) == -1
+
+
+def test_matrizes_densas_com_series_na_ordem_das_linhas():
+    rows = [("2026-01-01", 30, "Arroz", 10, 20, 1, 2),
+            ("2026-01-02", 30, "Arroz", 5, 0, 3, 0),
+            ("2026-01-02", 7, "Feijão", 3, 4, 1, 1),
+            ("2026-01-03", 12, "Milho", 2, 0, 2, 0)]
+    days, series, entradas, saidas = comparison_matrices(rows, "Valor")
+    assert days == ["2026-01-01", "2026-01-02", "2026-01-03"]
+    assert series == [(30, "Arroz"), (7, "Feijão"), (12, "Milho")]  # não ordenadas por id
+    np.testing.assert_array_equal(entradas, [[10, 0, 0], [5, 3, 0], [0, 0, 2]])
+    np.testing.assert_array_equal(saidas, [[20, 0, 0], [0, 4, 0], [0, 0, 0]])
+    _, _, qtd_e, qtd_s = comparison_matrices(rows, "Quantidade")
+    np.testing.assert_array_equal(qtd_e, [[1, 0, 0], [3, 1, 0], [0, 0, 2]])
+    np.testing.assert_array_equal(qtd_s, [[2, 0, 0], [0, 1, 0], [0, 0, 0]])
+
+
+def test_matrizes_das_linhas_do_banco(db):
+    for i, nome in enumerate(("Zebu", "Abacate")):
+        db.add_product(nome, f"SKU-GRAF-{i}", "", 100)
+        pid = db.fetch_one("SELECT id FROM produtos WHERE codigo_sku = ?", (f"SKU-GRAF-{i}",))[0]
+        assert db.add_movement(pid, 1, 'saida', 2, 3.0) == "Sucesso"
+    rows = db.get_summary_for_all_products()
+    _, series, _, saidas = comparison_matrices(rows, "Valor")
+    assert [nome for _, nome in series] == [r[2] for r in rows]  # a ordem por nome do SQL
+    assert saidas.sum() == sum(r[4] for r in rows) == 12.0
+
+
+def test_outros_fica_por_ultimo_mesmo_aparecendo_antes():
+    rows = [("2026-01-01", OTHERS_ID, "Outros", 1, 2, 1, 2),
+            ("2026-01-01", 30, "Arroz", 10, 20, 1, 2),
+            ("2026-01-02", 30, "Arroz", 5, 0, 1, 0),
+            ("2026-01-02", 7, "Feijão", 3, 4, 1, 1),
+            ("2026-01-02", OTHERS_ID, "Outros", 8, 9, 1, 1)]
+    _, series, entradas, saidas = comparison_matrices(rows, "Valor")
+    assert series == [(30, "Arroz"), (7, "Feijão"), (OTHERS_ID, "Outros")]
+    np.testing.assert_array_equal(entradas, [[10, 0, 1], [5, 3, 8]])
+    np.testing.assert_array_equal(saidas, [[20, 0, 2], [0, 4, 9]])
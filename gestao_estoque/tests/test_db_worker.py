@@ -0,0 +1,47 @@
+# tests/test_db_worker.py
+# DbWorker sem Tk: um widget mínimo guarda o callback de after() e o teste o chama.
+
+import threading
+import time
+
+from ui.db_worker import DbWorker
+
+
+class _Widget:
+    def __init__(self): self.pending = None
+    def after(self, ms, callback): self.pending = callback; return "after-id"
+    def after_cancel(self, after_id): self.pending = None
+
+
+def _drenar(widget, ate, timeout=2.0):
+    fim = time.monotonic() + timeout
+    while not ate() and time.monotonic() < fim:
+        if widget.pending: widget.pending()
+        time.sleep(0.005)
+
+
+def test_tarefas_longas_nao_ocupam_os_workers_das_consultas():
+    widget = _Widget(); worker = DbWorker(widget, max_workers=2)
+    liberar = threading.Event(); resultados = []
+    worker.submit(liberar.wait, 5, on_done=lambda r: resultados.append("backup"), key="backup", long_running=True)
+    worker.submit(liberar.wait, 5, on_done=lambda r: resultados.append("csv"), key="exportacao_csv", long_running=True)
+    for i in range(4): worker.submit(lambda i=i: i, on_done=resultados.append, key=f"aba:{i}")
+    _drenar(widget, lambda: len(resultados) == 4)
+    assert sorted(resultados) == [0, 1, 2, 3]  # as abas carregaram com as duas tarefas longas pendentes
+    liberar.set()
+    _drenar(widget, lambda: len(resultados) == 6)
+    assert resultados[4:] == ["backup", "csv"]  # uma de cada vez, na ordem
+    worker.shutdown()
+
+
+def test_pedido_mais_recente_com_a_mesma_chave_substitui_o_anterior():
+    widget = _Widget(); worker = DbWorker(widget, max_workers=1)
+    liberar = threading.Event(); resultados = []
+    worker.submit(liberar.wait, 5, key="ocupa")
+    worker.submit(lambda: "antigo", on_done=resultados.append, key="busca")
+    worker.submit(lambda: "novo", on_done=resultados.append, key="busca")
+    liberar.set()
+    _drenar(widget, lambda: resultados)
+    time.sleep(0.05); _drenar(widget, lambda: False, timeout=0.05)
+    assert resultados == ["novo"]
+    worker.shutdown()
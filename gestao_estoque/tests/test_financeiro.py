@@ -0,0 +1,41 @@
+# tests/test_financeiro.py
+# Totais financeiros por produto lidos do resumo_diario conferidos contra as somas do
+# histórico bruto (a consulta que get_product_financials fazia antes).
+
+CONSULTA_NO_HISTORICO = """
+SELECT
+    (SELECT SUM(preco_transacao * quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'entrada'),
+    (SELECT SUM(preco_transacao * quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'saida'),
+    (SELECT SUM(quantidade) FROM movimentacoes WHERE id_item = ? AND tipo = 'saida')
+"""
+
+
+def _no_historico(db, pid):
+    return db.fetch_one(CONSULTA_NO_HISTORICO, (pid, pid, pid))
+
+
+def test_contrato_igual_ao_do_historico(db, produto):
+    # Sem movimentação: somas None, como antes.
+    assert db.get_product_financials(produto) == _no_historico(db, produto) == (None, None, None)
+    db.add_movement(produto, 1, 'entrada', 4, 2.5)
+    assert db.get_product_financials(produto) == _no_historico(db, produto) == (10.0, None, None)
+    db.add_movement(produto, 1, 'saida', 3, 0.0)  # venda a preço zero: soma 0, não None
+    assert db.get_product_financials(produto) == _no_historico(db, produto) == (10.0, 0.0, 3)
+    db.add_movement(produto, 1, 'saida', 2, 7.0)
+    assert db.get_product_financials(produto) == _no_historico(db, produto) == (10.0, 14.0, 5)
+
+
+def test_produto_inexistente_devolve_somas_vazias(db):
+    assert db.get_product_financials(999999) == (None, None, None)
+
+
+def test_totais_de_varios_produtos_numa_passada(db, produto):
+    db.add_product("Sem Vendas", "SKU-SEM-VENDAS", "", 3)
+    sem_vendas = db.fetch_one("SELECT id FROM produtos WHERE codigo_sku = 'SKU-SEM-VENDAS'")[0]
+    db.add_movement(produto, 1, 'entrada', 4, 2.5); db.add_movement(produto, 1, 'saida', 2, 7.0)
+    totais = db.get_financials_for_products([produto, sem_vendas, 999999])
+    # Aqui as somas vazias viram 0 e cada linha traz nome e estoque para o painel do dashboard.
+    assert totais == {produto: (produto, "Produto de Teste", 12, 10.0, 14.0, 2),
+                      sem_vendas: (sem_vendas, "Sem Vendas", 3, 0, 0, 0)}
+    for pid in (produto, sem_vendas):
+        assert totais[pid][3:] == tuple(v or 0 for v in db.get_product_financials(pid))
@@ -0,0 +1,35 @@
+# tests/test_importacao.py
+# O caminho até a tela de login não importa os módulos pesados da janela principal; eles
+# só chegam pelo pré-carregamento em segundo plano.
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ui.preload import HEAVY_MODULES, preload_in_background
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _modulos_pesados_apos_importar(modulo):
+    # Interpretador novo: neste processo os testes anteriores já podem ter importado tudo.
+    codigo = f"import sys, {modulo}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, cwd=RAIZ)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+
+@pytest.mark.parametrize("modulo", ["main", "ui.login_window"])
+def test_login_nao_importa_modulos_pesados(modulo):
+    pytest.importorskip("customtkinter")
+    assert _modulos_pesados_apos_importar(modulo) == []
+
+
+def test_preload_importa_em_segundo_plano_e_so_avisa_falhas(capsys):
+    thread = preload_in_background(("json", "modulo_que_nao_existe"))
+    thread.join(timeout=10)
+    assert not thread.is_alive() and thread.daemon
+    assert "json" in sys.modules
+    assert "modulo_que_nao_existe" in capsys.readouterr().out
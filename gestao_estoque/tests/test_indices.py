@@ -0,0 +1,70 @@
+# tests/test_indices.py
+# Índices de movimentacoes criados pelas migrações e usados pelas consultas principais.
+
+from datetime import datetime, timedelta
+
+INDICES_DATA_HORA = {"idx_mov_item_tipo_data", "idx_mov_item_data", "idx_mov_data_hora"}
+
+
+def _plano(db, query, params=()):
+    return " ".join(r[3] for r in db.conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall())
+
+
+def _indices(db):
+    return {r[0] for r in db.fetch_all("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'movimentacoes' AND sql IS NOT NULL")}
+
+
+def test_migracoes_aplicadas(db):
+    assert db.fetch_one("PRAGMA user_version")[0] == len(db._migrations())
+    assert INDICES_DATA_HORA <= _indices(db)
+
+
+def test_migracoes_nao_rodam_de_novo_ao_reabrir(db, capsys):
+    from database.db_manager import DatabaseManager
+    capsys.readouterr(); db.close()
+    reaberto = DatabaseManager(db.db_path)
+    assert "migrado" not in capsys.readouterr().out
+    assert reaberto.fetch_one("PRAGMA user_version")[0] == len(reaberto._migrations())
+    reaberto.close()
+
+
+def test_consultas_principais_usam_indice(db):
+    planos = {
+        # get_inactive_products: última movimentação de cada produto.
+        "idx_mov_item_data": _plano(db, "SELECT MAX(m.data_hora) FROM movimentacoes m WHERE m.id_item = ?", (1,)),
+        # get_movements_for_product / get_last_prices: por produto e tipo, da mais recente para a mais antiga.
+        "idx_mov_item_tipo_data": _plano(db, "SELECT m.preco_transacao FROM movimentacoes m WHERE m.id_item = ? AND m.tipo = ? "
+                                             "ORDER BY m.data_hora DESC LIMIT 1", (1, 'entrada')),
+        # get_movements_page: paginação keyset pelo histórico inteiro.
+        "idx_mov_data_hora": _plano(db, "SELECT * FROM movimentacoes WHERE (data_hora, id) < (?, ?) "
+                                        "ORDER BY data_hora DESC, id DESC LIMIT 200", ('2030-01-01', 1)),
+    }
+    for indice, plano in planos.items():
+        assert indice in plano, plano
+
+
+def test_coluna_dia_indexada_e_usada(db, produto):
+    assert _indices(db) == INDICES_DATA_HORA | {"idx_mov_item_dia"}
+    assert "idx_mov_item_dia" in _plano(db, "SELECT m.data_hora FROM movimentacoes m WHERE m.id_item = ? AND m.dia >= ? AND m.dia <= ? "
+                                            "ORDER BY m.data_hora ASC, m.id ASC", (produto, '2026-01-01', '2026-01-31'))
+    assert "idx_mov_item_dia" in _plano(db, db._daily_summary_from_ledger_query())
+
+
+def test_dia_gravado_em_cada_movimentacao(db, produto):
+    db.add_movement(produto, 1, 'entrada', 2, 3.0)
+    db.add_movements_batch(1, [(produto, 'saida', 1, 5.0)])
+    rows = db.fetch_all("SELECT data_hora, dia FROM movimentacoes WHERE id_item = ?", (produto,))
+    assert len(rows) == 2 and all(dia == data_hora[:10] for data_hora, dia in rows)
+
+
+def test_faixa_de_dias_inclui_o_ultimo_dia_inteiro(db, produto):
+    ontem = datetime.now() - timedelta(days=1)
+    horarios = [ontem.replace(hour=0, minute=0, second=0), ontem.replace(hour=23, minute=59, second=59), datetime.now()]
+    db.cursor.executemany("INSERT INTO movimentacoes (id_item, id_usuario, tipo, quantidade, preco_transacao, data_hora, dia) "
+                          "VALUES (?, 1, 'entrada', 1, 1.0, ?, ?)",
+                          [(produto, h.strftime('%Y-%m-%d %H:%M:%S'), h.strftime('%Y-%m-%d')) for h in horarios])
+    db.conn.commit()
+    dia = ontem.strftime('%Y-%m-%d')
+    assert [r[0] for r in db.get_product_movements_in_range(produto, dia, dia)] == [h.strftime('%Y-%m-%d %H:%M:%S') for h in horarios[:2]]
+    assert len(db.get_product_movements_in_range(produto, dia)) == 3
+    assert db.get_product_movements_in_range(produto, None, (ontem - timedelta(days=1)).strftime('%Y-%m-%d')) == []
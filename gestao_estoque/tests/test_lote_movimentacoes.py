@@ -0,0 +1,44 @@
+# tests/test_lote_movimentacoes.py
+# add_movements_batch: linhas inválidas são recusadas uma a uma, sem abortar o lote nem
+# deixar a transação aberta.
+
+def _estoque(db, produto):
+    return db.fetch_one("SELECT quantidade FROM produtos WHERE id = ?", (produto,))[0]
+
+
+def test_lote_com_linhas_invalidas_grava_so_as_validas(db, produto):
+    results = db.add_movements_batch(1, [
+        (produto, 'entrada', 5, 2.0),
+        (produto, 'entrada', 1, "abc"),      # preço não numérico
+        (produto, 'entrada', "3", 2.0),      # quantidade não numérica
+        (produto, 'entrada', True, 2.0),     # bool não é quantidade
+        (produto, 'entrada', 2.5, 2.0),      # quantidade fracionária
+        (produto, 'entrada', 1, float('nan')),
+        (produto, 'entrada', 0, 2.0),
+        (produto, 'transferencia', 1, 2.0),
+        (produto, None, 1, 2.0),
+        (-1, 'entrada', 1, 2.0),
+        (produto, 'saida', 100, 3.0),        # mais do que o estoque acumulado (15)
+        (produto, 'SAIDA', 4, 3.0),
+    ])
+    assert results[0] == "Sucesso" and results[-1] == "Sucesso"
+    assert all(r != "Sucesso" for r in results[1:-1])
+    assert results[-2] == "Estoque insuficiente."
+    assert not db.conn.in_transaction
+    assert _estoque(db, produto) == 10 + 5 - 4
+    assert db.fetch_one("SELECT COUNT(*) FROM movimentacoes WHERE id_item = ?", (produto,))[0] == 2
+    assert db.check_daily_summary() == []
+
+    # A conexão da thread continua utilizável para o próximo lote.
+    assert db.add_movements_batch(1, [(produto, 'entrada', 1, 1.0)]) == ["Sucesso"]
+    assert _estoque(db, produto) == 12
+
+
+def test_linhas_malformadas_sao_recusadas_sem_abortar_o_lote(db, produto):
+    results = db.add_movements_batch(1, [(produto, 'entrada', 5, 2.0), (), (produto,), (produto, 'entrada', 1),
+                                         "texto", None, ([produto], 'entrada', 1, 1.0), (produto, 'saida', 3, 4.0)])
+    assert results == ["Sucesso"] + ["Linha malformada."] * 5 + ["Produto não encontrado.", "Sucesso"]
+    assert not db.conn.in_transaction
+    assert _estoque(db, produto) == 10 + 5 - 3
+    assert db.check_daily_summary() == []
+
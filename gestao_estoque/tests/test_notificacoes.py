@@ -0,0 +1,57 @@
+# tests/test_notificacoes.py
+# Deduplicação das notificações pela chave e classificação das notificações antigas (migração 006).
+
+
+def _notificacoes(db, tipo=None):
+    return db.fetch_all("SELECT mensagem, tipo, id_produto, chave FROM notificacoes WHERE tipo IS ? ORDER BY id", (tipo,))
+
+
+def _inativo(db, produto, dias=30):
+    """Faz a única movimentação do produto ter acontecido há `dias` dias."""
+    assert db.add_movement(produto, 1, 'entrada', 1, 1.0) == "Sucesso"
+    db.execute_query("UPDATE movimentacoes SET data_hora = datetime('now', 'localtime', ?) WHERE id_item = ?", (f"-{dias} days", produto))
+
+
+def test_mesma_chave_grava_uma_vez_so(db, produto):
+    db.add_notification("primeira", 'inatividade', produto, f"inatividade:{produto}")
+    db.add_notifications([("repetida no lote", 'inatividade', produto, f"inatividade:{produto}"),
+                          ("outra chave", 'inatividade', None, "inatividade:outro")])
+    assert [n[0] for n in _notificacoes(db, 'inatividade')] == ["primeira", "outra chave"]
+
+
+def test_sem_chave_nao_deduplica(db, produto):
+    db.add_notification("acabou", 'estoque_zerado', produto)
+    db.add_notification("acabou", 'estoque_zerado', produto)
+    assert len(_notificacoes(db, 'estoque_zerado')) == 2
+
+
+def test_inatividade_avisada_uma_vez_por_produto(db, produto):
+    _inativo(db, produto)
+    inativos = db.get_inactive_products(20)
+    assert inativos == [(produto, "Produto de Teste")]
+    db.add_notifications([(f"INATIVIDADE: Produto '{nome}'", 'inatividade', pid, f"inatividade:{pid}") for pid, nome in inativos])
+    assert db.get_inactive_products(20) == []
+    # Mesmo se a verificação rodar de novo com a lista antiga, a chave impede a duplicata.
+    db.add_notifications([(f"INATIVIDADE: Produto '{nome}'", 'inatividade', pid, f"inatividade:{pid}") for pid, nome in inativos])
+    assert len(_notificacoes(db, 'inatividade')) == 1
+
+
+def test_produto_recente_nao_e_inativo(db, produto):
+    _inativo(db, produto, dias=5)
+    assert db.get_inactive_products(20) == []
+
+
+def test_migracao_classifica_notificacoes_antigas(db, produto):
+    db.add_product("Produto de Teste Integral", "SKU-INTEGRAL", "", 5)
+    integral = db.fetch_one("SELECT id FROM produtos WHERE codigo_sku = 'SKU-INTEGRAL'")[0]
+    antigas = ["INATIVIDADE: Produto 'Produto de Teste Integral' não tem movimentação há mais de 20 dias.",
+               "INATIVIDADE: Produto 'Produto de Teste Integral' não tem movimentação há mais de 30 dias.",
+               "ESTOQUE ZERADO: O produto 'Produto de Teste' está esgotado.",
+               "Novo usuário 'ana' cadastrado."]
+    for mensagem in antigas:
+        db.execute_query("INSERT INTO notificacoes (mensagem, data_hora) VALUES (?, '2024-01-01 00:00:00')", (mensagem,))
+    db._migration_006_structured_notifications(); db.conn.commit()
+    assert _notificacoes(db, 'inatividade') == [(antigas[0], 'inatividade', integral, f"inatividade:{integral}"),
+                                                (antigas[1], 'inatividade', integral, None)]
+    assert _notificacoes(db, 'estoque_zerado') == [(antigas[2], 'estoque_zerado', produto, None)]
+    assert _notificacoes(db, 'usuario') == [(antigas[3], 'usuario', None, None)]
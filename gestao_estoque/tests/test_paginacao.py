@@ -0,0 +1,64 @@
+# tests/test_paginacao.py
+# Paginação keyset do histórico: limites de página, empates de data_hora desempatados pelo id
+# e navegação nos dois sentidos sem linhas repetidas nem puladas.
+
+HORARIOS = ["2024-01-01 08:00:00", "2024-01-01 08:00:00", "2024-01-01 08:00:00",
+            "2024-01-02 09:30:00", "2024-01-02 09:30:00", "2024-01-03 10:00:00", "2024-01-04 11:15:00"]
+
+
+def _historico(db, produto):
+    """Uma movimentação por horário (com empates), devolvendo os ids do mais recente ao mais antigo."""
+    for horario in HORARIOS:
+        assert db.add_movement(produto, 1, 'entrada', 1, 1.0) == "Sucesso"
+        novo_id = db.fetch_one("SELECT MAX(id) FROM movimentacoes")[0]
+        db.execute_query("UPDATE movimentacoes SET data_hora = ? WHERE id = ?", (horario, novo_id))
+    return [row[0] for row in db.fetch_all(
+        "SELECT id FROM movimentacoes ORDER BY data_hora DESC, id DESC")]
+
+
+def _ids(page):
+    return [row[0] for row in page]
+
+
+def test_paginas_cobrem_o_historico_sem_repetir_nem_pular(db, produto):
+    esperado = _historico(db, produto)
+    vistos, cursor = [], None
+    while True:
+        page = db.get_movements_page(cursor, limit=2)
+        if not page:
+            break
+        vistos.extend(_ids(page))
+        cursor = db.movement_cursor(page[-1])
+    assert vistos == esperado
+
+
+def test_empate_de_data_hora_e_desempatado_pelo_id(db, produto):
+    esperado = _historico(db, produto)
+    # O corte cai no meio das três movimentações de 2024-01-01 08:00:00.
+    primeira = db.get_movements_page(limit=5)
+    assert _ids(primeira) == esperado[:5]
+    segunda = db.get_movements_page(db.movement_cursor(primeira[-1]), limit=5)
+    assert _ids(segunda) == esperado[5:]
+
+
+def test_ultima_pagina_incompleta_e_depois_vazia(db, produto):
+    esperado = _historico(db, produto)
+    primeira = db.get_movements_page(limit=4)
+    ultima = db.get_movements_page(db.movement_cursor(primeira[-1]), limit=4)
+    assert _ids(ultima) == esperado[4:]
+    assert db.get_movements_page(db.movement_cursor(ultima[-1]), limit=4) == []
+
+
+def test_newer_volta_para_a_pagina_anterior(db, produto):
+    esperado = _historico(db, produto)
+    primeira = db.get_movements_page(limit=3)
+    segunda = db.get_movements_page(db.movement_cursor(primeira[-1]), limit=3)
+    # Voltando a partir da primeira linha da segunda página, na mesma ordem de exibição.
+    de_volta = db.get_movements_page(db.movement_cursor(segunda[0]), limit=3, newer=True)
+    assert _ids(de_volta) == _ids(primeira) == esperado[:3]
+    assert db.get_movements_page(db.movement_cursor(primeira[0]), limit=3, newer=True) == []
+
+
+def test_pagina_tem_o_formato_de_get_all_movements(db, produto):
+    _historico(db, produto)
+    assert db.get_movements_page(limit=len(HORARIOS)) == db.get_all_movements()
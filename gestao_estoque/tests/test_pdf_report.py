@@ -0,0 +1,92 @@
+# tests/test_pdf_report.py
+# PagedTable quebra as páginas pelas alturas reais das linhas, e a tabela da pizza no PDF
+# do dashboard tem as mesmas fatias (top N e 'Outros') e o mesmo período do gráfico.
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from reportlab.lib.units import inch  # noqa: E402
+
+from ui.pdf_report import PagedTable, dashboard_report, sales_rows, table_style  # noqa: E402
+
+LARGURAS = [1.5 * inch, 3.0 * inch, 1.0 * inch]
+
+
+def _linhas(n, seed=3):
+    rnd = random.Random(seed)
+    # Algumas linhas com várias linhas de texto: bem mais altas que a primeira.
+    return [[str(i), "\n".join(["Descrição longa"] * (rnd.randint(2, 9) if rnd.random() < 0.15 else 1)), f"{i * 1.5:.2f}"]
+            for i in range(n)]
+
+
+def _paginar(table, largura, altura):
+    """Alturas das páginas, como o frame do reportlab faria; a última parte conta as linhas no draw()."""
+    paginas = []
+    while True:
+        if table.wrap(largura, altura)[1] <= altura:
+            paginas.append(table._make(len(table.rows)).wrap(largura, altura)[1])  # o que draw() desenha
+            assert table.height == pytest.approx(paginas[-1])
+            if table.on_rows: table.on_rows(len(table.rows) - table.start)
+            return paginas
+        partes = table.split(largura, altura)
+        assert partes, "nenhuma linha coube na página"
+        paginas.append(partes[0].wrap(largura, altura)[1])
+        if len(partes) == 1: return paginas
+        table = partes[1]
+
+
+@pytest.mark.parametrize("primeira_alta", [False, True])
+def test_nenhuma_pagina_passa_da_altura_disponivel(primeira_alta):
+    rows = _linhas(600)
+    if primeira_alta: rows[0][1] = "\n".join(["x"] * 6)
+    contadas = []
+    table = PagedTable(["Código", "Descrição", "Valor"], rows, LARGURAS, table_style(2), on_rows=contadas.append)
+    altura = 9 * inch
+    paginas = _paginar(table, sum(LARGURAS), altura)
+    assert len(paginas) > 1
+    assert all(h <= altura + 1e-6 for h in paginas)
+    assert sum(contadas) == len(rows)
+
+
+def test_pdf_com_linhas_de_alturas_diferentes(tmp_path):
+    from ui.pdf_report import PdfReport
+    report = PdfReport(str(tmp_path / "r.pdf"), "Teste")
+    report.add_table("Linhas", ["Código", "Descrição", "Valor"], _linhas(300), LARGURAS)
+    assert report.run() == str(tmp_path / "r.pdf")
+    assert report.rows_done == report.rows_total == 300
+
+
+def _vendas(db, produto_por_valor, dias_atras):
+    dia = (datetime.now() - timedelta(days=dias_atras)).strftime('%Y-%m-%d')
+    for pid, valor in produto_por_valor:
+        db.cursor.execute("INSERT INTO movimentacoes (id_item, id_usuario, tipo, quantidade, preco_transacao, data_hora, dia) "
+                          "VALUES (?, 1, 'saida', 1, ?, ?, ?)", (pid, valor, dia + " 10:00:00", dia))
+        db.cursor.execute("INSERT INTO movimentacoes (id_item, id_usuario, tipo, quantidade, preco_transacao, data_hora, dia) "
+                          "VALUES (?, 1, 'entrada', 1, ?, ?, ?)", (pid, valor / 2, dia + " 09:00:00", dia))
+    db.conn.commit(); db.rebuild_daily_summary()
+    return dia
+
+
+def test_tabela_da_pizza_respeita_top_n_e_periodo(db, tmp_path):
+    db.cursor.execute("DELETE FROM movimentacoes"); db.conn.commit()
+    pids = []
+    for i in range(5):
+        db.add_product(f"Venda {i}", f"SKU-VENDA-{i}", "", 100)
+        pids.append(db.fetch_one("SELECT id FROM produtos WHERE codigo_sku = ?", (f"SKU-VENDA-{i}",))[0])
+    _vendas(db, [(pids[0], 1000.0)], dias_atras=30)  # fora do período
+    dia = _vendas(db, [(pid, 100.0 * (i + 1)) for i, pid in enumerate(pids)], dias_atras=1)
+
+    rows = sales_rows(db, 2, dia, dia)
+    assert [r[0] for r in rows] == ["Venda 4", "Venda 3", "Outros"]
+    assert rows[0][1] == "R$ 500.00" and rows[2][1] == "R$ 600.00"   # Outros = 100 + 200 + 300
+    assert rows[2][3] == "R$ 300.00" and rows[2][4] == "R$ 300.00"   # custo e lucro de 'Outros' no período
+    assert sum(float(r[2][:-1]) for r in rows) == pytest.approx(100, abs=0.2)
+    assert [r[0] for r in sales_rows(db)][0] == "Venda 0"            # sem filtros: todo o histórico
+
+    report = dashboard_report(db, str(tmp_path / "pizza.pdf"), "pizza", start_date=dia, end_date=dia, top_n=2)
+    assert report.run()
+    assert report.rows_total == 3
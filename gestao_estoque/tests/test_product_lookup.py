@@ -0,0 +1,59 @@
+# tests/test_product_lookup.py
+# ProductLookup contra um servidor HTTP local: 404 é "não encontrado" (cache negativo),
+# erro do servidor não vai para o cache.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from database.product_lookup import ProductLookup  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        codigo = self.path.split("/product/")[1].split(".json")[0]
+        if self.server.status == 500:
+            status, tipo, corpo = 500, "text/plain", b"erro"
+        elif codigo == "7891000100103":
+            status, tipo, corpo = 200, "application/json", json.dumps({"status": 1, "product": {"product_name": "Leite"}}).encode()
+        else:
+            status, tipo, corpo = 404, "text/html", b"<html><body>Not Found</body></html>"
+        self.send_response(status); self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo))); self.end_headers(); self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler); server.paths = []; server.status = 200
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown(); server.server_close()
+
+
+def _lookup(db, servidor):
+    return ProductLookup(db, url=f"http://127.0.0.1:{servidor.server_port}/api/v2/product/{{code}}.json", timeout=2)
+
+
+def test_404_com_corpo_html_vai_para_o_cache_negativo(db, servidor):
+    lookup = _lookup(db, servidor)
+    assert lookup.lookup("1234567890128") == (None, "rede")
+    pedidos = len(servidor.paths)
+    assert lookup.lookup("1234567890128") == (None, "cache")
+    assert len(servidor.paths) == pedidos and lookup.stats()['negative_hits'] == 1 and lookup.failures == 0
+
+
+def test_encontrado_e_erro_do_servidor(db, servidor):
+    lookup = _lookup(db, servidor)
+    assert lookup.lookup("7891000100103") == ({"product_name": "Leite", "generic_name": None, "brands": None, "quantity": None}, "rede")
+    servidor.status = 500
+    assert lookup.lookup("1111111111116") == (None, "indisponível")
+    assert db.fetch_one("SELECT COUNT(*) FROM cache_openfoodfacts WHERE codigo = '1111111111116'")[0] == 0
+    assert lookup.lookup("7891000100103")[1] == "cache"
@@ -0,0 +1,82 @@
+# tests/test_relatorios.py
+# CLI de relatórios sem interface: cada comando gera seus arquivos e um --db inexistente
+# termina com erro em vez de criar um banco novo.
+
+import os
+import subprocess
+import sys
+from argparse import Namespace
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("reportlab")
+
+import relatorios  # noqa: E402
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _rodar(db, tmp_path, *argv):
+    return relatorios.main(["--db", db.db_path, "--saida", str(tmp_path / "saida"), *argv])
+
+
+def _gerados(tmp_path):
+    return sorted(os.listdir(tmp_path / "saida"))
+
+
+def test_banco_inexistente_sai_com_erro_sem_criar_arquivo(tmp_path, capsys):
+    faltando = tmp_path / "nao_existe.db"
+    assert relatorios.main(["--db", str(faltando), "csv"]) == 1
+    assert "não encontrado" in capsys.readouterr().err
+    assert not faltando.exists() and os.listdir(tmp_path) == []
+
+
+def test_codigo_de_saida_do_script(tmp_path):
+    proc = subprocess.run([sys.executable, "relatorios.py", "--db", str(tmp_path / "nao_existe.db"), "csv"],
+                          capture_output=True, text=True, cwd=RAIZ)
+    assert proc.returncode == 1 and "não encontrado" in proc.stderr
+    assert os.listdir(tmp_path) == []
+
+
+def test_csv(db, produto, tmp_path):
+    assert _rodar(db, tmp_path, "csv") == 0
+    [arquivo] = _gerados(tmp_path)
+    assert arquivo.startswith("export_completo_") and arquivo.endswith(".csv")
+    assert _rodar(db, tmp_path, "csv", "--compactar") == 0
+    assert sum(nome.endswith(".csv.gz") for nome in _gerados(tmp_path)) == 5
+
+
+@pytest.mark.parametrize("grafico", ["colunas", "pizza"])
+def test_dashboard(db, produto, tmp_path, grafico):
+    db.add_movement(produto, 1, 'saida', 2, 5.0)
+    hoje = date.today().isoformat()
+    assert _rodar(db, tmp_path, "dashboard", "--grafico", grafico, "--inicio", hoje, "--fim", hoje) == 0
+    assert _gerados(tmp_path) == [f"dashboard_{grafico}_{hoje}_a_{hoje}.pdf"]
+
+
+def test_produtos_so_os_pedidos_e_avisa_os_inexistentes(db, produto, tmp_path, capsys):
+    assert _rodar(db, tmp_path, "produtos", "--ids", str(produto), "999999", "--processos", "1") == 0
+    assert _gerados(tmp_path) == [f"produto_{produto}_produto_de_teste_inicio_a_hoje.pdf"]
+    assert "Produto 999999 não encontrado" in capsys.readouterr().out
+
+
+def test_produtos_padrao_so_com_movimentacao_no_periodo(db, produto, tmp_path):
+    db.add_movement(produto, 1, 'entrada', 1, 1.0)
+    assert _rodar(db, tmp_path, "produtos", "--processos", "1") == 0
+    assert _gerados(tmp_path) == [f"produto_{produto}_produto_de_teste_inicio_a_hoje.pdf"]
+
+
+def _args(inicio=None, fim=None, dias=None):
+    return Namespace(inicio=inicio, fim=fim, dias=dias)
+
+
+def test_periodo():
+    ontem = date.today() - timedelta(days=1)
+    assert relatorios._periodo(_args(dias=1)) == (ontem.isoformat(), ontem.isoformat())
+    assert relatorios._periodo(_args(dias=7))[0] == (ontem - timedelta(days=6)).isoformat()
+    assert relatorios._periodo(_args("2025-02-01", "2025-01-01")) == ("2025-01-01", "2025-02-01")
+    assert relatorios._periodo(_args(fim="2025-01-31")) == (None, "2025-01-31")
+    with pytest.raises(ValueError):
+        relatorios._periodo(_args("2025-13-01"))
@@ -0,0 +1,27 @@
+# tests/test_resumo_diario.py
+# resumo_diario acompanha o histórico (check_daily_summary vazio) em cada caminho de escrita.
+
+
+def test_resumo_consistente_apos_lote_e_estorno(db, produto):
+    assert db.add_movements_batch(1, [(produto, 'entrada', 3, 4.5), (produto, 'saida', 2, 7.0)]) == ["Sucesso", "Sucesso"]
+    assert db.check_daily_summary() == []
+    ultimo = db.fetch_one("SELECT MAX(id) FROM movimentacoes WHERE id_item = ?", (produto,))[0]
+    assert db.reverse_movement(ultimo) == "Sucesso"
+    assert db.check_daily_summary() == []
+    assert db.fetch_one("SELECT quantidade FROM produtos WHERE id = ?", (produto,))[0] == 13
+
+
+def test_estorno_da_unica_movimentacao_do_dia_remove_a_linha_do_resumo(db, produto):
+    assert db.add_movement(produto, 1, 'entrada', 2, 3.0) == "Sucesso"
+    mov = db.fetch_one("SELECT id, dia FROM movimentacoes WHERE id_item = ?", (produto,))
+    assert db.reverse_movement(mov[0]) == "Sucesso"
+    assert db.fetch_one("SELECT COUNT(*) FROM resumo_diario WHERE id_item = ? AND dia = ?", (produto, mov[1]))[0] == 0
+    assert db.check_daily_summary() == []
+
+
+def test_rebuild_reproduz_o_resumo_incremental(db, produto):
+    db.add_movement(produto, 1, 'entrada', 4, 2.5); db.add_movement(produto, 1, 'saida', 1, 9.0)
+    antes = db.fetch_all("SELECT * FROM resumo_diario ORDER BY dia, id_item")
+    db.rebuild_daily_summary()
+    assert db.fetch_all("SELECT * FROM resumo_diario ORDER BY dia, id_item") == antes
+    assert db.check_daily_summary() == []
@@ -0,0 +1,61 @@
+# tests/test_scan_cart.py
+# Lógica do scanner contínuo sem câmera nem Tk: deduplicação das leituras e carrinho.
+
+import pytest
+
+from ui.scan_cart import ScanCart, ScanDeduplicator
+
+
+def test_deduplicador_conta_cada_aparicao_uma_vez():
+    dedup = ScanDeduplicator(window=1.0)
+    # Item na frente da câmera a 30 fps, com um quadro perdido no meio: uma unidade.
+    leituras = [i / 30 for i in range(20) if i != 10]
+    assert sum(dedup.accept("789", now=t) for t in leituras) == 1
+    assert dedup.repeated == len(leituras) - 1
+    # Outro código ao mesmo tempo conta à parte; o mesmo código depois da janela é outro item.
+    assert dedup.accept("123", now=0.5)
+    assert not dedup.accept("789", now=leituras[-1] + 0.9)
+    assert dedup.accept("789", now=leituras[-1] + 0.9 + 1.0)
+
+
+@pytest.fixture
+def produtos(db):
+    ids = {}
+    for codigo, qtd in (("7890000000011", 10), ("7890000000028", 1)):
+        db.add_product(f"Produto {codigo}", f"SKU-{codigo}", "", qtd, codigo)
+        ids[codigo] = db.get_product_by_barcode(codigo)[0]
+    db.add_movement(ids["7890000000011"], 1, 'entrada', 1, 4.0)
+    db.add_movement(ids["7890000000011"], 1, 'saida', 1, 6.5)
+    return ids
+
+
+def test_carrinho_agrupa_leituras_e_usa_o_ultimo_preco(db, produtos):
+    cart = ScanCart(db, tipo="entrada")
+    for codigo in ["7890000000011", "7890000000011", "999", "7890000000028", "7890000000011"]: cart.add(codigo)
+    a, b = produtos["7890000000011"], produtos["7890000000028"]
+    assert list(cart.lines) == [a, b]
+    assert cart.lines[a]['qty'] == 3 and cart.lines[b]['qty'] == 1
+    assert cart.unknown == {"999": 1}
+    assert cart.lines[a]['price'] == 4.0 and cart.lines[b]['price'] is None
+    assert cart.units == 4 and cart.total == pytest.approx(12.0)
+
+    cart.set_price(b, 2.0); cart.set_type("saida")
+    assert cart.lines[a]['price'] == 6.5 and cart.lines[b]['price'] == 2.0  # preço digitado não muda
+    cart.set_quantity(a, 0)
+    assert list(cart.lines) == [b]
+
+
+def test_commit_grava_numa_transacao_e_mantem_as_linhas_recusadas(db, produtos):
+    a, b = produtos["7890000000011"], produtos["7890000000028"]
+    cart = ScanCart(db, tipo="saida")
+    for _ in range(3): cart.add("7890000000011"); cart.add("7890000000028")  # b só tem 1 em estoque
+    cart.set_price(b, 3.0)
+    saved, refused = cart.commit(1)
+    assert (saved, refused) == (1, 1)
+    assert list(cart.lines) == [b] and cart.lines[b]['error'] == "Estoque insuficiente."
+    assert db.fetch_one("SELECT quantidade FROM produtos WHERE id = ?", (a,))[0] == 10 - 3
+    assert not db.conn.in_transaction
+    assert db.check_daily_summary() == []
+
+    cart.set_quantity(b, 1)
+    assert cart.commit(1) == (1, 0) and not cart.lines
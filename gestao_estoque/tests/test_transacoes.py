@@ -0,0 +1,60 @@
+# tests/test_transacoes.py
+# ConnectionPool.transaction: nenhuma saída do bloco deixa a transação (e o lock de escrita)
+# aberta, e em WAL escritores e leitores simultâneos nunca veem "database is locked".
+
+import threading
+import time
+
+import pytest
+
+
+def test_transaction_faz_rollback_em_excecao_que_nao_e_do_sqlite(db, produto):
+    with pytest.raises(TypeError):
+        with db.pool.transaction():
+            db.cursor.execute("UPDATE produtos SET quantidade = 99 WHERE id = ?", (produto,))
+            raise TypeError("erro fora do sqlite")
+    assert not db.conn.in_transaction
+    assert db.fetch_one("SELECT quantidade FROM produtos WHERE id = ?", (produto,))[0] == 10
+    assert db.add_movement(produto, 1, 'entrada', 1, 5.0) == "Sucesso"
+
+
+def test_retornos_antecipados_encerram_a_transacao(db, produto):
+    assert db.add_movement(produto, 1, 'saida', 50, 5.0) == "Estoque insuficiente."
+    assert not db.conn.in_transaction
+    assert db.add_movement(-1, 1, 'entrada', 1, 5.0) == "Produto não encontrado."
+    assert db.reverse_movement(-1) == "Movimentação não encontrada."
+    assert not db.conn.in_transaction
+    assert db.fetch_one("SELECT COUNT(*) FROM movimentacoes WHERE id_item = ?", (produto,))[0] == 0
+
+
+def test_wal_sem_database_is_locked_com_escritores_e_leitores(db, produto):
+    assert db.fetch_one("PRAGMA journal_mode")[0] == "wal"
+    stop = threading.Event(); lock = threading.Lock()
+    stats = {"escritas": 0, "leituras": 0, "erros": []}
+
+    def escritor():
+        while not stop.is_set():
+            result = db.add_movement(produto, 1, 'entrada', 1, 10.0)
+            with lock:
+                if result == "Sucesso": stats["escritas"] += 1
+                else: stats["erros"].append(result)
+        db.pool.release_thread()
+
+    def leitor():
+        read_conn = db.pool.read_connection()
+        while not stop.is_set():
+            try:
+                read_conn.execute("SELECT dia, valor_entrada FROM resumo_diario WHERE id_item = ?", (produto,)).fetchall()
+                read_conn.execute("SELECT COUNT(*), MAX(data_hora) FROM movimentacoes WHERE id_item = ?", (produto,)).fetchone()
+                with lock: stats["leituras"] += 1
+            except Exception as e:
+                with lock: stats["erros"].append(str(e))
+        db.pool.release_thread()
+
+    threads = [threading.Thread(target=escritor) for _ in range(3)] + [threading.Thread(target=leitor) for _ in range(3)]
+    for t in threads: t.start()
+    time.sleep(1.0); stop.set()
+    for t in threads: t.join()
+    assert stats["erros"] == []
+    assert stats["escritas"] > 0 and stats["leituras"] > 0
+    assert db.check_daily_summary() == []
@@ -0,0 +1,200 @@
+# ui/barcode_scanner.py
+# Leitura de códigos de barras fora da thread do Tk: uma thread lê os quadros da câmera e
+# recorta a região do alvo (cinza, reduzida), outra decodifica com o pyzbar. Enquanto o
+# decodificador está ocupado, só o recorte mais recente espera; os anteriores são
+# descartados, então a prévia acompanha a câmera mesmo quando decodificar é mais lento.
+# FileFrameSource substitui a câmera por um vídeo ou uma pasta de imagens (testes e benchmarks).
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+from pyzbar import pyzbar
+
+# Retângulo do alvo, em frações da largura/altura do quadro (o mesmo desenhado na prévia).
+ROI = (0.15, 0.3, 0.85, 0.7)
+# Largura máxima do recorte entregue ao pyzbar: 1D/EAN continua legível e o custo cai ~4x em 1080p.
+DECODE_MAX_WIDTH = 640
+
+
+def roi_bounds(width, height, roi=ROI):
+    x1, y1, x2, y2 = roi
+    return int(width * x1), int(height * y1), int(width * x2), int(height * y2)
+
+
+def prepare_roi(frame, roi=ROI, max_width=DECODE_MAX_WIDTH):
+    """Recorte do alvo em tons de cinza, reduzido para no máximo `max_width` de largura."""
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = roi_bounds(w, h, roi)
+    crop = frame[y1:y2, x1:x2]
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    if gray.shape[1] > max_width:
+        scale = max_width / gray.shape[1]
+        gray = cv2.resize(gray, (max_width, max(1, int(gray.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def decode_barcodes(gray):
+    return [b.data.decode('utf-8', 'replace') for b in pyzbar.decode(gray)]
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+
+class FileFrameSource:
+    """Quadros de um arquivo de vídeo ou de uma pasta de imagens (em ordem alfabética), com a
+    mesma interface de cv2.VideoCapture. `fps` imita o ritmo de uma câmera (None = o mais rápido
+    possível) e `loop` recomeça do início; sem `loop`, `finished` vira True no fim.
+    """
+
+    def __init__(self, path, fps=None, loop=False):
+        self.path = path; self.fps = fps; self.loop = loop
+        self.finished = False; self._next_at = None
+        if os.path.isdir(path):
+            self._files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+            if not self._files: raise ValueError(f"Nenhuma imagem em {path}")
+            self._video = None; self._index = 0
+        else:
+            self._video = cv2.VideoCapture(path)
+            if not self._video.isOpened(): raise ValueError(f"Não foi possível abrir o vídeo {path}")
+
+    def isOpened(self):
+        return not self.finished
+
+    def _next_frame(self):
+        if self._video is not None:
+            ok, frame = self._video.read()
+            return frame if ok else None
+        while self._index < len(self._files):
+            frame = cv2.imread(self._files[self._index]); self._index += 1
+            if frame is not None: return frame
+        return None
+
+    def _rewind(self):
+        if self._video is not None: self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        else: self._index = 0
+
+    def read(self):
+        if self.finished: return False, None
+        if self.fps:
+            delay = self._next_at - time.perf_counter() if self._next_at else 0
+            if delay > 0: time.sleep(delay)
+            self._next_at = max(self._next_at or 0, time.perf_counter()) + 1 / self.fps
+        frame = self._next_frame()
+        if frame is None and self.loop:
+            self._rewind(); frame = self._next_frame()
+        if frame is None:
+            self.finished = True; return False, None
+        return True, frame
+
+    def release(self):
+        if self._video is not None: self._video.release()
+
+
+class _Rate:
+    """Eventos por segundo numa janela deslizante de `window` segundos."""
+    def __init__(self, window=2.0):
+        self.window = window; self._times = deque()
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self._times.append(now)
+        while self._times and now - self._times[0] > self.window: self._times.popleft()
+
+    def per_second(self):
+        if len(self._times) < 2: return 0.0
+        span = self._times[-1] - self._times[0]
+        return (len(self._times) - 1) / span if span > 0 else 0.0
+
+
+class BarcodeScanner:
+    """Captura e decodificação em duas threads, a partir de `source` (qualquer objeto com
+    `read() -> (ok, quadro BGR)` e `release()`, como cv2.VideoCapture).
+
+    `latest_frame()` devolve (número do quadro, quadro) para a prévia; cada leitura vai para
+    `results` como (código, latência em segundos desde a captura do quadro). `stats()` resume
+    as taxas de captura e decodificação, a latência e os quadros descartados.
+
+    Com `drop_frames=False` a captura espera o decodificador em vez de descartar quadros
+    (arquivos de teste: todo quadro é decodificado). Quando uma fonte de arquivo acaba
+    (`source.finished`), as threads terminam depois do último quadro e `wait()` retorna.
+    """
+
+    def __init__(self, source, decode=decode_barcodes, roi=ROI, max_width=DECODE_MAX_WIDTH, drop_frames=True):
+        self.source = source; self.decode = decode; self.roi = roi; self.max_width = max_width; self.drop_frames = drop_frames
+        self.results = queue.SimpleQueue()
+        self._frame = (0, None)
+        self._pending = None  # (instante da captura, recorte) esperando o decodificador
+        self._cond = threading.Condition()
+        self._stop = threading.Event(); self._done = threading.Event()
+        self._capture_done = False
+        self._threads = []
+        self._capture_rate = _Rate(); self._decode_rate = _Rate()
+        self._latencies = deque(maxlen=60); self._decode_times = deque(maxlen=60)
+        self.frames = 0; self.decoded = 0; self.dropped = 0; self.read_errors = 0
+
+    def start(self):
+        for target, name in ((self._capture_loop, "scanner-captura"), (self._decode_loop, "scanner-decodificacao")):
+            thread = threading.Thread(target=target, name=name, daemon=True); thread.start(); self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond: self._cond.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread(): thread.join(timeout=2)
+        try: self.source.release()
+        except Exception: pass
+
+    @property
+    def running(self):
+        return not self._stop.is_set() and not self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Espera a fonte acabar e o último quadro ser decodificado; False se esgotou `timeout`."""
+        return self._done.wait(timeout)
+
+    def latest_frame(self):
+        return self._frame
+
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            ok, frame = self.source.read()
+            if not ok or frame is None:
+                if getattr(self.source, 'finished', False): break
+                self.read_errors += 1; time.sleep(0.05); continue
+            captured = time.perf_counter()
+            self.frames += 1; self._capture_rate.tick(captured)
+            self._frame = (self.frames, frame)
+            roi = prepare_roi(frame, self.roi, self.max_width)
+            with self._cond:
+                while not self.drop_frames and self._pending is not None and not self._stop.is_set(): self._cond.wait()
+                if self._pending is not None: self.dropped += 1  # o decodificador não pegou o anterior
+                self._pending = (captured, roi); self._cond.notify_all()
+        with self._cond:
+            self._capture_done = True; self._cond.notify_all()
+
+    def _decode_loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stop.is_set() and not self._capture_done: self._cond.wait()
+                if self._stop.is_set() or self._pending is None:
+                    self._done.set(); return
+                captured, roi = self._pending; self._pending = None; self._cond.notify_all()
+            started = time.perf_counter()
+            try: codes = self.decode(roi)
+            except Exception as e:
+                print(f"Erro ao decodificar quadro: {e}"); codes = []
+            done = time.perf_counter()
+            self.decoded += 1; self._decode_rate.tick(done)
+            self._decode_times.append(done - started); self._latencies.append(done - captured)
+            for code in codes: self.results.put((code, done - captured))
+
+    def stats(self):
+        def avg_ms(values): return sum(values) / len(values) * 1000 if values else 0.0
+        return {'capture_fps': self._capture_rate.per_second(), 'decode_fps': self._decode_rate.per_second(),
+                'decode_ms': avg_ms(list(self._decode_times)), 'latency_ms': avg_ms(list(self._latencies)),
+                'frames': self.frames, 'decoded': self.decoded, 'dropped': self.dropped}
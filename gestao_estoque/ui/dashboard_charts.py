@@ -0,0 +1,322 @@
+# ui/dashboard_charts.py
+# Gráficos do dashboard (colunas e pizza) que reaproveitam os artistas do matplotlib:
+# quando só os valores mudam, as barras/fatias existentes são ajustadas no lugar, e o
+# realce de hover é desenhado por blitting em vez de redesenhar a figura inteira.
+# O hit-testing do mouse usa índices ordenados (bisect) montados a cada desenho, em
+# coordenadas de dados, em vez de chamar contains() em cada artista.
+
+import io
+import math
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+import numpy as np
+import matplotlib.patheffects as path_effects
+from matplotlib.artist import setp
+from matplotlib.figure import Figure
+
+from database.db_manager import DatabaseManager
+
+ENTRADA_COLOR = '#d9534f'
+SAIDA_COLOR = '#5cb85c'
+
+# Agrupamentos do período (chaves de DatabaseManager.PERIOD_EXPRESSIONS) com a duração
+# aproximada em dias, do mais fino ao mais grosso.
+GRANULARITY_DAYS = (("dia", 1), ("semana", 7), ("mes", 30.44), ("ano", 365.25))
+PERIOD_TITLES = {"dia": "por dia", "semana": "por semana", "mes": "por mês", "ano": "por ano"}
+# Limites do agrupamento automático: rótulos no eixo x e grupos (período x produto) desenhados.
+MAX_PERIODS = 60
+MAX_BAR_GROUPS = 240
+OTHERS_ID = DatabaseManager.OTHERS_ID
+
+
+def choose_granularity(first_day, last_day, num_series, max_periods=MAX_PERIODS, max_groups=MAX_BAR_GROUPS):
+    """Agrupamento mais fino em que a faixa [first_day, last_day] ('YYYY-MM-DD') cabe em
+    `max_periods` períodos e `num_series` séries em `max_groups` grupos de barras."""
+    if not first_day or not last_day: return "dia"
+    span = (date.fromisoformat(last_day) - date.fromisoformat(first_day)).days + 1
+    for granularity, days in GRANULARITY_DAYS:
+        periods = math.ceil(span / days)
+        if periods <= max_periods and periods * max(num_series, 1) <= max_groups: return granularity
+    return GRANULARITY_DAYS[-1][0]
+
+
+def comparison_matrices(data, view_mode):
+    """Transforma as linhas (dia, pid, nome, valor_e, valor_s, qtd_e, qtd_s) de
+    `get_summary_for_all_products` em (dias, séries, entradas, saídas), com as matrizes
+    densas dias x produtos já na métrica `view_mode` ("Valor" ou "Quantidade").
+    As séries ficam na ordem em que aparecem nas linhas (a do SQL), com "Outros" por último."""
+    days, day_idx = np.unique([row[0] for row in data], return_inverse=True)
+    # np.unique ordena os ids; a ordem de exibição é a da primeira aparição.
+    sorted_pids, first_seen, sorted_idx = np.unique([row[1] for row in data], return_index=True, return_inverse=True)
+    order = np.lexsort((first_seen, sorted_pids == OTHERS_ID))
+    pids = sorted_pids[order]
+    pid_idx = np.argsort(order)[sorted_idx]
+    names = {row[1]: row[2] for row in data}
+    first = 3 if view_mode == "Valor" else 5
+    values = np.array([row[first:first + 2] for row in data], dtype=float)
+    entradas = np.zeros((len(days), len(pids))); saidas = np.zeros((len(days), len(pids)))
+    entradas[day_idx, pid_idx] = values[:, 0]; saidas[day_idx, pid_idx] = values[:, 1]
+    return days.tolist(), [(pid, names[pid]) for pid in pids.tolist()], entradas, saidas
+
+
+def resolve_granularity(db_manager, granularity, start_date, end_date, num_series):
+    """`granularity` ou, se None ("Automático"), o agrupamento escolhido para a faixa que de
+    fato tem movimentações dentro do filtro de datas."""
+    if granularity: return granularity
+    first_day, last_day, num_products = db_manager.get_summary_extent(start_date, end_date)
+    return choose_granularity(first_day, last_day, num_series if num_series else num_products)
+
+
+# As funções *_call montam o desenho (método, argumentos) de um BarChart/PieChart a partir
+# das linhas do banco; a tela e os relatórios sem interface desenham com os mesmos títulos.
+def comparison_call(data, view_mode, granularity="dia"):
+    if not data: return ("show_message", ('Sem movimentações para exibir no período.',))
+    days, series, entradas, saidas = comparison_matrices(data, view_mode)
+    if view_mode == "Valor":
+        ylabel = "Valor Movimentado (R$)"; title = "Comparativo de Movimentação Financeira por Produto"
+    else:
+        ylabel = "Quantidade Movimentada"; title = "Comparativo de Movimentação de Estoque por Produto"
+    title += f" ({PERIOD_TITLES[granularity]})"
+    return ("show", (days, series, entradas, saidas, title, ylabel, False))
+
+
+def single_product_call(product_id, product_name, data, view_mode, granularity="dia"):
+    if not data: return ("show_message", ('Sem movimentações para este produto/período.',))
+    days = [row[0] for row in data]
+    if view_mode == "Valor":
+        entradas = [row[1] for row in data]; saidas = [row[2] for row in data]
+        ylabel = "Valor Movimentado (R$)"; title = f"Movimentação Financeira - {product_name}"
+    else:
+        entradas = [row[3] for row in data]; saidas = [row[4] for row in data]
+        ylabel = "Quantidade Movimentada"; title = f"Movimentação de Estoque - {product_name}"
+    title += f" ({PERIOD_TITLES[granularity]})"
+    return ("show", (days, [(product_id, product_name)], entradas, saidas, title, ylabel, True))
+
+
+def pie_call(data):
+    if not data: return ("show_message", ('Sem dados de vendas para exibir.',))
+    return ("show", ([row[0] for row in data], [row[1] for row in data], [row[2] for row in data]))
+
+
+def render_png(chart_cls, last_call, selected_pid=None, dpi=200, figsize=(8, 4)):
+    """Repete `last_call` (o último show/show_message de um gráfico) numa figura Agg nova
+    e devolve o PNG num BytesIO. Não toca na figura da tela, então pode rodar num worker."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize); canvas = FigureCanvasAgg(fig)
+    chart = chart_cls(fig, fig.add_subplot(111), canvas); chart.selected_pid = selected_pid
+    method, args = last_call or ("show_message", ("",))
+    getattr(chart, method)(*args)
+    buf = io.BytesIO(); fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight'); buf.seek(0)
+    return buf
+
+
+class _BlitHover:
+    """Guarda o fundo do eixo a cada desenho completo e desenha o realce por cima dele."""
+
+    def __init__(self, fig, ax, canvas):
+        self.fig = fig; self.ax = ax; self.canvas = canvas
+        self.metadata = []
+        self.selected_pid = None
+        self.last_call = None  # (método, argumentos) do último desenho, para render_png
+        self._background = None
+        canvas.mpl_connect("draw_event", self._capture_background)
+
+    def _capture_background(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def blit_highlight(self, artists, **props):
+        """Desenha `artists` com `props` sobre o fundo salvo; o estado dos artistas não muda,
+        então o próximo desenho completo não "grava" o realce no fundo."""
+        if self._background is None:
+            self.canvas.draw_idle(); return
+        self.canvas.restore_region(self._background)
+        for artist in artists:
+            saved = {name: getattr(artist, f"get_{name}")() for name in props}
+            artist.set(**props); self.ax.draw_artist(artist); artist.set(**saved)
+        self.canvas.blit(self.ax.bbox)
+
+    def show_message(self, text):
+        self.last_call = ("show_message", (text,))
+        self.ax.clear(); self.metadata = []; self.signature = None; self._build_index()
+        if text: self.ax.text(0.5, 0.5, text, ha='center', va='center', transform=self.ax.transAxes)
+        return True
+
+
+class BarChart(_BlitHover):
+    """Colunas de entrada/saída por dia (um produto) ou por dia e produto (comparativo)."""
+
+    def __init__(self, fig, ax, canvas):
+        super().__init__(fig, ax, canvas)
+        self.signature = None
+        self.bars_e = self.bars_s = None  # um BarContainer por série, barras na ordem (dia, produto)
+        self._lefts = []; self._hits = []
+
+    def show(self, x_labels, series, entradas, saidas, title, ylabel, single=False, rebuild=False):
+        """Mostra as matrizes `entradas`/`saidas` (dias x produtos): a linha j é o rótulo
+        `x_labels[j]` e a coluna i a série `series[i] = (pid, nome)` (com uma só série,
+        basta uma lista por dia).
+
+        Se os rótulos e as séries são os mesmos do desenho anterior, só as alturas, o título e
+        a escala do eixo y mudam. Devolve True quando o gráfico foi reconstruído (o chamador
+        reaplica o tema e desenha) e False quando bastou atualizar no lugar.
+        """
+        self.last_call = ("show", (x_labels, series, entradas, saidas, title, ylabel, single))
+        entradas = np.asarray(entradas, dtype=float).ravel(); saidas = np.asarray(saidas, dtype=float).ravel()
+        signature = (tuple(x_labels), tuple(pid for pid, _ in series), single)
+        if rebuild or signature != self.signature:
+            self._rebuild(x_labels, series, entradas, saidas, single)
+            self._build_index()
+            self.signature = signature
+            rebuilt = True
+        else:
+            for bars, heights in ((self.bars_e, entradas), (self.bars_s, saidas)):
+                for rect, height in zip(bars, heights.tolist()): rect.set_height(height)
+            self.ax.relim(); self.ax.autoscale_view(scalex=False)
+            rebuilt = False
+        self.ax.set_title(title); self.ax.set_ylabel(ylabel)
+        if rebuilt: self.fig.tight_layout()
+        self.apply_styles()
+        return rebuilt
+
+    def _rebuild(self, x_labels, series, entradas, saidas, single):
+        ax = self.ax; ax.clear()
+        x = np.arange(len(x_labels), dtype=float); num_products = len(series)
+        if single:
+            bar_width = 0.35; offsets = np.zeros(1)
+        else:
+            bar_width = 0.8 / (num_products * 2 if num_products > 0 else 1)
+            offsets = (np.arange(num_products) - (num_products - 1) / 2) * (bar_width * 2.2)
+        # Centro de cada grupo (dia, produto) em ordem de linha, igual às matrizes achatadas.
+        centers = (x[:, None] + offsets[None, :]).ravel()
+        self.bars_e = ax.bar(centers - bar_width / 2, entradas, bar_width, color=ENTRADA_COLOR, label='Compras (Entrada)' if single else None)
+        self.bars_s = ax.bar(centers + bar_width / 2, saidas, bar_width, color=SAIDA_COLOR, label='Vendas (Saída)' if single else None)
+        cells = ((pid, name, day) for day in x_labels for pid, name in series)
+        self.metadata = [{'bar_e': e, 'bar_s': s, 'pid': pid, 'name': name, 'day': day} for e, s, (pid, name, day) in zip(self.bars_e, self.bars_s, cells)]
+        ax.set_xticks(x)
+        if single:
+            ax.set_xticklabels(x_labels, rotation=45, ha="right")
+            ax.legend()
+            return
+        ax.set_xticklabels(x_labels, rotation=30, ha="right")
+        ax.tick_params(axis='x', which='major', pad=20)
+        if len(centers):
+            short_names = [(name[:10] + '..') if len(name) > 12 else name for _, name in series]
+            ax.set_xticks(centers, minor=True)
+            ax.set_xticklabels(short_names * len(x_labels), minor=True, rotation=0, ha='center', fontsize=9)
+            for label in ax.get_xticklabels(minor=True):
+                label.set_path_effects([path_effects.withStroke(linewidth=1.5, foreground='white')])
+        ax.tick_params(axis='x', which='minor', length=0)
+
+    def _build_index(self):
+        # As barras não se sobrepõem no eixo x e a posição delas só muda numa reconstrução
+        # (atualizar no lugar mexe só na altura), então basta ordenar pela borda esquerda.
+        hits = sorted(((bar.get_x(), bar.get_x() + bar.get_width(), bar, info, kind)
+                       for info in self.metadata for bar, kind in ((info['bar_e'], 'entrada'), (info['bar_s'], 'saida'))),
+                      key=lambda hit: hit[0])
+        self._lefts = [hit[0] for hit in hits]; self._hits = [hit[1:] for hit in hits]
+
+    def hit_test(self, x, y):
+        """Barra sob o ponto (x, y) em coordenadas de dados: (metadado, 'entrada'|'saida') ou (None, None). O(log n)."""
+        if x is None or y is None: return None, None
+        i = bisect_right(self._lefts, x) - 1
+        if i < 0: return None, None
+        right, bar, info, kind = self._hits[i]
+        bottom = bar.get_y(); top = bottom + bar.get_height()
+        if x > right or not min(bottom, top) <= y <= max(bottom, top): return None, None
+        return info, kind
+
+    def apply_styles(self):
+        """Estilo base (sem hover): a seleção fica opaca e com borda amarela."""
+        for info in self.metadata:
+            is_selected = self.selected_pid == info['pid']
+            for bar in (info['bar_e'], info['bar_s']):
+                bar.set_alpha(1.0 if is_selected else 0.6)
+                bar.set_edgecolor('yellow' if is_selected else None); bar.set_linewidth(1.5 if is_selected else 0)
+
+    def highlight(self, pid):
+        """Realça (por blitting) as barras do produto `pid`; None apaga o realce."""
+        bars = [bar for info in self.metadata if info['pid'] == pid for bar in (info['bar_e'], info['bar_s'])] if pid is not None else []
+        self.blit_highlight(bars, alpha=1.0)
+
+
+class PieChart(_BlitHover):
+    """Pizza de vendas por produto; com os mesmos produtos, as fatias são reposicionadas no lugar."""
+    START_ANGLE = 90; PCT_DISTANCE = 0.85; LABEL_DISTANCE = 1.1; EXPLODE = 0.1
+
+    def __init__(self, fig, ax, canvas):
+        super().__init__(fig, ax, canvas)
+        self.signature = None
+        self.autotexts = []; self.texts = []
+        self._theta_ends = []
+
+    def show(self, pids, labels, sizes, rebuild=False):
+        """Devolve True se a pizza foi reconstruída, False se só as fatias foram ajustadas."""
+        self.last_call = ("show", (pids, labels, sizes))
+        explode = [self.EXPLODE if pid == self.selected_pid else 0 for pid in pids]
+        signature = (tuple(pids), tuple(labels))
+        if rebuild or signature != self.signature:
+            ax = self.ax; ax.clear()
+            wedges, self.texts, self.autotexts = ax.pie(sizes, labels=labels, autopct='%1.1f%%', shadow=False,
+                                                        startangle=self.START_ANGLE, pctdistance=self.PCT_DISTANCE,
+                                                        labeldistance=self.LABEL_DISTANCE, explode=explode)
+            self.metadata = [{'wedge': wedge, 'pid': pid, 'name': label} for wedge, pid, label in zip(wedges, pids, labels)]
+            ax.set_title("Composição de Vendas por Produto")
+            setp(self.autotexts, size=8, weight="bold", path_effects=[path_effects.withStroke(linewidth=1.5, foreground='white')])
+            ax.axis('equal')
+            self.fig.tight_layout()
+            self.signature = signature
+            rebuilt = True
+        else:
+            self._relayout(sizes, explode)
+            rebuilt = False
+        self._build_index()
+        self.apply_styles()
+        return rebuilt
+
+    def _relayout(self, sizes, explode):
+        # Mesma geometria de Axes.pie (raio 1, sentido anti-horário a partir de START_ANGLE).
+        total = float(sum(sizes)) or 1.0
+        theta1 = self.START_ANGLE / 360.0
+        for info, text, autotext, size, expl in zip(self.metadata, self.texts, self.autotexts, sizes, explode):
+            frac = size / total; theta2 = theta1 + frac
+            thetam = 2 * math.pi * 0.5 * (theta1 + theta2)
+            cx = expl * math.cos(thetam); cy = expl * math.sin(thetam)
+            wedge = info['wedge']
+            wedge.set_center((cx, cy)); wedge.set_theta1(360.0 * theta1); wedge.set_theta2(360.0 * theta2)
+            xt = cx + self.LABEL_DISTANCE * math.cos(thetam)
+            text.set_position((xt, cy + self.LABEL_DISTANCE * math.sin(thetam))); text.set_horizontalalignment('left' if xt > 0 else 'right')
+            autotext.set_position((cx + self.PCT_DISTANCE * math.cos(thetam), cy + self.PCT_DISTANCE * math.sin(thetam)))
+            autotext.set_text('%1.1f%%' % (100.0 * frac))
+            theta1 = theta2
+
+    def _build_index(self):
+        # Ângulos finais das fatias, crescentes de START_ANGLE até START_ANGLE + 360.
+        self._theta_ends = [info['wedge'].theta2 for info in self.metadata]
+
+    def _wedge_contains(self, index, x, y):
+        wedge = self.metadata[index]['wedge']; cx, cy = wedge.center
+        if math.hypot(x - cx, y - cy) > wedge.r: return False
+        return (math.degrees(math.atan2(y - cy, x - cx)) - wedge.theta1) % 360 <= wedge.theta2 - wedge.theta1
+
+    def hit_test(self, x, y):
+        """Índice da fatia sob o ponto (x, y) em coordenadas de dados, ou -1. O(log n)."""
+        if x is None or y is None or not self._theta_ends: return -1
+        angle = (math.degrees(math.atan2(y, x)) - self.START_ANGLE) % 360 + self.START_ANGLE
+        i = bisect_left(self._theta_ends, angle)
+        # A fatia destacada (explode) sai do centro; perto das bordas o ângulo visto da origem
+        # pode cair na vizinha, por isso as adjacentes também são conferidas.
+        for j in (i, i - 1, i + 1):
+            if 0 <= j < len(self._theta_ends) and self._wedge_contains(j, x, y): return j
+        return -1
+
+    def apply_styles(self):
+        for info in self.metadata:
+            is_selected = self.selected_pid == info['pid']
+            wedge = info['wedge']
+            wedge.set_alpha(1.0 if is_selected else 0.7)
+            wedge.set_edgecolor('yellow' if is_selected else None); wedge.set_linewidth(1.5 if is_selected else 0)
+
+    def highlight(self, index):
+        """Realça (por blitting) a fatia `index`; -1 apaga o realce."""
+        self.blit_highlight([self.metadata[index]['wedge']] if 0 <= index < len(self.metadata) else [], alpha=1.0)
@@ -2,32 +2,34 @@
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from collections import defaultdict
-import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
 import matplotlib.patheffects as path_effects
-import os
 import re
 from datetime import datetime
-from tkcalendar import Calendar
-from reportlab.platypus import SimpleDocTemplate, Image, Spacer, Paragraph, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.lib import colors
+from ui.dashboard_charts import BarChart, PieChart, comparison_call, pie_call, resolve_granularity, single_product_call
+from ui.progress_dialog import ProgressDialog
+# tkcalendar e reportlab só são importados ao abrir o calendário / exportar o PDF.
 
 class DashboardTab(ctk.CTkFrame):
+    HOVER_INTERVAL_MS = 16  # ~60 quadros/s
+    GRANULARITY_OPTIONS = {"Automático": None, "Dia": "dia", "Semana": "semana", "Mês": "mes", "Ano": "ano"}
+    TOP_N = 8  # produtos separados no comparativo/pizza quando "Outros" está ligado
+
     def __init__(self, parent, db_manager, main_app):
         super().__init__(parent, fg_color="transparent")
         self.db_manager = db_manager
         self.main_app = main_app
+        self.db_worker = main_app.db_worker
         self.product_map = {}
+        self.product_filter_generation = None
         self.bar_metadata = []
         self.pie_metadata = []
+        self.pie_data = []
         self.selected_pid = None
         self.hovered_bar_info = None
         self.hovered_wedge_index = -1
+        self._pending_motion = None; self._motion_job = None
 
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
@@ -81,6 +83,16 @@ class DashboardTab(ctk.CTkFrame):
         self.product_filter_combo = ctk.CTkComboBox(self.filter_panel, command=self.on_filter_change)
         self.product_filter_combo.pack(pady=(0, 10), padx=10, fill="x")
 
+        # Períodos longos são somados por semana/mês/ano no SQL; "Automático" escolhe o mais
+        # fino que mantém o número de barras desenhadas limitado.
+        ctk.CTkLabel(self.filter_panel, text="Agrupar Período:").pack(anchor="w", padx=10)
+        self.granularity_combo = ctk.CTkComboBox(self.filter_panel, values=list(self.GRANULARITY_OPTIONS), command=lambda _: self.update_graph())
+        self.granularity_combo.set("Automático")
+        self.granularity_combo.pack(pady=(0, 10), padx=10, fill="x")
+        self.top_n_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(self.filter_panel, text=f"Só os {self.TOP_N} maiores (demais em 'Outros')", variable=self.top_n_var,
+                        command=self.update_graph).pack(anchor="w", padx=10, pady=(0, 10))
+
         ctk.CTkLabel(self.filter_panel, text="Tipo de Gráfico:").pack(anchor="w", padx=10, pady=(10,0))
         self.chart_type_var = ctk.StringVar(value="Colunas")
         self.radio_bar = ctk.CTkRadioButton(self.filter_panel, text="Colunas", variable=self.chart_type_var, value="Colunas", command=self.update_graph)
@@ -114,97 +126,51 @@ class DashboardTab(ctk.CTkFrame):
         self.canvas_pie.get_tk_widget().pack(side="top", fill="both", expand=True)
         self.canvas_pie.mpl_connect("motion_notify_event", self.on_hover)
         self.canvas_pie.mpl_connect("button_press_event", self.on_click)
+
+        # Os gráficos guardam os artistas entre atualizações: mudar só a métrica ou o período
+        # (mesmos dias e produtos) ajusta as barras/fatias no lugar em vez de recriar tudo.
+        self.bar_chart = BarChart(self.fig_bar, self.ax_bar, self.canvas_bar)
+        self.pie_chart = PieChart(self.fig_pie, self.ax_pie, self.canvas_pie)
         
         self._populate_product_filter()
 
 
     def export_to_pdf(self):
+        # O PDF é montado no DbWorker (consultas, gráfico numa figura Agg própria e paginação);
+        # a janela só acompanha o progresso.
+        if getattr(self, 'pdf_report', None): return  # já há uma exportação em andamento
         filepath = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF Documents", "*.pdf")], title="Salvar Relatório do Dashboard")
         if not filepath: return
-        temp_image_path = "temp_dashboard_graph.png"
-        try:
-            fig_to_save = self.fig_pie if self.tab_view.get() == "pie_chart" else self.fig_bar
-            fig_to_save.savefig(temp_image_path, dpi=300, bbox_inches='tight')
-            
-            doc = SimpleDocTemplate(filepath)
-            story = []; styles = getSampleStyleSheet()
-            title = Paragraph("Relatório de Movimentação do Dashboard", styles['h1'])
-            story.append(title); story.append(Spacer(1, 0.2 * inch))
-
-            img = Image(temp_image_path)
-            img_width, img_height = img.imageWidth, img.imageHeight
-            aspect = img_height / float(img_width)
-            display_width = 6.5 * inch; display_height = display_width * aspect
-            img.drawWidth = display_width; img.drawHeight = display_height
-            story.append(img)
-            story.append(Spacer(1, 0.2 * inch))
-
-            start_date, end_date = self._get_dates()
-            
-            if self.tab_view.get() == "pie_chart":
-                data = self.db_manager.get_total_sales_by_product()
-                if data:
-                    table_data = [["Produto", "Valor (R$)", "Percentual"]]
-                    total = sum([row[2] for row in data]) or 1
-                    for pid, name, val in data:
-                        pct = f"{(val / total) * 100:.1f}%"
-                        table_data.append([name, f"R$ {val:.2f}", pct])
-                    tbl = Table(table_data, colWidths=[3.5 * inch, 1.5 * inch, 1.5 * inch])
-                    tbl.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
-                        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-                        ('ALIGN', (1,1), (-1,-1), 'RIGHT'),
-                    ]))
-                    story.append(Paragraph("Dados de Vendas por Produto:", styles['h2']))
-                    story.append(Spacer(1, 0.1 * inch))
-                    story.append(tbl)
-            else:
-                selected_product_str = self.product_filter_combo.get()
-                if selected_product_str == "Todos os Produtos":
-                    data = self.db_manager.get_summary_for_all_products(start_date, end_date)
-                    if data:
-                        table_data = [["Data", "Produto", "Valor Entrada", "Valor Saida", "Qtd Entrada", "Qtd Saida"]]
-                        for day, pid, name, ve, vs, qe, qs in data:
-                            table_data.append([day, name, f"R$ {ve:.2f}", f"R$ {vs:.2f}", str(qe), str(qs)])
-                        tbl = Table(table_data, colWidths=[1.2*inch, 2.5*inch, 1.2*inch, 1.2*inch, 0.8*inch, 0.8*inch])
-                        tbl.setStyle(TableStyle([
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
-                            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-                            ('ALIGN', (2,1), (-1,-1), 'RIGHT'),
-                        ]))
-                        story.append(Paragraph("Resumo de Movimentações por Dia e Produto:", styles['h2']))
-                        story.append(Spacer(1, 0.1 * inch))
-                        story.append(tbl)
-                else:
-                    product_id = self.product_map.get(selected_product_str)
-                    if product_id:
-                        data = self.db_manager.get_summary_for_single_product(product_id, start_date, end_date)
-                        table_data = [["Data", "Valor Entrada", "Valor Saida", "Qtd Entrada", "Qtd Saida"]]
-                        for day, ve, vs, qe, qs in data:
-                            table_data.append([day, f"R$ {ve:.2f}", f"R$ {vs:.2f}", str(qe), str(qs)])
-                        tbl = Table(table_data, colWidths=[1.6*inch, 1.5*inch, 1.5*inch, 1.0*inch, 1.0*inch])
-                        tbl.setStyle(TableStyle([
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
-                            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-                            ('ALIGN', (1,1), (-1,-1), 'RIGHT'),
-                        ]))
-                        story.append(Paragraph(f"Detalhamento de Movimentações - {selected_product_str}", styles['h2']))
-                        story.append(Spacer(1, 0.1 * inch))
-                        story.append(tbl)
-
-            doc.build(story)
-            messagebox.showinfo("Sucesso", f"Relatório salvo com sucesso em:\n{filepath}")
-            self.main_app.db_manager.add_notification("Relatório do dashboard foi exportado para PDF.")
+        from ui.pdf_report import dashboard_report
+        start_date, end_date = self._get_dates()
+        selected_product_str = self.product_filter_combo.get()
+        if self.tab_view.get() == "pie_chart":
+            top_n = self.TOP_N if self.top_n_var.get() else None
+            report = dashboard_report(self.db_manager, filepath, "pizza", start_date=start_date, end_date=end_date, top_n=top_n,
+                                      chart_call=self.pie_chart.last_call, selected_pid=self.selected_pid)
+        else:
+            product_id = None if selected_product_str == "Todos os Produtos" else self.product_map.get(selected_product_str)
+            report = dashboard_report(self.db_manager, filepath, "colunas", product_id, selected_product_str, start_date, end_date,
+                                      chart_call=self.bar_chart.last_call, selected_pid=self.selected_pid)
+        self.pdf_report = report
+        def progress():
+            if not report.rows_total: return None, report.stage or "Preparando..."
+            return report.rows_done / report.rows_total, f"{report.stage}: {report.rows_done:,} de {report.rows_total:,} linhas".replace(",", ".")
+        dialog = ProgressDialog(self.main_app, "Exportando PDF", progress, on_cancel=report.cancel)
+        def done(path):
+            self.pdf_report = None; dialog.close()
+            if path is None:
+                messagebox.showinfo("Exportação Cancelada", "A geração do PDF foi cancelada."); return
+            messagebox.showinfo("Sucesso", f"Relatório salvo com sucesso em:\n{path}")
+            self.main_app.db_manager.add_notification("Relatório do dashboard foi exportado para PDF.", tipo='exportacao')
             self.main_app.update_notifications_button()
-        except Exception as e:
+        def failed(e):
+            self.pdf_report = None; dialog.close()
             messagebox.showerror("Erro na Exportação", f"Ocorreu um erro ao gerar o PDF: {e}")
-        finally:
-            if os.path.exists(temp_image_path):
-                os.remove(temp_image_path)
-
-
+        self.db_worker.submit(report.run, on_done=done, on_error=failed, key="exportacao_pdf", long_running=True)
 
     def _open_calendar(self, date_label):
+        from tkcalendar import Calendar
         top = ctk.CTkToplevel(self)
         top.title("Selecione a Data")
         top.geometry("300x280")
@@ -227,9 +193,20 @@ class DashboardTab(ctk.CTkFrame):
         self.update_graph()
 
     def _get_dates(self):
-        start_date = self.start_date_label.cget("text")
-        end_date = self.end_date_label.cget("text")
-        return None if start_date == "Nenhuma" else start_date, None if end_date == "Nenhuma" else end_date
+        """Devolve (início, fim) como chaves de dia 'YYYY-MM-DD', prontas para o filtro de faixa na coluna `dia`."""
+        start_date = self._label_to_day_key(self.start_date_label)
+        end_date = self._label_to_day_key(self.end_date_label)
+        if start_date and end_date and start_date > end_date:
+            start_date, end_date = end_date, start_date
+        return start_date, end_date
+
+    def _label_to_day_key(self, date_label):
+        text = date_label.cget("text")
+        if text == "Nenhuma": return None
+        try:
+            return datetime.strptime(text, '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            return None
 
     def on_filter_change(self, choice):
         if choice == "Todos os Produtos":
@@ -242,161 +219,131 @@ class DashboardTab(ctk.CTkFrame):
     def update_graph(self, event=None):
         start_date, end_date = self._get_dates()
 
-        self.bar_metadata.clear(); self.pie_metadata.clear()
         self.selected_pid = None; self.hovered_bar_info = None; self.hovered_wedge_index = -1
         self.update_info_panel(None)
         
+        # As consultas rodam no DbWorker; trocar o filtro no meio de uma consulta
+        # substitui o pedido anterior (mesma key), e só o gráfico mais recente é desenhado.
         chart_type = self.chart_type_var.get()
-        if chart_type == "Pizza" and self.product_filter_combo.get() == "Todos os Produtos":
-            self.tab_view.set("pie_chart")
-            self.ax_pie.clear()
-            self._plot_pie_chart()
-            self.update_theme(self.fig_pie, self.ax_pie)
-            self.canvas_pie.draw()
+        selected_product_str = self.product_filter_combo.get()
+        granularity = self.GRANULARITY_OPTIONS.get(self.granularity_combo.get())
+        top_n = self.TOP_N if self.top_n_var.get() else None
+        if chart_type == "Pizza" and selected_product_str == "Todos os Produtos":
+            self.db_worker.submit(self.db_manager.get_total_sales_by_product, top_n, start_date, end_date, on_done=self._draw_pie_chart, key="dashboard")
+        elif selected_product_str == "Todos os Produtos":
+            self.db_worker.submit(self._load_comparison, start_date, end_date, granularity, top_n,
+                                  on_done=lambda result: self._draw_bar_chart(self._plot_all_products_comparison, *result), key="dashboard")
         else:
-            self.tab_view.set("bar_chart")
-            self.ax_bar.clear()
-            selected_product_str = self.product_filter_combo.get()
-            if selected_product_str == "Todos os Produtos":
-                self._plot_all_products_comparison(start_date, end_date)
-            else:
-                product_id = self.product_map.get(selected_product_str)
-                if product_id:
-                    self._plot_single_product(product_id, start_date, end_date)
-            self.update_theme(self.fig_bar, self.ax_bar)
-            self.canvas_bar.draw()
+            product_id = self.product_map.get(selected_product_str)
+            if not product_id:
+                self.db_worker.cancel("dashboard"); self._draw_bar_chart(None, None); return
+            self.db_worker.submit(self._load_single_product, product_id, start_date, end_date, granularity,
+                                  on_done=lambda result: self._draw_bar_chart(self._plot_single_product, product_id, *result), key="dashboard")
+
+    def _draw_pie_chart(self, data):
+        self.tab_view.set("pie_chart")
+        # O tema só precisa ser reaplicado (e a figura redesenhada por inteiro) quando os eixos foram recriados.
+        if self._plot_pie_chart(data): self.update_theme(self.fig_pie, self.ax_pie)
+        else: self.canvas_pie.draw_idle()
+
+    def _draw_bar_chart(self, plot_func, *args):
+        self.tab_view.set("bar_chart")
+        self.bar_chart.selected_pid = self.selected_pid
+        rebuilt = plot_func(*args) if plot_func else self.bar_chart.show_message('')
+        self.bar_metadata = self.bar_chart.metadata
+        if rebuilt: self.update_theme(self.fig_bar, self.ax_bar)
+        else: self.canvas_bar.draw_idle()
+
+    def _load_comparison(self, start_date, end_date, granularity, top_n):
+        # Roda no DbWorker. Com "Outros" ligado são no máximo top_n + 1 séries.
+        granularity = resolve_granularity(self.db_manager, granularity, start_date, end_date, top_n + 1 if top_n else None)
+        return self.db_manager.get_summary_for_all_products(start_date, end_date, granularity, top_n), granularity
+
+    def _load_single_product(self, product_id, start_date, end_date, granularity):
+        # Roda no DbWorker: resumo do período e nome do produto numa só ida ao banco.
+        granularity = resolve_granularity(self.db_manager, granularity, start_date, end_date, 1)
+        data = self.db_manager.get_summary_for_single_product(product_id, start_date, end_date, granularity)
+        product_data = self.db_manager.get_product_by_id(product_id) if data else None
+        return data, product_data[1] if product_data else "", granularity
             
-    def _plot_single_product(self, product_id, start_date=None, end_date=None):
-        data = self.db_manager.get_summary_for_single_product(product_id, start_date, end_date)
-        view_mode = self.view_mode_var.get()
-        if not data:
-            self.ax_bar.text(0.5, 0.5, 'Sem movimentações para este produto/período.', ha='center', va='center', transform=self.ax_bar.transAxes)
-            return
-        product_data = self.db_manager.get_product_by_id(product_id)
-        product_name = product_data[1]
-        days = [row[0] for row in data]
-        if view_mode == "Valor":
-            entradas = [row[1] for row in data]; saidas = [row[2] for row in data]
-            self.ax_bar.set_ylabel("Valor Movimentado (R$)"); self.ax_bar.set_title(f"Movimentação Financeira - {product_name}")
-        else:
-            entradas = [row[3] for row in data]; saidas = [row[4] for row in data]
-            self.ax_bar.set_ylabel("Quantidade Movimentada"); self.ax_bar.set_title(f"Movimentação de Estoque - {product_name}")
-        x = np.arange(len(days)); width = 0.35
-        bars_e = self.ax_bar.bar(x - width/2, entradas, width, label='Compras (Entrada)', color='#d9534f')
-        bars_s = self.ax_bar.bar(x + width/2, saidas, width, label='Vendas (Saída)', color='#5cb85c')
-        for bar_e, bar_s in zip(bars_e, bars_s):
-            self.bar_metadata.append({'bar_e': bar_e, 'bar_s': bar_s, 'pid': product_id, 'name': product_name})
-        self.ax_bar.set_xticks(x); self.ax_bar.set_xticklabels(days, rotation=45, ha="right")
-        self.ax_bar.legend()
-        self.fig_bar.tight_layout()
-        self.update_bar_visuals()
+    def _plot_single_product(self, product_id, data, product_name, granularity="dia"):
+        method, args = single_product_call(product_id, product_name, data, self.view_mode_var.get(), granularity)
+        return getattr(self.bar_chart, method)(*args)
 
-    def _plot_all_products_comparison(self, start_date=None, end_date=None):
-        data = self.db_manager.get_summary_for_all_products(start_date, end_date)
-        view_mode = self.view_mode_var.get()
-        if not data:
-            self.ax_bar.text(0.5, 0.5, 'Sem movimentações para exibir no período.', ha='center', va='center', transform=self.ax_bar.transAxes)
-            return
-        data_map = defaultdict(lambda: defaultdict(lambda: {'valor_e': 0, 'valor_s': 0, 'qtd_e': 0, 'qtd_s': 0}))
-        product_names = {}; all_days = set()
-        for day, pid, name, ve, vs, qe, qs in data:
-            data_map[day][pid] = {'valor_e': ve, 'valor_s': vs, 'qtd_e': qe, 'qtd_s': qs}
-            product_names[pid] = name; all_days.add(day)
-        days = sorted(list(all_days)); product_ids = sorted(list(product_names.keys())); num_products = len(product_ids)
-        x = np.arange(len(days)); bar_width = 0.8 / (num_products * 2 if num_products > 0 else 1)
-        minor_tick_positions = []; minor_tick_labels = []
-        for i, pid in enumerate(product_ids):
-            product_offset = (i - (num_products - 1) / 2) * (bar_width * 2.2)
-            if view_mode == "Valor":
-                entradas = [data_map[day][pid]['valor_e'] for day in days]; saidas = [data_map[day][pid]['valor_s'] for day in days]
-            else:
-                entradas = [data_map[day][pid]['qtd_e'] for day in days]; saidas = [data_map[day][pid]['qtd_s'] for day in days]
-            pos_entrada = x + product_offset - bar_width / 2; pos_saida = x + product_offset + bar_width / 2
-            minor_tick_positions.extend(x + product_offset)
-            short_name = (product_names[pid][:10] + '..') if len(product_names[pid]) > 12 else product_names[pid]
-            minor_tick_labels.extend([short_name] * len(days))
-            bars_e = self.ax_bar.bar(pos_entrada, entradas, width=bar_width, color='#d9534f')
-            bars_s = self.ax_bar.bar(pos_saida, saidas, width=bar_width, color='#5cb85c')
-            for idx, (bar_e, bar_s) in enumerate(zip(bars_e, bars_s)):
-                self.bar_metadata.append({'bar_e': bar_e, 'bar_s': bar_s, 'pid': pid, 'name': product_names[pid], 'day': days[idx]})
-
-        if view_mode == "Valor":
-            self.ax_bar.set_ylabel("Valor Movimentado (R$)"); self.ax_bar.set_title("Comparativo de Movimentação Financeira por Produto")
-        else:
-            self.ax_bar.set_ylabel("Quantidade Movimentada"); self.ax_bar.set_title("Comparativo de Movimentação de Estoque por Produto")
-        self.ax_bar.set_xticks(x); self.ax_bar.set_xticklabels(days, rotation=30, ha="right")
-        self.ax_bar.tick_params(axis='x', which='major', pad=20)
-        if minor_tick_positions:
-            self.ax_bar.set_xticks(minor_tick_positions, minor=True)
-            self.ax_bar.set_xticklabels(minor_tick_labels, minor=True, rotation=0, ha='center', fontsize=9)
-            for label in self.ax_bar.get_xticklabels(minor=True):
-                label.set_path_effects([path_effects.withStroke(linewidth=1.5, foreground='white')])
-        self.ax_bar.tick_params(axis='x', which='minor', length=0)
-        self.fig_bar.tight_layout()
-        self.update_bar_visuals()
+    def _plot_all_products_comparison(self, data, granularity="dia"):
+        method, args = comparison_call(data, self.view_mode_var.get(), granularity)
+        return getattr(self.bar_chart, method)(*args)
 
     def on_double_click(self, event):
         print("--- DEBUG: Double-click detectado! ---") # LINHA DE DEBUG
         if self.tab_view.get() == "pie_chart":
             if self.hovered_wedge_index != -1:
                 info = self.pie_metadata[self.hovered_wedge_index]
+                if info['pid'] == self.db_manager.OTHERS_ID: return
                 print(f"--- DEBUG: Abrindo histórico (pizza) para: {info['name']} ---") # LINHA DE DEBUG
                 self.main_app.show_history_window(info['pid'], info['name'], "saida")
             return
 
-        if self.hovered_bar_info:
-            pid = self.hovered_bar_info['pid']
-            name = self.hovered_bar_info['name']
-            bar_e = self.hovered_bar_info['bar_e']
-            bar_s = self.hovered_bar_info['bar_s']
+        bar_info, kind = self._bar_at(event)
+        if bar_info and bar_info['pid'] != self.db_manager.OTHERS_ID:
+            pid = bar_info['pid']
+            name = bar_info['name']
             
-            contains_e, _ = bar_e.contains(event)
-            contains_s, _ = bar_s.contains(event)
-            
-            if contains_e:
+            if kind == 'entrada':
                 print(f"--- DEBUG: Abrindo histórico (barra ENTRADA) para: {name} ---") # LINHA DE DEBUG
                 self.main_app.show_history_window(pid, name, "entrada")
-            elif contains_s:
+            else:
                 print(f"--- DEBUG: Abrindo histórico (barra SAÍDA) para: {name} ---") # LINHA DE DEBUG
                 self.main_app.show_history_window(pid, name, "saida")
 
     # --- O RESTO DO CÓDIGO PERMANECE O MESMO ---
 
     def _populate_product_filter(self):
-        products = self.db_manager.get_all_products()
+        generation = self.db_manager.catalog_generation("produtos")
+        if generation == self.product_filter_generation: return  # mantém o filtro escolhido
+        def fill(products):
+            self.product_filter_generation = generation
+            self._fill_product_filter(products)
+        self.db_worker.submit(self.db_manager.get_product_names, on_done=fill, key="dashboard_produtos")
+
+    def _fill_product_filter(self, products):
         self.product_map = {f"{p[0]} - {p[1]}": p[0] for p in products}
         product_list = ["Todos os Produtos"] + list(self.product_map.keys())
         self.product_filter_combo.configure(values=product_list)
         self.product_filter_combo.set("Todos os Produtos")
 
+    def _bar_at(self, event):
+        return self.bar_chart.hit_test(event.xdata, event.ydata) if event.inaxes == self.ax_bar else (None, None)
+
+    def _wedge_at(self, event):
+        return self.pie_chart.hit_test(event.xdata, event.ydata) if event.inaxes == self.ax_pie else -1
+
     def on_hover(self, event):
-        if self.selected_pid: return
+        # O Tk entrega um motion_notify_event por pixel; só o último de cada intervalo é
+        # processado, e a busca nos índices do gráfico é O(log n) por evento.
+        self._pending_motion = event
+        if self._motion_job is None:
+            self._motion_job = self.after(self.HOVER_INTERVAL_MS, self._process_motion)
+
+    def _process_motion(self):
+        self._motion_job = None
+        event, self._pending_motion = self._pending_motion, None
+        if event is None or self.selected_pid: return
         
         if self.tab_view.get() == "pie_chart":
-            found_wedge_index = -1
-            if event.inaxes == self.ax_pie:
-                for i, wedge_info in enumerate(self.pie_metadata):
-                    if wedge_info['wedge'].contains_point([event.x, event.y]):
-                        found_wedge_index = i
-                        break
+            found_wedge_index = self._wedge_at(event)
             if found_wedge_index != self.hovered_wedge_index:
                 self.hovered_wedge_index = found_wedge_index
-                self.update_pie_visuals()
+                self.pie_chart.highlight(found_wedge_index)
                 self.update_info_panel(self.pie_metadata[found_wedge_index] if found_wedge_index != -1 else None)
-                self.canvas_pie.draw_idle()
             return
 
-        found_bar = None
-        if event.inaxes == self.ax_bar:
-            for bar_info in self.bar_metadata:
-                contains, _ = bar_info['bar_e'].contains(event)
-                if not contains: contains, _ = bar_info['bar_s'].contains(event)
-                if contains: found_bar = bar_info; break
+        found_bar, _ = self._bar_at(event)
         if found_bar != self.hovered_bar_info:
             self.hovered_bar_info = found_bar
-            self.update_bar_visuals()
+            # Hover só muda o realce: blit do eixo sobre o fundo salvo, sem redesenhar a figura.
+            self.bar_chart.highlight(found_bar['pid'] if found_bar else None)
             self.update_info_panel(found_bar)
-            self.canvas_bar.draw_idle()
 
     def on_click(self, event):
         if event.dblclick:
@@ -404,12 +351,7 @@ class DashboardTab(ctk.CTkFrame):
             return
 
         if self.tab_view.get() == "pie_chart":
-            clicked_wedge_index = -1
-            if event.inaxes == self.ax_pie:
-                for i, wedge_info in enumerate(self.pie_metadata):
-                    if wedge_info['wedge'].contains_point([event.x, event.y]):
-                        clicked_wedge_index = i
-                        break
+            clicked_wedge_index = self._wedge_at(event)
             if clicked_wedge_index != -1:
                 clicked_pid = self.pie_metadata[clicked_wedge_index]['pid']
                 self.selected_pid = clicked_pid if self.selected_pid != clicked_pid else None
@@ -417,17 +359,11 @@ class DashboardTab(ctk.CTkFrame):
                 self.selected_pid = None
             
             self._plot_pie_chart()
-            self.update_pie_visuals()
             self.update_info_panel(self.pie_metadata[clicked_wedge_index] if self.selected_pid else None)
             self.canvas_pie.draw_idle()
             return
 
-        clicked_bar_info = None
-        if event.inaxes == self.ax_bar:
-            for bar_info in self.bar_metadata:
-                contains, _ = bar_info['bar_e'].contains(event)
-                if not contains: contains, _ = bar_info['bar_s'].contains(event)
-                if contains: clicked_bar_info = bar_info; break
+        clicked_bar_info, _ = self._bar_at(event)
         if clicked_bar_info and self.selected_pid == clicked_bar_info['pid']:
             self.selected_pid = None
         else:
@@ -437,50 +373,32 @@ class DashboardTab(ctk.CTkFrame):
         self.canvas_bar.draw_idle()
 
     def update_bar_visuals(self):
-        for bar_info in self.bar_metadata:
-            pid = bar_info['pid']; bar_e = bar_info['bar_e']; bar_s = bar_info['bar_s']
-            is_selected = (self.selected_pid == pid)
-            is_hovered = (self.hovered_bar_info and self.hovered_bar_info['pid'] == pid)
-            alpha = 1.0 if is_selected or is_hovered else 0.6
-            edgecolor = 'yellow' if is_selected else None
-            linewidth = 1.5 if is_selected else 0
-            bar_e.set_alpha(alpha); bar_s.set_alpha(alpha)
-            bar_e.set_edgecolor(edgecolor); bar_e.set_linewidth(linewidth)
-            bar_s.set_edgecolor(edgecolor); bar_s.set_linewidth(linewidth)
-
-    def update_pie_visuals(self):
-        for i, wedge_info in enumerate(self.pie_metadata):
-            wedge = wedge_info['wedge']
-            is_selected = (self.selected_pid == wedge_info['pid'])
-            is_hovered = (i == self.hovered_wedge_index)
-            
-            alpha = 1.0 if is_selected or is_hovered else 0.7
-            edgecolor = 'yellow' if is_selected else None
-            linewidth = 1.5 if is_selected else 0
-            
-            wedge.set_alpha(alpha)
-            wedge.set_edgecolor(edgecolor)
-            wedge.set_linewidth(linewidth)
+        self.bar_chart.selected_pid = self.selected_pid
+        self.bar_chart.apply_styles()
 
     def update_info_panel(self, item_info):
-        self.info_panel.configure(state="normal"); self.info_panel.delete("1.0", "end")
-        if not item_info:
-            self.info_panel.insert("1.0", "Passe o mouse sobre um item para ver os detalhes.")
+        if not item_info or item_info['pid'] == self.db_manager.OTHERS_ID:
+            self.db_worker.cancel("painel_info")
+            self.info_panel.configure(state="normal"); self.info_panel.delete("1.0", "end")
+            self.info_panel.insert("1.0", "'Outros' soma os produtos fora dos maiores do período." if item_info else "Passe o mouse sobre um item para ver os detalhes.")
             self.info_panel.configure(state="disabled"); return
-        pid = item_info['pid']
-        financials = self.db_manager.get_product_financials(pid)
-        product_data = self.db_manager.get_product_by_id(pid)
-        if not financials or not product_data:
+        # Passar o mouse rápido por várias barras deixa só a última consulta chegar ao painel.
+        self.db_worker.submit(self._load_info_panel, item_info['pid'], on_done=self._show_info_panel, key="painel_info")
+
+    def _load_info_panel(self, pid):
+        # Nome, estoque e totais numa só consulta (antes eram os totais mais um get_product_by_id).
+        return self.db_manager.get_financials_for_products([pid]).get(pid)
+
+    def _show_info_panel(self, financials):
+        self.info_panel.configure(state="normal"); self.info_panel.delete("1.0", "end")
+        if not financials:
             self.info_panel.insert("1.0", "Não há dados financeiros para este produto.")
             self.info_panel.configure(state="disabled"); return
             
-        total_gasto = financials[0] or 0
-        total_vendido = financials[1] or 0
-        total_itens_vendidos = financials[2] or 0
-        estoque_atual = product_data[4]
+        _, nome, estoque_atual, total_gasto, total_vendido, total_itens_vendidos = financials
         lucro = total_vendido - total_gasto
         
-        self.info_panel.insert("end", f"Produto: {product_data[1]}\n", "header")
+        self.info_panel.insert("end", f"Produto: {nome}\n", "header")
         self.info_panel.insert("end", f"\nEstoque Atual: {estoque_atual}\n")
         self.info_panel.insert("end", f"Total de Itens Vendidos: {total_itens_vendidos}\n\n")
         self.info_panel.insert("end", f"Total Gasto (Custo): R$ {total_gasto:.2f}\n")
@@ -489,31 +407,15 @@ class DashboardTab(ctk.CTkFrame):
         self.info_panel.insert("end", f"Lucro Total: R$ {lucro:.2f}", lucro_tag)
         self.info_panel.configure(state="disabled")
 
-    def _plot_pie_chart(self):
-        self.ax_pie.clear()
-        self.pie_metadata.clear()
-        data = self.db_manager.get_total_sales_by_product()
-        if not data:
-            self.ax_pie.text(0.5, 0.5, 'Sem dados de vendas para exibir.', ha='center', va='center', transform=self.ax_pie.transAxes); return
-        
-        pids = [row[0] for row in data]
-        labels = [row[1] for row in data]
-        sizes = [row[2] for row in data]
-        
-        explode = [0.1 if pid == self.selected_pid else 0 for pid in pids]
-
-        wedges, texts, autotexts = self.ax_pie.pie(sizes, labels=labels, autopct='%1.1f%%',
-                                                   shadow=False, startangle=90, pctdistance=0.85,
-                                                   explode=explode)
-        
-        for i, wedge in enumerate(wedges):
-            self.pie_metadata.append({'wedge': wedge, 'pid': pids[i], 'name': labels[i]})
-
-        self.ax_pie.set_title("Composição de Vendas por Produto")
-        plt.setp(autotexts, size=8, weight="bold", path_effects=[path_effects.withStroke(linewidth=1.5, foreground='white')])
-        self.ax_pie.axis('equal')
-        self.fig_pie.tight_layout()
-        self.update_pie_visuals()
+    def _plot_pie_chart(self, data=None):
+        # Sem `data` (clique numa fatia) reposiciona as fatias já desenhadas com os dados carregados.
+        if data is not None: self.pie_data = data
+        data = self.pie_data
+        self.pie_chart.selected_pid = self.selected_pid
+        method, args = pie_call(data)
+        rebuilt = getattr(self.pie_chart, method)(*args)
+        self.pie_metadata = self.pie_chart.metadata
+        return rebuilt
 
     def update_theme(self, fig=None, ax=None):
         if fig is None or ax is None:
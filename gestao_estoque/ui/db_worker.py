@@ -0,0 +1,99 @@
+# ui/db_worker.py
+
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DbWorker:
+    """Executa consultas ao banco fora da thread do Tk e devolve o resultado por `after()`.
+
+    `submit(func, *args, on_done=..., key=...)` roda `func(*args)` num thread do executor;
+    `on_done(resultado)` (ou `on_error(exceção)`) é chamado depois, já na thread da interface.
+    Pedidos com a mesma `key` se substituem: um pedido ainda na fila é cancelado e o
+    resultado de um que já estava rodando é descartado, então só o mais recente chega à tela.
+    Tarefas demoradas (backup, exportações) vão com `long_running=True` para um executor
+    próprio de uma thread: ficam em fila entre si e não ocupam os workers das consultas
+    curtas, então as abas e o dashboard continuam respondendo durante um backup.
+    """
+    POLL_MS = 25
+
+    def __init__(self, widget, max_workers=2):
+        self.widget = widget
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._long_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-worker-longo")
+        self._results = queue.SimpleQueue()
+        self._tickets = itertools.count(1)
+        self._pending = {}  # key -> (ticket, future) do pedido mais recente
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._poll_id = None
+        self._closed = False
+
+    def submit(self, func, *args, on_done=None, on_error=None, key=None, long_running=False):
+        if self._closed: return None
+        ticket = next(self._tickets); previous = None
+        if key is not None:
+            with self._lock:
+                previous = self._pending.get(key)
+                self._pending[key] = (ticket, None)  # registrado antes de o worker poder começar
+        executor = self._long_executor if long_running else self._executor
+        future = executor.submit(self._run, ticket, key, func, args, on_done, on_error)
+        with self._lock:
+            if key is not None and self._pending.get(key, (None,))[0] == ticket:
+                self._pending[key] = (ticket, future)
+            self._inflight.add(future)
+        if previous and previous[1]: previous[1].cancel()
+        if self._poll_id is None: self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+        return ticket
+
+    def cancel(self, key):
+        """Descarta o pedido pendente de `key`, se houver."""
+        with self._lock:
+            previous = self._pending.pop(key, None)
+        if previous and previous[1]: previous[1].cancel()
+
+    def is_stale(self, key, ticket):
+        with self._lock:
+            current = self._pending.get(key)
+        return current is None or current[0] != ticket
+
+    def _run(self, ticket, key, func, args, on_done, on_error):
+        # Um pedido substituído enquanto esperava na fila nem chega a consultar o banco.
+        if key is not None and self.is_stale(key, ticket): return
+        try:
+            self._results.put((ticket, key, on_done, func(*args)))
+        except Exception as e:
+            self._results.put((ticket, key, on_error or self._report_error, e))
+
+    def _poll(self):
+        self._poll_id = None
+        if self._closed: return
+        while True:
+            try: ticket, key, callback, value = self._results.get_nowait()
+            except queue.Empty: break
+            if key is not None:
+                with self._lock:
+                    current = self._pending.get(key)
+                    if current is None or current[0] != ticket: continue
+                    del self._pending[key]
+            if callback: callback(value)
+        with self._lock:
+            self._inflight = {f for f in self._inflight if not f.done()}
+            busy = bool(self._inflight)
+        if busy or not self._results.empty():
+            self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+
+    @staticmethod
+    def _report_error(error):
+        print(f"Erro em consulta em segundo plano: {error}")
+
+    def shutdown(self):
+        self._closed = True
+        if self._poll_id is not None:
+            try: self.widget.after_cancel(self._poll_id)
+            except Exception: pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._long_executor.shutdown(wait=False, cancel_futures=True)
@@ -4,16 +4,22 @@ import customtkinter as ctk
 from tkinter import ttk, messagebox, filedialog
 import collections
 from ui.dashboard_tab import DashboardTab
+from ui.db_worker import DbWorker
+from ui.progress_dialog import ProgressDialog
+from ui.scan_cart import ScanCart, ScanDeduplicator
+from database.csv_export import CsvExport
+from database.backup import BackupManager
+from database.product_lookup import ProductLookup
 import re
 import csv
 import os
 from datetime import datetime
+import queue
 import threading
+import time
 import unicodedata
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+# requests e smtplib/email são importados só quando usados (busca no OpenFoodFacts e
+# envio de e-mail); ui.preload os adianta em segundo plano durante o login.
 
 # --- NOVA CLASSE PARA ENVIO DE E-MAIL ---
 class EmailSender:
@@ -41,6 +47,9 @@ class EmailSender:
 
     def _send_email(self, recipient_email, subject, body):
         try:
+            import smtplib
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
             message = MIMEMultipart()
             message["From"] = self.sender_email
             message["To"] = recipient_email
@@ -168,6 +177,75 @@ class HistoryWindow(ctk.CTkToplevel):
         else:
             tabview.set("Compras")
 
+class PagedTreeview:
+    """Mostra um histórico longo num Treeview carregando páginas (keyset) conforme a rolagem.
+
+    Só `max_pages` páginas ficam inseridas no Treeview por vez: ao chegar perto do fim
+    carrega a página seguinte e descarta a do topo, e vice-versa. `fetch_page(cursor, limit,
+    newer=False)` segue o contrato de DatabaseManager.get_movements_page.
+    """
+    def __init__(self, tree, scrollbar, fetch_page, cursor_of, page_size=200, max_pages=3):
+        self.tree = tree; self.scrollbar = scrollbar
+        self.fetch_page = fetch_page; self.cursor_of = cursor_of
+        self.page_size = page_size; self.max_pages = max_pages
+        self.pages = collections.deque()
+        self.has_older = False; self.has_newer = False; self._loading = False
+        tree.configure(yscrollcommand=self._on_yscroll)
+
+    def reset(self):
+        self.tree.delete(*self.tree.get_children()); self.pages.clear()
+        rows = self.fetch_page(None, self.page_size)
+        if rows: self.pages.append(self._insert(rows, "end"))
+        self.has_older = len(rows) == self.page_size; self.has_newer = False
+        self.tree.yview_moveto(0)
+
+    def _insert(self, rows, index):
+        iids = [self.tree.insert("", index if index == "end" else index + i, values=row) for i, row in enumerate(rows)]
+        return {'iids': iids, 'first': self.cursor_of(rows[0]), 'last': self.cursor_of(rows[-1])}
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._loading or not self.pages: return
+        if float(last) > 0.9 and self.has_older:
+            self._loading = True; self.tree.after_idle(self._load_older)
+        elif float(first) < 0.1 and self.has_newer:
+            self._loading = True; self.tree.after_idle(self._load_newer)
+
+    def _top_visible(self):
+        children = self.tree.get_children()
+        if not children: return None
+        return children[min(int(float(self.tree.yview()[0]) * len(children)), len(children) - 1)]
+
+    def _restore(self, anchor):
+        children = self.tree.get_children()
+        if anchor and children: self.tree.yview_moveto(self.tree.index(anchor) / len(children))
+
+    def _load_older(self):
+        try:
+            rows = self.fetch_page(self.pages[-1]['last'], self.page_size)
+            self.has_older = len(rows) == self.page_size
+            if not rows: return
+            anchor = self._top_visible()
+            self.pages.append(self._insert(rows, "end"))
+            if len(self.pages) > self.max_pages:
+                self.tree.delete(*self.pages.popleft()['iids']); self.has_newer = True
+                self._restore(anchor)
+        finally:
+            self._loading = False
+
+    def _load_newer(self):
+        try:
+            rows = self.fetch_page(self.pages[0]['first'], self.page_size, newer=True)
+            self.has_newer = len(rows) == self.page_size
+            if not rows: return
+            anchor = self._top_visible()
+            self.pages.appendleft(self._insert(rows, 0))
+            if len(self.pages) > self.max_pages:
+                self.tree.delete(*self.pages.pop()['iids']); self.has_older = True
+            self._restore(anchor)
+        finally:
+            self._loading = False
+
 class ExportDialog(ctk.CTkToplevel):
     def __init__(self, parent, on_export_callback):
         super().__init__(parent)
@@ -257,103 +335,230 @@ class AddProductFromSKU(ctk.CTkToplevel):
 
 
 class ScannerWindow(ctk.CTkToplevel):
-    def __init__(self, parent, on_detect):
+    # A prévia é atualizada no ritmo da câmera; a captura e a decodificação rodam em
+    # threads do BarcodeScanner e esta janela só desenha o quadro mais recente.
+    PREVIEW_SIZE = (600, 420)
+    POLL_MS = 15
+    STATS_MS = 1000
+
+    def __init__(self, parent, on_detect, source=None):
         super().__init__(parent)
-        self.on_detect = on_detect; self.title("Scanner de Código de Barras"); self.geometry("640x520")
+        self.on_detect = on_detect; self.title("Scanner de Código de Barras"); self.geometry("640x540")
         self.transient(parent); self.grab_set()
         self.grid_rowconfigure(0, weight=1); self.grid_columnconfigure(0, weight=1)
         self.preview_label = ctk.CTkLabel(self, text="")
         self.preview_label.grid(row=0, column=0, padx=10, pady=10)
         self.info_label = ctk.CTkLabel(self, text="Aguardando leitura...")
-        self.info_label.grid(row=1, column=0, pady=(0,10))
-        self._cap = None; self._running = False
+        self.info_label.grid(row=1, column=0, pady=(0,2))
+        self.stats_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=11), text_color="gray")
+        self.stats_label.grid(row=2, column=0, pady=(0,8))
+        self.scanner = None; self._running = False
         try:
             import cv2
-            from pyzbar import pyzbar
+            import numpy as np
             from PIL import Image, ImageTk
-            self._cv2 = cv2; self._pyzbar = pyzbar; self._Image = Image; self._ImageTk = ImageTk
+            from ui.barcode_scanner import BarcodeScanner, ROI, roi_bounds
+            self._cv2 = cv2; self._Image = Image
         except Exception as e:
             messagebox.showerror("Dependência ausente", f"Bibliotecas necessárias não encontradas:\n{e}\nInstale opencv-python, pyzbar e Pillow.", parent=self)
             self.destroy(); return
 
         try:
-            self._cap = self._cv2.VideoCapture(0, cv2.CAP_DSHOW)
+            # `source` (FileFrameSource) substitui a câmera no modo de teste com arquivos.
+            cap = source or cv2.VideoCapture(0, cv2.CAP_DSHOW)
+            if not cap.isOpened(): cap = cv2.VideoCapture(0)
         except Exception:
-            try:
-                self._cap = self._cv2.VideoCapture(0)
-            except Exception:
-                messagebox.showerror("Erro", "Não foi possível acessar a câmera.", parent=self); self.destroy(); return
-
+            messagebox.showerror("Erro", "Não foi possível acessar a câmera.", parent=self); self.destroy(); return
+
+        # Buffers da prévia alocados uma vez: cada quadro é reduzido e convertido dentro
+        # deles, e o PhotoImage recebe os pixels com paste() em vez de ser recriado.
+        w, h = self.PREVIEW_SIZE
+        self._small = np.empty((h, w, 3), dtype=np.uint8); self._rgb = np.empty((h, w, 3), dtype=np.uint8)
+        self._target = roi_bounds(w, h, ROI)
+        self._photo = ImageTk.PhotoImage("RGB", self.PREVIEW_SIZE)
+        self.preview_label.configure(image=self._photo)
+        self._shown_frame = 0; self._preview_times = collections.deque(maxlen=60)
+
+        self.scanner = BarcodeScanner(cap).start()
         self._running = True
-        self.after(30, self._update_frame)
+        self.after(self.POLL_MS, self._update_frame)
+        self.after(self.STATS_MS, self._update_stats)
         self.protocol("WM_DELETE_WINDOW", self._close)
 
+    def _on_code(self, code):
+        self.info_label.configure(text=f"Detectado: {code}")
+        self._close()
+        try:
+            self.on_detect(code)
+        except Exception as e:
+            print(f"Erro no callback do scanner: {e}")
+
     def _update_frame(self):
-        if not self._running or not self._cap: return
-        ret, frame = self._cap.read()
-        if not ret:
+        if not self._running: return
+        while self._running:
+            try: code, _ = self.scanner.results.get_nowait()
+            except queue.Empty: break
+            self._on_code(code.strip())
+        if not self._running: return
+
+        number, frame = self.scanner.latest_frame()
+        if frame is not None and number != self._shown_frame:
+            self._shown_frame = number
+            cv2 = self._cv2
+            cv2.resize(frame, self.PREVIEW_SIZE, dst=self._small, interpolation=cv2.INTER_NEAREST)
+            x1, y1, x2, y2 = self._target
+            cv2.rectangle(self._small, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.cvtColor(self._small, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            self._photo.paste(self._Image.fromarray(self._rgb))
+            self._preview_times.append(time.perf_counter())
+        elif self.scanner.read_errors and not self.scanner.frames:
             self.info_label.configure(text="Erro ao ler câmera")
-            self.after(200, self._update_frame); return
-
-        h, w, _ = frame.shape
-        x1, y1 = int(w * 0.15), int(h * 0.3)
-        x2, y2 = int(w * 0.85), int(h * 0.7)
-        self._cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-        barcodes = self._pyzbar.decode(frame)
-        if barcodes:
-            code = barcodes[0].data.decode('utf-8')
-            self.info_label.configure(text=f"Detectado: {code}")
-            try:
-                self.on_detect(code)
-            except Exception as e:
-                print(f"Erro no callback do scanner: {e}")
-            self._close(); return
-
-        rgb = self._cv2.cvtColor(frame, self._cv2.COLOR_BGR2RGB)
-        img = self._Image.fromarray(rgb)
-        img = img.resize((600, 420))
-        photo = self._ImageTk.PhotoImage(img)
-        self.preview_label.image = photo
-        self.preview_label.configure(image=photo)
-        self.after(30, self._update_frame)
+        elif not self.scanner.running and self.scanner.results.empty():
+            self.info_label.configure(text="Fim do arquivo de teste"); return
+        self.after(self.POLL_MS, self._update_frame)
+
+    def _update_stats(self):
+        if not self._running: return
+        stats = self.scanner.stats(); times = self._preview_times
+        preview_fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        self.stats_label.configure(text=f"câmera {stats['capture_fps']:.0f} fps · prévia {preview_fps:.0f} fps · "
+                                        f"decodificação {stats['decode_fps']:.0f} fps ({stats['decode_ms']:.0f} ms) · "
+                                        f"latência {stats['latency_ms']:.0f} ms · descartados {stats['dropped']}")
+        if self.scanner.running: self.after(self.STATS_MS, self._update_stats)
 
     def _close(self):
         self._running = False
-        try:
-            if self._cap: self._cap.release()
-        except Exception: pass
+        if self.scanner: self.scanner.stop()
         try: self.destroy()
         except Exception: pass
 
-def fetch_openfoodfacts_product(code):
-    def _try_code(c):
+
+class ContinuousScannerWindow(ScannerWindow):
+    # Recebimento/expedição de vários itens: a câmera fica aberta, cada código aceito pelo
+    # ScanDeduplicator soma uma unidade no carrinho e "Registrar Carrinho" grava tudo numa
+    # única transação (add_movements_batch) em vez de uma movimentação por leitura.
+    def __init__(self, parent, db_manager, user_id, on_committed=None, source=None, dedupe_window=1.0):
+        super().__init__(parent, None, source)
+        if not self._running: return
+        self.db_manager = db_manager; self.user_id = user_id; self.on_committed = on_committed
+        self.title("Scanner Contínuo"); self.geometry("1200x560"); self.grid_columnconfigure(1, weight=1)
+        self.dedup = ScanDeduplicator(dedupe_window); self.cart = ScanCart(db_manager)
+        self.origin_dest_map = {}
+
+        panel = ctk.CTkFrame(self); panel.grid(row=0, column=1, rowspan=3, padx=(0,10), pady=10, sticky="nsew")
+        panel.grid_rowconfigure(1, weight=1); panel.grid_columnconfigure(0, weight=1)
+        top = ctk.CTkFrame(panel, fg_color="transparent"); top.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
+        self.type_selector = ctk.CTkSegmentedButton(top, values=["Entrada", "Saida"], command=self._on_type_change)
+        self.type_selector.set("Entrada"); self.type_selector.pack(side="left", padx=5)
+        self.origin_dest_label = ctk.CTkLabel(top, text="Fornecedor:"); self.origin_dest_label.pack(side="left", padx=(15,0))
+        self.origin_dest_combo = ctk.CTkComboBox(top, values=[], width=220); self.origin_dest_combo.pack(side="left", padx=5)
+        columns = ["Código", "Produto", "Qtd", "Preço Unit.", "Situação"]; widths = [120, 180, 50, 90, 160]
+        self.cart_tree = ttk.Treeview(panel, columns=columns, show="headings", selectmode="browse")
+        for col, width in zip(columns, widths): self.cart_tree.heading(col, text=col); self.cart_tree.column(col, width=width, anchor="w" if col in ("Produto", "Situação") else "center")
+        self.cart_tree.grid(row=1, column=0, sticky="nsew", padx=5)
+        self.cart_tree.bind("<Double-1>", lambda e: self._edit_price())
+        buttons = ctk.CTkFrame(panel, fg_color="transparent"); buttons.grid(row=2, column=0, sticky="ew", padx=5, pady=5)
+        for text, command in (("+1", lambda: self._change_quantity(1)), ("-1", lambda: self._change_quantity(-1)),
+                              ("Preço...", self._edit_price), ("Remover", self._remove_line), ("Limpar", self._clear_cart)):
+            ctk.CTkButton(buttons, text=text, width=70, command=command).pack(side="left", padx=3)
+        self.total_label = ctk.CTkLabel(panel, text="Carrinho vazio", justify="left", anchor="w")
+        self.total_label.grid(row=3, column=0, sticky="ew", padx=8)
+        ctk.CTkButton(panel, text="Registrar Carrinho", command=self._commit).grid(row=4, column=0, pady=10)
+        self.info_label.configure(text="Passe os itens na frente da câmera, um de cada vez")
+        self.protocol("WM_DELETE_WINDOW", self._ask_close)
+        self._load_origin_dest()
+
+    def _load_origin_dest(self):
+        entrada = self.cart.tipo == "entrada"
+        self.origin_dest_label.configure(text="Fornecedor:" if entrada else "Cliente:")
+        fetch = self.db_manager.get_all_suppliers if entrada else self.db_manager.get_all_clients
+        def fill(rows):
+            if not self.winfo_exists(): return
+            self.origin_dest_map = {"(nenhum)": None, **{f"{r[0]} - {r[1]}": r[0] for r in rows}}
+            self.origin_dest_combo.configure(values=list(self.origin_dest_map)); self.origin_dest_combo.set("(nenhum)")
+        self.master.db_worker.submit(fetch, on_done=fill, key="scanner_origem_destino")
+
+    def _on_type_change(self, value):
+        self.cart.set_type(value.lower()); self._load_origin_dest(); self._refresh_cart()
+
+    def _on_code(self, code):
+        if not self.dedup.accept(code): return
+        line = self.cart.add(code)
+        if line is None:
+            self.info_label.configure(text=f"Código {code} não cadastrado: fica fora do carrinho")
+        else:
+            self.info_label.configure(text=f"+1 {line['name']} ({line['qty']} no carrinho)"); self.bell()
+        self._refresh_cart()
+
+    def _refresh_cart(self):
+        selected = self.cart_tree.selection()
+        self.cart_tree.delete(*self.cart_tree.get_children())
+        for pid, line in self.cart.lines.items():
+            price = f"R$ {line['price']:.2f}" if line['price'] is not None else "informar"
+            self.cart_tree.insert("", "end", iid=str(pid), values=(line['code'], line['name'], line['qty'], price, line['error'] or ""))
+        if selected and self.cart_tree.exists(selected[0]): self.cart_tree.selection_set(selected[0])
+        text = (f"{len(self.cart.lines)} produto(s), {self.cart.units} unidade(s) · Total R$ {self.cart.total:.2f}"
+                if self.cart.lines else "Carrinho vazio")
+        if self.cart.unknown:
+            text += f"\nNão cadastrados ({sum(self.cart.unknown.values())} leitura(s)): " + ", ".join(self.cart.unknown)
+        self.total_label.configure(text=text)
+
+    def _selected_product(self):
+        selection = self.cart_tree.selection()
+        if not selection:
+            messagebox.showwarning("Aviso", "Selecione um item do carrinho.", parent=self); return None
+        return int(selection[0])
+
+    def _change_quantity(self, delta):
+        pid = self._selected_product()
+        if pid is None: return
+        self.cart.set_quantity(pid, self.cart.lines[pid]['qty'] + delta); self._refresh_cart()
+
+    def _edit_price(self):
+        pid = self._selected_product()
+        if pid is None: return
+        value = ctk.CTkInputDialog(text=f"Preço unitário de '{self.cart.lines[pid]['name']}' (R$):", title="Preço Unitário").get_input()
+        if value is None: return
         try:
-            url = f"https://world.openfoodfacts.org/api/v0/product/{c}.json"
-            resp = requests.get(url, timeout=6)
-            if resp.status_code != 200: return None
-            data = resp.json()
-            return data.get('product', {}) if data.get('status') == 1 else None
-        except Exception:
-            return None
-
-    orig = str(code or '').strip()
-    digits = re.sub(r'\D', '', orig)
-    candidates = []
-    if digits:
-        candidates.append(digits)
-        if len(digits) == 12: candidates.append('0' + digits)
-        if len(digits) == 13 and digits.startswith('0'): candidates.append(digits[1:])
-        if len(digits) < 12: candidates.append(digits.zfill(12)); candidates.append(digits.zfill(13))
-    if orig not in candidates: candidates.insert(0, orig)
-
-    tried = set()
-    for c in candidates:
-        if not c or c in tried: continue
-        tried.add(c)
-        prod = _try_code(c)
-        if prod: return prod
-    return None
+            price = float(value.replace(',', '.'))
+            if price < 0: raise ValueError()
+        except ValueError:
+            messagebox.showerror("Erro de Formato", "Preço Unitário deve ser um número válido e não negativo.", parent=self); return
+        self.cart.set_price(pid, price); self._refresh_cart()
+
+    def _remove_line(self):
+        pid = self._selected_product()
+        if pid is None: return
+        self.cart.remove(pid); self._refresh_cart()
+
+    def _clear_cart(self):
+        if self.cart.lines and not messagebox.askyesno("Limpar Carrinho", "Descartar todos os itens lidos?", parent=self): return
+        self.cart.clear(); self._refresh_cart()
+
+    def _commit(self):
+        cart = self.cart
+        if not cart.lines:
+            messagebox.showinfo("Carrinho Vazio", "Nenhum item lido para registrar.", parent=self); return
+        sem_preco = [line['name'] for line in cart.lines.values() if line['price'] is None]
+        if sem_preco:
+            messagebox.showerror("Preço Obrigatório", "Informe o preço unitário de:\n" + "\n".join(sem_preco), parent=self); return
+        if not messagebox.askyesno("Confirmar Carrinho", f"Registrar uma '{cart.tipo.upper()}' de {cart.units} unidade(s) em {len(cart.lines)} "
+                                                          f"produto(s), total R$ {cart.total:.2f}?", parent=self): return
+        origin_dest_id = self.origin_dest_map.get(self.origin_dest_combo.get())
+        id_cliente, id_fornecedor = (None, origin_dest_id) if cart.tipo == "entrada" else (origin_dest_id, None)
+        saved, refused = cart.commit(self.user_id, id_cliente, id_fornecedor)
+        self._refresh_cart()
+        if refused:
+            messagebox.showwarning("Carrinho Registrado em Parte", f"{saved} produto(s) registrado(s); {refused} recusado(s) "
+                                                                  "continuam no carrinho com o motivo na coluna Situação.", parent=self)
+        else:
+            self.info_label.configure(text=f"Carrinho registrado: {saved} produto(s)")
+        if saved and self.on_committed: self.on_committed()
+
+    def _ask_close(self):
+        if self.cart.lines and not messagebox.askyesno("Fechar Scanner", "O carrinho tem itens não registrados. Fechar mesmo assim?", parent=self): return
+        self._close()
+
 
 def deduce_category_from_name(name):
     name_l = (name or '').lower()
@@ -393,9 +598,19 @@ def generate_sku_from_off(product):
     return sku, {'name': name, 'brand': brand, 'quantity': product.get('quantity'), 'category': category, 'variation': variation}
 
 class MainAppWindow(ctk.CTk):
-    def __init__(self, db_manager, user_id, config):
+    # Nível mínimo (level_hierarchy) para ver cada aba; as demais nem são criadas.
+    TAB_MIN_LEVEL = {"Dashboard": 1, "Produtos": 2, "Clientes": 2, "Fornecedores": 2, "Movimentações": 1, "Usuários": 3, "Notificações": 2}
+    # O agendador confere a idade do último backup periodicamente (e não uma vez a cada
+    # backup_interval_hours), então um computador que hibernou faz o backup logo ao voltar.
+    BACKUP_FIRST_CHECK_MS = 60 * 1000
+    BACKUP_CHECK_MS = 30 * 60 * 1000
+
+    def __init__(self, db_manager, user_id, config, started_at=None):
         super().__init__()
         self.db_manager = db_manager; self.current_user_id = user_id; self.config = config
+        # Momento (time.perf_counter) do login bem-sucedido, para o relatório de inicialização.
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.startup_timings = {}
         self.current_user_data = self.db_manager.get_user_by_id(self.current_user_id)
         self.current_user_level = self.current_user_data[3]
         self.level_hierarchy = {'Administrador': 3, 'Supervisor': 2, 'Operador': 1}
@@ -404,6 +619,8 @@ class MainAppWindow(ctk.CTk):
         
         # --- INICIALIZA O ENVIADOR DE E-MAIL ---
         self.email_sender = EmailSender(self.config)
+        # Consultas de carga das abas e do dashboard rodam fora do mainloop.
+        self.db_worker = DbWorker(self)
 
         menu_frame = ctk.CTkFrame(self, width=180, corner_radius=0); menu_frame.grid(row=0, column=0, sticky="nsw")
         ctk.CTkLabel(menu_frame, text="Menu", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=20)
@@ -411,8 +628,12 @@ class MainAppWindow(ctk.CTk):
         self.notifications_button.pack(pady=10, padx=20)
         self.export_button = ctk.CTkButton(menu_frame, text="Exportar Dados", command=self.open_export_dialog)
         self.export_button.pack(pady=10, padx=20)
+        self.backup_button = ctk.CTkButton(menu_frame, text="Backup Agora", command=self.run_backup_now)
+        self.backup_button.pack(pady=10, padx=20)
         self.scanner_button = ctk.CTkButton(menu_frame, text="Scanner (Câmera)", command=self.open_scanner)
         self.scanner_button.pack(pady=10, padx=20)
+        self.continuous_scanner_button = ctk.CTkButton(menu_frame, text="Scanner Contínuo", command=self.open_continuous_scanner)
+        self.continuous_scanner_button.pack(pady=10, padx=20)
         self.theme_switch = ctk.CTkSwitch(menu_frame, text="Tema Escuro", command=self.toggle_theme)
         self.theme_switch.pack(pady=(20,10), padx=20)
         if self.config.get('Settings', 'default_theme', fallback='dark') == 'dark': self.theme_switch.select()
@@ -420,51 +641,103 @@ class MainAppWindow(ctk.CTk):
         self.tab_view = ctk.CTkTabview(self, corner_radius=8, command=self.on_tab_change); self.tab_view.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
         self.tabs = {}
         self.notification_widgets = {}
+        self._pending_product_select = None
         
-        self.create_dashboard_tab()
-        self.create_tab("Produtos", ["ID", "Nome", "SKU", "Descrição", "Qtd em Estoque"], [40, 250, 120, 300, 100], self.db_manager.get_all_products, self.open_product_form, self.open_product_form, self.delete_product)
-        self.create_tab("Clientes", ["ID", "Nome", "CPF/CNPJ", "Telefone", "Email"], [50, 200, 150, 120, 200], self.db_manager.get_all_clients, self.open_client_form, self.open_client_form, self.delete_client)
-        self.create_tab("Fornecedores", ["ID", "Nome", "Contato", "Endereço"], [50, 200, 150, 300], self.db_manager.get_all_suppliers, self.open_supplier_form, self.open_supplier_form, self.delete_supplier)
-        self.create_movement_tab()
-        self.create_tab("Usuários", ["ID", "Usuário", "Nível de Acesso", "E-mail"], [50, 200, 150, 250], self.db_manager.get_all_users, self.open_user_form, self.open_user_form, self.delete_user)
-        self.create_notifications_tab()
+        # As abas começam vazias: cada uma é montada (e carrega seus dados) na primeira vez
+        # em que aparece. Abas que o nível do usuário não permite ver nem são adicionadas.
+        self.tab_builders = {
+            "Dashboard": self.create_dashboard_tab,
+            "Produtos": lambda: self.create_tab("Produtos", ["ID", "Nome", "SKU", "Descrição", "Qtd em Estoque"], [40, 250, 120, 300, 100], self.db_manager.get_all_products, self.open_product_form, self.open_product_form, self.delete_product, search_func=self.db_manager.search_products),
+            "Clientes": lambda: self.create_tab("Clientes", ["ID", "Nome", "CPF/CNPJ", "Telefone", "Email"], [50, 200, 150, 120, 200], self.db_manager.get_all_clients, self.open_client_form, self.open_client_form, self.delete_client, search_func=self.db_manager.search_clients),
+            "Fornecedores": lambda: self.create_tab("Fornecedores", ["ID", "Nome", "Contato", "Endereço"], [50, 200, 150, 300], self.db_manager.get_all_suppliers, self.open_supplier_form, self.open_supplier_form, self.delete_supplier, search_func=self.db_manager.search_suppliers),
+            "Movimentações": self.create_movement_tab,
+            "Usuários": lambda: self.create_tab("Usuários", ["ID", "Usuário", "Nível de Acesso", "E-mail"], [50, 200, 150, 250], self.db_manager.get_all_users, self.open_user_form, self.open_user_form, self.delete_user),
+            "Notificações": self.create_notifications_tab,
+        }
+        user_level = self.level_hierarchy.get(self.current_user_level, 1)
+        for tab_name in self.tab_builders:
+            if user_level >= self.TAB_MIN_LEVEL[tab_name]: self.tab_view.add(tab_name)
+        self.built_tabs = set()
         
         self.setup_styles(); self.toggle_theme()
+        self.ensure_tab_built("Dashboard")
         self.after(100, self.dashboard_tab_instance.update_graph)
         self.apply_permissions()
-        self.check_inactivity_notifications()
-        self.update_notifications_button()
+        if user_level >= self.TAB_MIN_LEVEL["Notificações"]:
+            self.after_idle(self.check_inactivity_notifications)
+            self.update_notifications_button()
+        self.backup_manager = BackupManager(
+            self.db_manager.db_path, self.config.get('Settings', 'backup_path', fallback='./backups'),
+            keep=self.config.getint('Settings', 'backup_keep', fallback=7),
+            compress=self.config.getboolean('Settings', 'backup_compress', fallback=True))
+        self.product_lookup = ProductLookup.from_config(self.db_manager, self.config)
+        self.backup_interval_hours = self.config.getfloat('Settings', 'backup_interval_hours', fallback=24)
+        self._backup_after_id = self.after(self.BACKUP_FIRST_CHECK_MS, self._check_scheduled_backup) if self.backup_interval_hours > 0 else None
+        self.startup_timings["janela construída"] = (time.perf_counter() - self.started_at) * 1000
+        self.after(0, lambda: self.after_idle(self._report_startup_time))
+
+    def destroy(self):
+        if getattr(self, 'csv_export', None): self.csv_export.cancel()  # não deixa arquivo pela metade
+        if getattr(getattr(self, 'dashboard_tab_instance', None), 'pdf_report', None): self.dashboard_tab_instance.pdf_report.cancel()
+        if getattr(self, 'backup_manager', None): self.backup_manager.cancel()
+        if getattr(self, '_backup_after_id', None): self.after_cancel(self._backup_after_id)
+        self.db_worker.shutdown()
+        super().destroy()
+
+    def _report_startup_time(self):
+        # Chamado no primeiro ciclo ocioso do mainloop: a janela já foi desenhada e responde.
+        total_ms = (time.perf_counter() - self.started_at) * 1000
+        details = ", ".join(f"{step} {ms:.0f} ms" for step, ms in self.startup_timings.items())
+        print(f"[inicialização] Login até a janela interativa: {total_ms:.0f} ms ({details})")
+        log_path = self.config.get('Settings', 'startup_log', fallback='')
+        if log_path:
+            try:
+                new_file = not os.path.exists(log_path)
+                with open(log_path, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    if new_file: writer.writerow(["data_hora", "nivel_acesso", "total_ms", "etapas"])
+                    writer.writerow([datetime.now().strftime('%Y-%m-%d %H:%M:%S'), self.current_user_level, f"{total_ms:.0f}", details])
+            except OSError as e:
+                print(f"Não foi possível gravar o relatório de inicialização: {e}")
+
+    def ensure_tab_built(self, name):
+        if name in self.built_tabs or name not in self.tab_builders: return
+        if self.level_hierarchy.get(self.current_user_level, 1) < self.TAB_MIN_LEVEL[name]: return
+        started = time.perf_counter()
+        self.built_tabs.add(name)
+        self.tab_builders[name]()
+        self.apply_tab_permissions(name)
+        self.startup_timings.setdefault(f"aba {name}", (time.perf_counter() - started) * 1000)
 
     def apply_permissions(self):
         level = self.current_user_level
         self.on_tab_change()
         if level == 'Operador':
-            for tab_name in ["Produtos", "Clientes", "Fornecedores", "Usuários", "Notificações"]:
-                try: self.tab_view.delete(tab_name)
-                except Exception: pass
             self.notifications_button.pack_forget()
             self.export_button.pack_forget()
-        if level == 'Supervisor':
-            try: self.tab_view.delete("Usuários")
-            except Exception: pass
-            if "Produtos" in self.tabs:
-                product_tab_controls = self.tabs["Produtos"]['frame'].winfo_children()[0]
-                for button in product_tab_controls.winfo_children():
-                    if "Excluir" in button.cget("text"): button.configure(state="disabled")
-        if level != 'Administrador' and hasattr(self, 'reverse_mov_button'):
+        if level != 'Administrador':
+            self.backup_button.pack_forget()
+
+    def apply_tab_permissions(self, name):
+        level = self.current_user_level
+        if name == "Produtos" and level == 'Supervisor':
+            for button in self.tabs["Produtos"]['controls'].winfo_children():
+                if "Excluir" in button.cget("text"): button.configure(state="disabled")
+        if name == "Movimentações" and level != 'Administrador':
             self.reverse_mov_button.pack_forget()
 
     def on_tab_change(self):
         current_tab = self.tab_view.get()
+        self.ensure_tab_built(current_tab)
         notif_button = self.tab_view._segmented_button._buttons_dict.get("Notificações")
         if notif_button:
             if current_tab != "Notificações":
                 notif_button.grid_forget()
 
     def create_dashboard_tab(self):
-        dashboard_frame = self.tab_view.add("Dashboard"); self.dashboard_tab_instance = DashboardTab(parent=dashboard_frame, db_manager=self.db_manager, main_app=self); self.dashboard_tab_instance.pack(fill="both", expand=True)
-    def create_tab(self, name, columns, widths, fetch_func, add_cmd, edit_cmd, del_cmd):
-        tab = self.tab_view.add(name); tab.grid_rowconfigure(2, weight=1); tab.grid_columnconfigure(0, weight=1)
+        dashboard_frame = self.tab_view.tab("Dashboard"); self.dashboard_tab_instance = DashboardTab(parent=dashboard_frame, db_manager=self.db_manager, main_app=self); self.dashboard_tab_instance.pack(fill="both", expand=True)
+    def create_tab(self, name, columns, widths, fetch_func, add_cmd, edit_cmd, del_cmd, search_func=None):
+        tab = self.tab_view.tab(name); tab.grid_rowconfigure(2, weight=1); tab.grid_columnconfigure(0, weight=1)
         
         search_frame = ctk.CTkFrame(tab); search_frame.grid(row=0, column=0, sticky="ew", pady=(0, 5))
         ctk.CTkLabel(search_frame, text="Buscar:").pack(side="left", padx=10)
@@ -491,26 +764,43 @@ class MainAppWindow(ctk.CTk):
         tree.configure(yscrollcommand=scrollbar.set)
         
         all_items = []
+        pending_search = {'after_id': None}
         
         def update_search(*args):
-            search_term = search_entry.get().lower()
+            pending_search['after_id'] = None
+            search_term = search_entry.get().strip()
+            if search_func and search_term:
+                # Busca indexada (FTS5) no banco, já ordenada por relevância e limitada.
+                def show_results(rows):
+                    tree.delete(*tree.get_children())
+                    for item in rows: tree.insert("", "end", values=item)
+                self.db_worker.submit(search_func, search_term, on_done=show_results, key=f"busca:{name}")
+                return
+            self.db_worker.cancel(f"busca:{name}")
             tree.delete(*tree.get_children())
+            search_term = search_term.lower()
             for item in all_items:
                 if any(str(value).lower().find(search_term) >= 0 for value in item):
                     tree.insert("", "end", values=item)
         
-        search_entry.bind("<KeyRelease>", update_search)
+        def schedule_search(*args):
+            # Debounce: só consulta quando a digitação para por um instante.
+            if pending_search['after_id']: tab.after_cancel(pending_search['after_id'])
+            pending_search['after_id'] = tab.after(250, update_search)
+        
+        search_entry.bind("<KeyRelease>", schedule_search)
         
         def refresh_with_search():
-            all_items.clear()
-            all_items.extend(fetch_func())
-            update_search()
+            def show(rows):
+                all_items[:] = rows
+                update_search()
+            self.db_worker.submit(fetch_func, on_done=show, key=f"aba:{name}")
             
-        self.tabs[name] = {'frame': tab, 'fetch': fetch_func, 'tree': tree, 'refresh': refresh_with_search, 'search_entry': search_entry, 'all_items': all_items}
+        self.tabs[name] = {'frame': tab, 'fetch': fetch_func, 'tree': tree, 'refresh': refresh_with_search, 'search_entry': search_entry, 'all_items': all_items, 'controls': controls_frame}
         refresh_with_search()
     
     def create_movement_tab(self):
-        name = "Movimentações"; tab = self.tab_view.add(name); tab.grid_rowconfigure(1, weight=1); tab.grid_columnconfigure(0, weight=1)
+        name = "Movimentações"; tab = self.tab_view.tab(name); tab.grid_rowconfigure(1, weight=1); tab.grid_columnconfigure(0, weight=1)
         top_frame = ctk.CTkFrame(tab); top_frame.grid(row=0, column=0, sticky="ew")
         row1_frame = ctk.CTkFrame(top_frame, fg_color="transparent"); row1_frame.pack(fill="x", padx=5, pady=2)
         ctk.CTkLabel(row1_frame, text="Produto:", width=60).pack(side="left", padx=(5,0)); self.mov_prod_combo = ctk.CTkComboBox(row1_frame, values=[], width=200); self.mov_prod_combo.pack(side="left", padx=5)
@@ -528,20 +818,22 @@ class MainAppWindow(ctk.CTk):
         tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
         for col, width in zip(columns, widths): tree.heading(col, text=col); tree.column(col, width=width, anchor="center")
         tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ctk.CTkScrollbar(tree_frame, command=tree.yview); scrollbar.grid(row=0, column=1, sticky="ns")
         
-        def refresh_mov_tab():
-            tree.delete(*tree.get_children())
-            for row in self.db_manager.get_all_movements():
-                tree.insert("", "end", values=row)
+        # Só as páginas próximas da posição de rolagem ficam no Treeview; atualizar a aba
+        # custa uma página, independentemente do tamanho do histórico.
+        pager = PagedTreeview(tree, scrollbar, self.db_manager.get_movements_page, self.db_manager.movement_cursor)
+        refresh_mov_tab = pager.reset
 
-        self.tabs[name] = {'frame': tab, 'fetch': self.db_manager.get_all_movements, 'tree': tree, 'refresh': refresh_mov_tab}
+        self.tabs[name] = {'frame': tab, 'fetch': self.db_manager.get_movements_page, 'tree': tree, 'refresh': refresh_mov_tab, 'pager': pager}
+        self.product_map = {}; self.origin_dest_map = {}; self._product_list_generation = None
         
         refresh_mov_tab()
-        self.update_movement_product_list()
+        self.update_movement_product_list(select=self._pending_product_select)
         self.update_origin_dest_list()
 
     def create_notifications_tab(self):
-        name = "Notificações"; tab = self.tab_view.add(name); tab.grid_rowconfigure(1, weight=1); tab.grid_columnconfigure(0, weight=1)
+        name = "Notificações"; tab = self.tab_view.tab(name); tab.grid_rowconfigure(1, weight=1); tab.grid_columnconfigure(0, weight=1)
         controls_frame = ctk.CTkFrame(tab); controls_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
         ctk.CTkButton(controls_frame, text="Marcar Selecionada como Lida", command=self.mark_notification_read).pack(side="left", padx=10, pady=10)
         ctk.CTkButton(controls_frame, text="Marcar Todas como Lidas", command=self.mark_all_notifications_read).pack(side="left", padx=10, pady=10)
@@ -555,20 +847,42 @@ class MainAppWindow(ctk.CTk):
         self.refresh_notifications()
     
     def refresh_notifications(self):
+        if not self.notification_widgets: return  # aba ainda não montada; carrega ao abrir
         tree = self.notification_widgets['tree']; fetch_func = self.notification_widgets['fetch']
-        for item in tree.get_children(): tree.delete(item)
-        for row in fetch_func(): tree.insert("", "end", values=row)
+        def show(rows):
+            tree.delete(*tree.get_children())
+            for row in rows: tree.insert("", "end", values=row)
+        self.db_worker.submit(fetch_func, on_done=show, key="notificacoes")
 
     def show_notifications_tab(self):
-        self.refresh_notifications()
+        if "Notificações" in self.built_tabs: self.refresh_notifications()
+        else: self.ensure_tab_built("Notificações")
         self.tab_view.set("Notificações")
 
+    def _scanner_test_source(self):
+        # scanner_source no config.ini (vídeo ou pasta de imagens) substitui a câmera para testes.
+        path = self.config.get('Settings', 'scanner_source', fallback='').strip()
+        if not path: return None
+        from ui.barcode_scanner import FileFrameSource
+        return FileFrameSource(path, fps=self.config.getfloat('Settings', 'scanner_source_fps', fallback=30) or None)
+
     def open_scanner(self):
         try:
-            ScannerWindow(self, self._on_barcode_scanned)
+            ScannerWindow(self, self._on_barcode_scanned, self._scanner_test_source())
         except Exception as e:
             messagebox.showerror("Erro no Scanner", f"Não foi possível iniciar o scanner:\n{e}")
 
+    def open_continuous_scanner(self):
+        try:
+            ContinuousScannerWindow(self, self.db_manager, self.current_user_id, on_committed=self._on_cart_committed, source=self._scanner_test_source(),
+                                    dedupe_window=self.config.getfloat('Settings', 'scanner_dedupe_seconds', fallback=1.0))
+        except Exception as e:
+            messagebox.showerror("Erro no Scanner", f"Não foi possível iniciar o scanner:\n{e}")
+
+    def _on_cart_committed(self):
+        self.refresh_tab("Movimentações"); self.refresh_tab("Produtos")
+        self.dashboard_tab_instance.update_graph(); self.update_notifications_button()
+
     def _on_barcode_scanned(self, code_str):
         code = code_str.strip()
         
@@ -576,8 +890,19 @@ class MainAppWindow(ctk.CTk):
         if existing_product:
             messagebox.showinfo("Produto Encontrado", f"Produto já cadastrado: {existing_product[1]}")
             return
-        
-        off_prod = fetch_openfoodfacts_product(code)
+
+        # A consulta ao OpenFoodFacts (cache no banco, rede só se preciso) roda no worker.
+        self.configure(cursor="watch")
+        def done(result):
+            self.configure(cursor="")
+            self._on_openfoodfacts_result(code, *result)
+        def failed(e):
+            self.configure(cursor="")
+            print(f"Erro na consulta ao OpenFoodFacts: {e}")
+            self._on_openfoodfacts_result(code, None, "indisponível")
+        self.db_worker.submit(self.product_lookup.lookup, code, on_done=done, on_error=failed, key="openfoodfacts")
+
+    def _on_openfoodfacts_result(self, code, off_prod, source):
         if off_prod:
             sku_suggested, meta = generate_sku_from_off(off_prod)
             prefill = {'name': meta.get('name') or off_prod.get('product_name'), 'sku': sku_suggested, 'desc': off_prod.get('brands') or '', 'qty': off_prod.get('quantity'), 'barcode': code}
@@ -585,48 +910,44 @@ class MainAppWindow(ctk.CTk):
             existing = self.db_manager.get_product_by_sku(sku_suggested)
             if existing:
                 prod_id, prod_name = existing[0], existing[1]
-                self.update_movement_product_list()
-                try: self.mov_prod_combo.set(f"{prod_id} - {prod_name}")
-                except Exception: pass
+                self.update_movement_product_list(select=f"{prod_id} - {prod_name}")
                 messagebox.showinfo("Produto Encontrado", f"Produto já cadastrado: {prod_name}\nSelecionado para movimentação.")
                 return
 
             if messagebox.askyesno("Produto encontrado no OpenFoodFacts", f"Produto '{prefill['name']}' encontrado. Deseja criar com os dados sugeridos?"):
                 def _on_created(new_id):
-                    self.update_movement_product_list()
+                    p = self.db_manager.get_product_by_id(new_id)
+                    self.update_movement_product_list(select=f"{p[0]} - {p[1]}" if p else None)
                     try: self.refresh_tab("Produtos")
                     except Exception: pass
                     try:
                         if hasattr(self, 'dashboard_tab_instance'): self.dashboard_tab_instance._populate_product_filter()
                     except Exception: pass
-                    p = self.db_manager.get_product_by_id(new_id)
-                    if p:
-                        try: self.mov_prod_combo.set(f"{p[0]} - {p[1]}")
-                        except Exception: pass
                 AddProductFromSKU(self, self.db_manager, sku_suggested, on_created=_on_created, prefill=prefill)
             return
 
         category = 'GEN'; brand_abbr = 'UNKN'; name_abbr = 'PROD'; variation = datetime.now().strftime('%m%d')
         suggested_sku = f"{category}-{brand_abbr}-{name_abbr}-{variation}"
         msg = f"Código de barras '{code}' não encontrado.\nDeseja cadastrar um novo produto?\nO código será armazenado."
+        if source == "indisponível":
+            msg = f"Não foi possível consultar o OpenFoodFacts (sem conexão ou modo offline) para o código '{code}'.\nDeseja cadastrar um novo produto?\nO código será armazenado."
         prefill = {'barcode': code}
         
         if messagebox.askyesno("Cadastrar Produto", msg):
             def _on_created(new_id):
-                self.update_movement_product_list()
+                p = self.db_manager.get_product_by_id(new_id)
+                self.update_movement_product_list(select=f"{p[0]} - {p[1]}" if p else None)
                 try: self.refresh_tab("Produtos")
                 except Exception: pass
                 try:
                     if hasattr(self, 'dashboard_tab_instance'): self.dashboard_tab_instance._populate_product_filter()
                 except Exception: pass
-                p = self.db_manager.get_product_by_id(new_id)
-                if p:
-                    try: self.mov_prod_combo.set(f"{p[0]} - {p[1]}")
-                    except Exception: pass
             AddProductFromSKU(self, self.db_manager, suggested_sku, on_created=_on_created, prefill=prefill)
 
     def update_notifications_button(self):
-        count = self.db_manager.get_unread_notification_count()
+        self.db_worker.submit(self.db_manager.get_unread_notification_count, on_done=self._show_notification_count, key="notificacoes_contador")
+
+    def _show_notification_count(self, count):
         if count > 0: self.notifications_button.configure(text=f"Notificações ({count})", fg_color="#d9534f")
         else: self.notifications_button.configure(text="Notificações", fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"])
     
@@ -653,10 +974,14 @@ class MainAppWindow(ctk.CTk):
             
     def check_inactivity_notifications(self):
         days = self.config.getint('Settings', 'inactivity_days', fallback=20)
-        inactive_products = self.db_manager.get_inactive_products(days)
-        for pid, name in inactive_products:
-            self.db_manager.add_notification(f"INATIVIDADE: Produto '{name}' não tem movimentação há mais de {days} dias.")
-        if inactive_products: self.update_notifications_button()
+        def check():
+            inactive_products = self.db_manager.get_inactive_products(days)
+            self.db_manager.add_notifications([
+                (f"INATIVIDADE: Produto '{name}' não tem movimentação há mais de {days} dias.", 'inatividade', pid, f"inatividade:{pid}")
+                for pid, name in inactive_products
+            ])
+            return inactive_products
+        self.db_worker.submit(check, on_done=lambda inactive: inactive and self.update_notifications_button(), key="inatividade")
 
     def refresh_tab(self, name):
         if name not in self.tabs or not self.tabs[name].get('refresh'): return
@@ -788,23 +1113,35 @@ class MainAppWindow(ctk.CTk):
         if messagebox.askyesno("Confirmar", f"Deseja excluir o usuário '{data[1]}'?"):
             self.db_manager.delete_user(target_user_id); self.refresh_tab("Usuários")
     
-    def update_movement_product_list(self):
-        products = self.db_manager.get_all_products(); self.product_map = {f"{p[0]} - {p[1]}": p[0] for p in products}; product_list = list(self.product_map.keys())
-        self.mov_prod_combo.configure(values=product_list)
-        if product_list: self.mov_prod_combo.set(product_list[0])
-        else: self.mov_prod_combo.set("")
+    def update_movement_product_list(self, select=None):
+        """Recarrega o combo de produtos em segundo plano; `select` escolhe o item exibido ao terminar."""
+        if "Movimentações" not in self.built_tabs:
+            self._pending_product_select = select or self._pending_product_select; return
+        generation = self.db_manager.catalog_generation("produtos")
+        if select is None and generation == self._product_list_generation: return  # nenhum produto criado/alterado
+        def show(products):
+            self._product_list_generation = generation
+            self.product_map = {f"{p[0]} - {p[1]}": p[0] for p in products}; product_list = list(self.product_map.keys())
+            self.mov_prod_combo.configure(values=product_list)
+            if select in self.product_map: self.mov_prod_combo.set(select)
+            elif product_list: self.mov_prod_combo.set(product_list[0])
+            else: self.mov_prod_combo.set("")
+        self.db_worker.submit(self.db_manager.get_product_names, on_done=show, key="combo_produtos")
     
     def update_origin_dest_list(self, event=None):
+        if "Movimentações" not in self.built_tabs: return
         mov_type = self.mov_type_combo.get()
         if mov_type == "Entrada":
             self.origin_dest_label.configure(text="Fornecedor:")
-            suppliers = self.db_manager.get_all_suppliers()
-            self.origin_dest_map = {f"{s[0]} - {s[1]}": s[0] for s in suppliers}
+            fetch_func = self.db_manager.get_all_suppliers
         else:
             self.origin_dest_label.configure(text="Cliente:")
-            clients = self.db_manager.get_all_clients()
-            self.origin_dest_map = {f"{c[0]} - {c[1]}": c[0] for c in clients}
-        
+            fetch_func = self.db_manager.get_all_clients
+        self.origin_dest_map = {}; self.origin_dest_combo.set("")
+        self.db_worker.submit(fetch_func, on_done=self._fill_origin_dest_list, key="combo_origem_destino")
+
+    def _fill_origin_dest_list(self, rows):
+        self.origin_dest_map = {f"{r[0]} - {r[1]}": r[0] for r in rows}
         values = list(self.origin_dest_map.keys())
         self.origin_dest_combo.configure(values=values)
         if values: self.origin_dest_combo.set(values[0])
@@ -914,30 +1251,61 @@ class MainAppWindow(ctk.CTk):
             self.dashboard_tab_instance.export_to_pdf()
 
     def export_data_to_csv(self):
+        # Linhas lidas em blocos de um snapshot e gravadas num worker: memória constante e
+        # janela respondendo mesmo com milhões de movimentações.
+        if getattr(self, 'csv_export', None): return  # já há uma exportação em andamento
         export_path = self.config.get('Settings', 'export_path', fallback='./exports')
-        if not os.path.exists(export_path): os.makedirs(export_path)
-        filepath = os.path.join(export_path, f"export_completo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-        try:
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                tables_to_export = {
-                    "PRODUTOS": (self.db_manager.get_all_products, ["ID", "Nome", "SKU", "Descrição", "Qtd em Estoque"]),
-                    "CLIENTES": (self.db_manager.get_all_clients, ["ID", "Nome", "CPF/CNPJ", "Telefone", "Email"]),
-                    "FORNECEDORES": (self.db_manager.get_all_suppliers, ["ID", "Nome", "Contato", "Endereço"]),
-                    "MOVIMENTACOES": (self.db_manager.get_all_movements, ["ID", "Produto", "Usuário", "Tipo", "Qtd", "Preço Unit.", "Origem/Destino", "Data/Hora"]),
-                    "USUARIOS": (self.db_manager.get_all_users, ["ID", "Usuário", "Nível de Acesso", "E-mail"])
-                }
-                for table_title, (fetch_func, headers) in tables_to_export.items():
-                    writer.writerow([f"--- DADOS DE {table_title} ---"])
-                    writer.writerow(headers)
-                    data = fetch_func()
-                    if data: writer.writerows(data)
-                    writer.writerow([])
-            messagebox.showinfo("Sucesso", f"Dados exportados com sucesso para:\n{filepath}")
-            self.db_manager.add_notification("Dados do sistema foram exportados para CSV.")
+        compress = self.config.getboolean('Settings', 'export_compress', fallback=False)
+        export = self.csv_export = CsvExport(self.db_manager, export_path, compress=compress)
+        def progress():
+            if not export.rows_total: return None, "Contando registros..."
+            return export.rows_done / export.rows_total, f"{export.current_table or ''}: {export.rows_done:,} de {export.rows_total:,} linhas".replace(",", ".")
+        dialog = ProgressDialog(self, "Exportando CSV", progress, on_cancel=export.cancel)
+        def done(paths):
+            self.csv_export = None; dialog.close()
+            if paths is None:
+                messagebox.showinfo("Exportação Cancelada", "A exportação foi cancelada e os arquivos parciais foram removidos."); return
+            messagebox.showinfo("Sucesso", "Dados exportados com sucesso para:\n" + "\n".join(paths))
+            self.db_manager.add_notification("Dados do sistema foram exportados para CSV.", tipo='exportacao')
             self.update_notifications_button()
-        except Exception as e:
+        def failed(e):
+            self.csv_export = None; dialog.close()
             messagebox.showerror("Erro na Exportação", f"Ocorreu um erro: {e}")
+        self.db_worker.submit(export.run, on_done=done, on_error=failed, key="exportacao_csv", long_running=True)
+
+    def _check_scheduled_backup(self):
+        self._backup_after_id = self.after(self.BACKUP_CHECK_MS, self._check_scheduled_backup)
+        if getattr(self, 'backup_dialog', None): return
+        def backup_if_due():
+            # is_due lista o diretório de backups: roda no worker, não na thread do Tk.
+            if not self.backup_manager.is_due(self.backup_interval_hours): return None
+            return self.backup_manager.create_backup()
+        def done(info):
+            if info: print(f"[backup] {info['path']} ({info['bytes'] / 2**20:.1f} MB em {info['seconds']:.1f} s)")
+        def failed(e):
+            print(f"[backup] Falha no backup automático: {e}")
+            self.db_manager.add_notification(f"Falha no backup automático: {e}", tipo='backup')
+            self.update_notifications_button()
+        self.db_worker.submit(backup_if_due, on_done=done, on_error=failed, key="backup_agendado", long_running=True)
+
+    def run_backup_now(self):
+        # A cópia é online (API de backup do SQLite): dá para continuar usando o sistema enquanto roda.
+        if getattr(self, 'backup_dialog', None): return
+        manager = self.backup_manager
+        def progress():
+            if not manager.pages_total: return None, manager.stage or "Iniciando..."
+            return manager.pages_done / manager.pages_total, f"{manager.stage}: {manager.pages_done} de {manager.pages_total} páginas"
+        dialog = self.backup_dialog = ProgressDialog(self, "Backup do Banco", progress, on_cancel=manager.cancel)
+        def done(info):
+            self.backup_dialog = None; dialog.close()
+            if info is None:
+                messagebox.showinfo("Backup Cancelado", "O backup foi cancelado."); return
+            messagebox.showinfo("Sucesso", f"Backup gravado e verificado:\n{info['path']}\n({info['bytes'] / 2**20:.1f} MB em {info['seconds']:.1f} s)")
+        def failed(e):
+            self.backup_dialog = None; dialog.close()
+            messagebox.showerror("Erro no Backup", f"Ocorreu um erro: {e}")
+        # Chave própria: um pedido manual não substitui o agendado nem é substituído por ele.
+        self.db_worker.submit(manager.create_backup, on_done=done, on_error=failed, key="backup_manual", long_running=True)
 
     def setup_styles(self):
         self.style = ttk.Style(); self.style.theme_use("default")
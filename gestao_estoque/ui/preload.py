@@ -0,0 +1,31 @@
+# ui/preload.py
+
+import importlib
+import threading
+
+# Módulos que só a janela principal usa. A tela de login carrega apenas customtkinter e o
+# banco; estes são importados numa thread enquanto o usuário digita a senha, então a janela
+# principal já os encontra em sys.modules.
+HEAVY_MODULES = (
+    "numpy",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_tkagg",
+    "ui.main_app_window",
+    "requests",
+    "smtplib",
+    "email.mime.multipart",
+    "email.mime.text",
+    "reportlab.platypus",
+    "tkcalendar",
+)
+
+
+def preload_in_background(modules=HEAVY_MODULES):
+    """Importa `modules` numa thread daemon; falhas só são avisadas (o import real repete o erro)."""
+    def _run():
+        for name in modules:
+            try: importlib.import_module(name)
+            except Exception as e: print(f"Aviso: pré-carregamento de '{name}' falhou: {e}")
+    thread = threading.Thread(target=_run, name="preload-imports", daemon=True)
+    thread.start()
+    return thread
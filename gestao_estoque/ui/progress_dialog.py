@@ -0,0 +1,39 @@
+# ui/progress_dialog.py
+
+import customtkinter as ctk
+
+
+class ProgressDialog(ctk.CTkToplevel):
+    """Janela de progresso para tarefas que rodam fora da thread do Tk (exportações, backups).
+
+    A tarefa só atualiza contadores; `progress_fn()` devolve (fração 0..1 ou None, texto) e é
+    consultada a cada POLL_MS pela própria janela, então o worker nunca toca em widgets.
+    """
+    POLL_MS = 100
+
+    def __init__(self, parent, title, progress_fn, on_cancel=None):
+        super().__init__(parent)
+        self.progress_fn = progress_fn; self.on_cancel = on_cancel
+        self.title(title); self.geometry("380x150"); self.resizable(False, False); self.transient(parent)
+        self.status_label = ctk.CTkLabel(self, text="Preparando...")
+        self.status_label.pack(pady=(15, 5), padx=15, anchor="w")
+        self.progress_bar = ctk.CTkProgressBar(self); self.progress_bar.set(0)
+        self.progress_bar.pack(pady=5, padx=15, fill="x")
+        self.cancel_button = ctk.CTkButton(self, text="Cancelar", fg_color="#D32F2F", hover_color="#B71C1C", command=self.cancel)
+        if on_cancel: self.cancel_button.pack(pady=10)
+        self.protocol("WM_DELETE_WINDOW", self.cancel if on_cancel else lambda: None)
+        self._poll_id = self.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        fraction, text = self.progress_fn()
+        if fraction is not None: self.progress_bar.set(max(0.0, min(1.0, fraction)))
+        self.status_label.configure(text=text)
+        self._poll_id = self.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        self.cancel_button.configure(state="disabled", text="Cancelando...")
+        if self.on_cancel: self.on_cancel()
+
+    def close(self):
+        if self._poll_id: self.after_cancel(self._poll_id); self._poll_id = None
+        self.destroy()
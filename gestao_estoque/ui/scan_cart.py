@@ -0,0 +1,89 @@
+# ui/scan_cart.py
+# Sessão de leitura contínua: cada código aceito vira uma unidade no carrinho e o carrinho
+# inteiro é gravado numa única transação (add_movements_batch) ao confirmar. Não depende
+# da câmera nem do Tk: a janela do scanner e o benchmark usam as mesmas classes.
+
+import time
+
+
+class ScanDeduplicator:
+    """Conta cada código uma vez por aparição: uma leitura a menos de `window` segundos da
+    leitura anterior do mesmo código é repetição (o item continua na frente da câmera).
+    Depois de `window` segundos sem aparecer, o código conta de novo como outro item.
+    """
+
+    def __init__(self, window=1.0):
+        self.window = window; self.repeated = 0
+        self._last_seen = {}
+
+    def accept(self, code, now=None):
+        now = time.monotonic() if now is None else now
+        last = self._last_seen.get(code); self._last_seen[code] = now
+        if len(self._last_seen) > 256:  # esquece os códigos que já saíram da janela
+            self._last_seen = {c: t for c, t in self._last_seen.items() if now - t < self.window}
+        if last is not None and now - last < self.window:
+            self.repeated += 1; return False
+        return True
+
+
+class ScanCart:
+    """Itens lidos agrupados por produto. `lines` é {id do produto: dict(name, code, qty,
+    price, error)} na ordem da primeira leitura; `unknown` conta as leituras de códigos sem
+    produto cadastrado, que ficam fora da gravação.
+    """
+
+    def __init__(self, db_manager, tipo="entrada"):
+        self.db = db_manager; self.tipo = tipo
+        self.lines = {}; self.unknown = {}
+        self._manual_prices = set()
+
+    def add(self, code):
+        """Soma uma unidade do produto com este código; devolve a linha ou None se o código não está cadastrado."""
+        product = self.db.get_product_by_barcode(code)
+        if not product:
+            self.unknown[code] = self.unknown.get(code, 0) + 1; return None
+        line = self.lines.get(product[0])
+        if line is None:
+            price = self.db.get_last_prices([product[0]], self.tipo).get(product[0])
+            line = self.lines[product[0]] = {'name': product[1], 'code': code, 'qty': 0, 'price': price, 'error': None}
+        line['qty'] += 1; line['error'] = None
+        return line
+
+    def set_type(self, tipo):
+        """Troca entre entrada e saída; os preços que não foram digitados voltam ao último do novo tipo."""
+        self.tipo = tipo
+        automatic = [pid for pid in self.lines if pid not in self._manual_prices]
+        for pid, price in self.db.get_last_prices(automatic, tipo).items(): self.lines[pid]['price'] = price
+
+    def set_quantity(self, product_id, qty):
+        if qty <= 0: self.remove(product_id)
+        else: self.lines[product_id]['qty'] = qty
+
+    def set_price(self, product_id, price):
+        self.lines[product_id]['price'] = price; self._manual_prices.add(product_id)
+
+    def remove(self, product_id):
+        self.lines.pop(product_id, None); self._manual_prices.discard(product_id)
+
+    def clear(self):
+        self.lines.clear(); self.unknown.clear(); self._manual_prices.clear()
+
+    @property
+    def units(self):
+        return sum(line['qty'] for line in self.lines.values())
+
+    @property
+    def total(self):
+        return sum(line['qty'] * (line['price'] or 0) for line in self.lines.values())
+
+    def commit(self, user_id, id_cliente=None, id_fornecedor=None):
+        """Grava o carrinho numa transação. As linhas gravadas saem do carrinho; as recusadas
+        ficam com o motivo em `error`. Devolve (linhas gravadas, linhas recusadas)."""
+        pids = list(self.lines)
+        results = self.db.add_movements_batch(user_id, [(pid, self.tipo, self.lines[pid]['qty'], self.lines[pid]['price'], id_cliente, id_fornecedor)
+                                                        for pid in pids])
+        saved = 0
+        for pid, result in zip(pids, results):
+            if result == "Sucesso": self.remove(pid); saved += 1
+            else: self.lines[pid]['error'] = result
+        return saved, len(pids) - saved